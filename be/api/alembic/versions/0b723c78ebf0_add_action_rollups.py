@@ -0,0 +1,46 @@
+"""add job watermarks and hourly action rollups
+
+Revision ID: 0b723c78ebf0
+Revises: 595a6804fa59
+Create Date: 2026-10-19 13:20:44.873105
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b723c78ebf0'
+down_revision: Union[str, Sequence[str], None] = '595a6804fa59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('job_watermarks',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('watermark', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('action_rollups_hourly',
+    sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('action_type', sa.String(length=255), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('bucket', 'action_type', 'product_id')
+    )
+    op.create_index(
+        'ix_logging_user_actions_created_brin', 'logging_user_actions', ['created_at'],
+        postgresql_using='brin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_logging_user_actions_created_brin', table_name='logging_user_actions')
+    op.drop_table('action_rollups_hourly')
+    op.drop_table('job_watermarks')
@@ -0,0 +1,41 @@
+"""lease email outbox rows
+
+Revision ID: 17b4281d4b00
+Revises: 311245942ed1
+Create Date: 2026-10-19 21:05:37.902145
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '17b4281d4b00'
+down_revision: Union[str, Sequence[str], None] = '311245942ed1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A new enum label cannot be used in the transaction that adds it
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE email_status ADD VALUE IF NOT EXISTS 'SENDING' AFTER 'PENDING'")
+    op.drop_index('ix_email_outbox_pending', table_name='email_outbox')
+    op.create_index(
+        'ix_email_outbox_due', 'email_outbox', ['next_attempt_at'],
+        postgresql_where=sa.text("status IN ('PENDING', 'SENDING')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Enum labels cannot be dropped: leased rows go back to PENDING
+    op.execute("UPDATE email_outbox SET status = 'PENDING' WHERE status = 'SENDING'")
+    op.drop_index('ix_email_outbox_due', table_name='email_outbox')
+    op.create_index(
+        'ix_email_outbox_pending', 'email_outbox', ['next_attempt_at'],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
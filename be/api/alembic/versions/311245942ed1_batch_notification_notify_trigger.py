@@ -0,0 +1,86 @@
+"""batch notification notify trigger
+
+Revision ID: 311245942ed1
+Revises: a00c8b305434
+Create Date: 2026-10-19 20:40:12.184306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '311245942ed1'
+down_revision: Union[str, Sequence[str], None] = 'a00c8b305434'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS notifications_notify_insert ON notifications")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_notification_insert() RETURNS trigger AS $$
+        DECLARE
+            batch record;
+        BEGIN
+            FOR batch IN
+                SELECT title, content, type, is_read, created_at,
+                       json_agg(json_build_array(id, user_id) ORDER BY id) AS recipients
+                FROM (
+                    SELECT id, user_id, title, left(content, 1000) AS content,
+                           lower(type::text) AS type, is_read, created_at,
+                           (row_number() OVER (
+                               PARTITION BY title, content, type, is_read, created_at ORDER BY id
+                           ) - 1) / 150 AS chunk
+                    FROM new_rows
+                ) numbered
+                GROUP BY title, content, type, is_read, created_at, chunk
+            LOOP
+                PERFORM pg_notify('notifications', json_build_object(
+                    'title', batch.title,
+                    'content', batch.content,
+                    'type', batch.type,
+                    'is_read', batch.is_read,
+                    'created_at', batch.created_at,
+                    'recipients', batch.recipients
+                )::text);
+            END LOOP;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER notifications_notify_insert
+        AFTER INSERT ON notifications
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_notification_insert()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS notifications_notify_insert ON notifications")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_notification_insert() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('notifications', json_build_object(
+                'id', NEW.id,
+                'user_id', NEW.user_id,
+                'title', NEW.title,
+                'content', left(NEW.content, 1000),
+                'type', lower(NEW.type::text),
+                'is_read', NEW.is_read,
+                'created_at', NEW.created_at
+            )::text);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER notifications_notify_insert
+        AFTER INSERT ON notifications
+        FOR EACH ROW EXECUTE FUNCTION notify_notification_insert()
+    """)
@@ -0,0 +1,36 @@
+"""add notification unread indexes
+
+Revision ID: 3daca6adc6fd
+Revises: cef23ccf19ec
+Create Date: 2026-10-19 11:12:40.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3daca6adc6fd'
+down_revision: Union[str, Sequence[str], None] = 'cef23ccf19ec'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_notifications_unread_user', 'notifications', ['user_id'],
+        postgresql_where=sa.text('is_read = false'),
+    )
+    op.execute(
+        "CREATE INDEX ix_notifications_user_recent "
+        "ON notifications (user_id, id DESC)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_user_recent', table_name='notifications')
+    op.drop_index('ix_notifications_unread_user', table_name='notifications')
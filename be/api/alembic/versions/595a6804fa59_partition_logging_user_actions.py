@@ -0,0 +1,87 @@
+"""partition logging_user_actions by month
+
+Revision ID: 595a6804fa59
+Revises: dccaed6eabf1
+Create Date: 2026-10-19 12:31:52.104417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '595a6804fa59'
+down_revision: Union[str, Sequence[str], None] = 'dccaed6eabf1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE logging_user_actions RENAME TO logging_user_actions_old")
+    op.execute("ALTER TABLE logging_user_actions_old RENAME CONSTRAINT logging_user_actions_pkey TO logging_user_actions_old_pkey")
+    op.execute("ALTER SEQUENCE logging_user_actions_id_seq OWNED BY NONE")
+    op.execute("""
+        CREATE TABLE logging_user_actions (
+            id INTEGER NOT NULL DEFAULT nextval('logging_user_actions_id_seq'),
+            user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            action_type VARCHAR(255) NOT NULL,
+            metadata_action JSON,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("ALTER SEQUENCE logging_user_actions_id_seq OWNED BY logging_user_actions.id")
+    op.execute("CREATE TABLE logging_user_actions_default PARTITION OF logging_user_actions DEFAULT")
+
+    # One partition per month from the oldest row through two months ahead
+    op.execute("""
+        DO $$
+        DECLARE
+            month date := date_trunc('month', coalesce(
+                (SELECT min(created_at) FROM logging_user_actions_old), now()
+            ));
+        BEGIN
+            WHILE month <= date_trunc('month', now()) + interval '2 months' LOOP
+                EXECUTE format(
+                    'CREATE TABLE logging_user_actions_y%sm%s PARTITION OF logging_user_actions '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    to_char(month, 'YYYY'), to_char(month, 'MM'),
+                    month, month + interval '1 month'
+                );
+                month := month + interval '1 month';
+            END LOOP;
+        END
+        $$
+    """)
+    op.execute("""
+        INSERT INTO logging_user_actions (id, user_id, action_type, metadata_action, created_at)
+        SELECT id, user_id, action_type, metadata_action, coalesce(created_at, now())
+        FROM logging_user_actions_old
+    """)
+    op.execute("DROP TABLE logging_user_actions_old")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE logging_user_actions RENAME TO logging_user_actions_partitioned")
+    op.execute("ALTER TABLE logging_user_actions_partitioned RENAME CONSTRAINT logging_user_actions_pkey TO logging_user_actions_partitioned_pkey")
+    op.execute("ALTER SEQUENCE logging_user_actions_id_seq OWNED BY NONE")
+    op.execute("""
+        CREATE TABLE logging_user_actions (
+            id INTEGER NOT NULL DEFAULT nextval('logging_user_actions_id_seq') PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            action_type VARCHAR(255) NOT NULL,
+            metadata_action JSON,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+        )
+    """)
+    op.execute("ALTER SEQUENCE logging_user_actions_id_seq OWNED BY logging_user_actions.id")
+    op.execute("""
+        INSERT INTO logging_user_actions (id, user_id, action_type, metadata_action, created_at)
+        SELECT id, user_id, action_type, metadata_action, created_at
+        FROM logging_user_actions_partitioned
+    """)
+    op.execute("DROP TABLE logging_user_actions_partitioned")
@@ -0,0 +1,37 @@
+"""rating rank index tiebreak
+
+Revision ID: 5d74a98a6be0
+Revises: 17b4281d4b00
+Create Date: 2026-10-19 21:32:48.551023
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d74a98a6be0'
+down_revision: Union[str, Sequence[str], None] = '17b4281d4b00'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # product_id completes the sort key, so the index supplies the whole order
+    op.drop_index('ix_product_rating_stats_rank', table_name='product_rating_stats')
+    op.execute(
+        "CREATE INDEX ix_product_rating_stats_rank "
+        "ON product_rating_stats (rating_avg DESC NULLS LAST, rating_count DESC, product_id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_product_rating_stats_rank', table_name='product_rating_stats')
+    op.execute(
+        "CREATE INDEX ix_product_rating_stats_rank "
+        "ON product_rating_stats (rating_avg DESC NULLS LAST, rating_count DESC)"
+    )
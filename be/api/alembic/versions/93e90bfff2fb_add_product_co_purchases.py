@@ -0,0 +1,39 @@
+"""add product co purchases
+
+Revision ID: 93e90bfff2fb
+Revises: ccbb795b802f
+Create Date: 2026-10-19 14:41:07.902385
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '93e90bfff2fb'
+down_revision: Union[str, Sequence[str], None] = 'ccbb795b802f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('product_co_purchases',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('related_product_id', sa.Integer(), nullable=False),
+    sa.Column('co_count', sa.Integer(), nullable=False),
+    sa.Column('lift', sa.Float(), nullable=False),
+    sa.Column('rank', sa.SmallInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='cascade'),
+    sa.ForeignKeyConstraint(['related_product_id'], ['products.id'], ondelete='cascade'),
+    sa.PrimaryKeyConstraint('product_id', 'related_product_id')
+    )
+    op.create_index('ix_product_co_purchases_rank', 'product_co_purchases', ['product_id', 'rank'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_product_co_purchases_rank', table_name='product_co_purchases')
+    op.drop_table('product_co_purchases')
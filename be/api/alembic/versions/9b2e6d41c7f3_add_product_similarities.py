@@ -0,0 +1,35 @@
+"""add product similarities
+
+Revision ID: 9b2e6d41c7f3
+Revises: 5d74a98a6be0
+Create Date: 2026-10-19 23:12:40.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2e6d41c7f3'
+down_revision: Union[str, Sequence[str], None] = '5d74a98a6be0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('product_similarities',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('similar_product_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='cascade'),
+    sa.ForeignKeyConstraint(['similar_product_id'], ['products.id'], ondelete='cascade'),
+    sa.PrimaryKeyConstraint('product_id', 'similar_product_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('product_similarities')
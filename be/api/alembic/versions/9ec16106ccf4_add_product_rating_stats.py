@@ -0,0 +1,61 @@
+"""add product_rating_stats
+
+Revision ID: 9ec16106ccf4
+Revises: 81eff8f37fc2
+Create Date: 2026-10-19 09:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9ec16106ccf4'
+down_revision: Union[str, Sequence[str], None] = '81eff8f37fc2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'product_rating_stats',
+        sa.Column('product_id', sa.Integer(), sa.ForeignKey('products.id', ondelete='cascade'), primary_key=True),
+        sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_1', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_2', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_3', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_4', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_5', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_avg', sa.Float(), nullable=True),
+    )
+    op.execute(
+        "CREATE INDEX ix_product_rating_stats_rank "
+        "ON product_rating_stats (rating_avg DESC NULLS LAST, rating_count DESC)"
+    )
+
+    # Backfill from existing reviews
+    op.execute("""
+        INSERT INTO product_rating_stats (
+            product_id, rating_count, rating_sum,
+            rating_1, rating_2, rating_3, rating_4, rating_5, rating_avg
+        )
+        SELECT product_id, count(*), sum(rating),
+               count(*) FILTER (WHERE rating = 1),
+               count(*) FILTER (WHERE rating = 2),
+               count(*) FILTER (WHERE rating = 3),
+               count(*) FILTER (WHERE rating = 4),
+               count(*) FILTER (WHERE rating = 5),
+               avg(rating)
+        FROM feedback
+        GROUP BY product_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_product_rating_stats_rank', table_name='product_rating_stats')
+    op.drop_table('product_rating_stats')
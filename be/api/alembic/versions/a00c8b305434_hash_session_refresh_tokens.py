@@ -0,0 +1,43 @@
+"""hash session refresh tokens
+
+Revision ID: a00c8b305434
+Revises: c79050a9d103
+Create Date: 2026-10-19 16:02:11.530914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a00c8b305434'
+down_revision: Union[str, Sequence[str], None] = 'c79050a9d103'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DELETE FROM sessions WHERE expired_at < now()")
+    op.add_column('sessions', sa.Column('token_hash', sa.LargeBinary(length=32), nullable=True))
+    # Existing refresh tokens keep working: same digest as hash_refresh_token()
+    op.execute("UPDATE sessions SET token_hash = sha256(convert_to(refresh_token, 'UTF8'))")
+    op.alter_column('sessions', 'token_hash', nullable=False)
+    op.create_unique_constraint('sessions_token_hash_key', 'sessions', ['token_hash'])
+    op.drop_column('sessions', 'refresh_token')
+    op.create_index('ix_sessions_user_id', 'sessions', ['user_id', 'id'], unique=False)
+    op.create_index('ix_sessions_expired_at', 'sessions', ['expired_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sessions_expired_at', table_name='sessions')
+    op.drop_index('ix_sessions_user_id', table_name='sessions')
+    # Raw tokens cannot be recovered from their digests: everyone signs in again
+    op.execute("DELETE FROM sessions")
+    op.drop_constraint('sessions_token_hash_key', 'sessions', type_='unique')
+    op.drop_column('sessions', 'token_hash')
+    op.add_column('sessions', sa.Column('refresh_token', sa.String(length=255), nullable=False))
+    op.create_unique_constraint('sessions_refresh_token_key', 'sessions', ['refresh_token'])
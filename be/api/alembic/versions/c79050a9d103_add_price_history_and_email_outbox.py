@@ -0,0 +1,60 @@
+"""add price history and email outbox
+
+Revision ID: c79050a9d103
+Revises: 93e90bfff2fb
+Create Date: 2026-10-19 15:26:38.144720
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c79050a9d103'
+down_revision: Union[str, Sequence[str], None] = '93e90bfff2fb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('product_price_history',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('old_price', sa.Float(), nullable=False),
+    sa.Column('new_price', sa.Float(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='cascade'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_product_price_history_product_id'), 'product_price_history', ['product_id'], unique=False)
+    op.create_table('email_outbox',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('to_email', sa.String(length=255), nullable=False),
+    sa.Column('template', sa.String(length=50), nullable=False),
+    sa.Column('context', sa.JSON(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'SENT', 'FAILED', name='email_status'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_email_outbox_pending', 'email_outbox', ['next_attempt_at'],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+    op.create_index('ix_wishlist_product_id', 'wishlist', ['product_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_wishlist_product_id', table_name='wishlist')
+    op.drop_index('ix_email_outbox_pending', table_name='email_outbox')
+    op.drop_table('email_outbox')
+    sa.Enum(name='email_status').drop(op.get_bind(), checkfirst=True)
+    op.drop_index(op.f('ix_product_price_history_product_id'), table_name='product_price_history')
+    op.drop_table('product_price_history')
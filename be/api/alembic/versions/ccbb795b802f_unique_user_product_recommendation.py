@@ -0,0 +1,38 @@
+"""unique user product recommendation
+
+Revision ID: ccbb795b802f
+Revises: 0b723c78ebf0
+Create Date: 2026-10-19 14:02:19.556730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ccbb795b802f'
+down_revision: Union[str, Sequence[str], None] = '0b723c78ebf0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the best scored row of any duplicate pair
+    op.execute("""
+        DELETE FROM recommendations r
+        USING recommendations other
+        WHERE r.user_id = other.user_id
+          AND r.product_id = other.product_id
+          AND (r.score, r.id) < (other.score, other.id)
+    """)
+    op.create_unique_constraint(
+        'uq_user_product_recommendation', 'recommendations', ['user_id', 'product_id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_user_product_recommendation', 'recommendations', type_='unique')
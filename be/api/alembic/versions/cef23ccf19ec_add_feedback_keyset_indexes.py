@@ -0,0 +1,36 @@
+"""add feedback keyset indexes
+
+Revision ID: cef23ccf19ec
+Revises: 9ec16106ccf4
+Create Date: 2026-10-19 10:03:17.551902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cef23ccf19ec'
+down_revision: Union[str, Sequence[str], None] = '9ec16106ccf4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "CREATE INDEX ix_feedback_product_recent "
+        "ON feedback (product_id, created_at DESC, id DESC)"
+    )
+    op.execute(
+        "CREATE INDEX ix_feedback_product_rating "
+        "ON feedback (product_id, rating DESC, created_at DESC, id DESC)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_feedback_product_rating', table_name='feedback')
+    op.drop_index('ix_feedback_product_recent', table_name='feedback')
@@ -0,0 +1,49 @@
+"""add notification notify trigger
+
+Revision ID: dccaed6eabf1
+Revises: 3daca6adc6fd
+Create Date: 2026-10-19 11:48:05.627319
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'dccaed6eabf1'
+down_revision: Union[str, Sequence[str], None] = '3daca6adc6fd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_notification_insert() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('notifications', json_build_object(
+                'id', NEW.id,
+                'user_id', NEW.user_id,
+                'title', NEW.title,
+                'content', left(NEW.content, 1000),
+                'type', lower(NEW.type::text),
+                'is_read', NEW.is_read,
+                'created_at', NEW.created_at
+            )::text);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER notifications_notify_insert
+        AFTER INSERT ON notifications
+        FOR EACH ROW EXECUTE FUNCTION notify_notification_insert()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS notifications_notify_insert ON notifications")
+    op.execute("DROP FUNCTION IF EXISTS notify_notification_insert()")
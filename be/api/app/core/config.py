@@ -20,4 +20,107 @@ SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
 SMTP_USERNAME = os.getenv("SMTP_USERNAME", "")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
 SENDER_EMAIL = os.getenv("SENDER_EMAIL", SMTP_USERNAME)
-SENDER_NAME = os.getenv("SENDER_NAME", "E-Commerce Store")
\ No newline at end of file
+SENDER_NAME = os.getenv("SENDER_NAME", "E-Commerce Store")
+
+# Inventory Configuration
+INGREDIENT_LOW_STOCK_THRESHOLD = float(os.getenv("INGREDIENT_LOW_STOCK_THRESHOLD", "10"))
+
+# Notification Stream Configuration
+NOTIFICATION_STREAM_HEARTBEAT_SECONDS = float(os.getenv("NOTIFICATION_STREAM_HEARTBEAT_SECONDS", "15"))
+NOTIFICATION_STREAM_QUEUE_SIZE = int(os.getenv("NOTIFICATION_STREAM_QUEUE_SIZE", "100"))
+
+# Action Log Configuration
+ACTION_LOG_BATCH_SIZE = int(os.getenv("ACTION_LOG_BATCH_SIZE", "500"))
+ACTION_LOG_FLUSH_SECONDS = float(os.getenv("ACTION_LOG_FLUSH_SECONDS", "2"))
+ACTION_LOG_MAX_PENDING = int(os.getenv("ACTION_LOG_MAX_PENDING", "50000"))
+ACTION_LOG_PARTITION_MONTHS_AHEAD = int(os.getenv("ACTION_LOG_PARTITION_MONTHS_AHEAD", "2"))
+# Long-running workers must keep creating next months' partitions
+ACTION_LOG_PARTITION_INTERVAL_SECONDS = float(os.getenv("ACTION_LOG_PARTITION_INTERVAL_SECONDS", "86400"))
+
+# Analytics Configuration
+ACTION_ROLLUP_INTERVAL_SECONDS = float(os.getenv("ACTION_ROLLUP_INTERVAL_SECONDS", "60"))
+# Rows are stamped by their COPY transaction; this only has to cover
+# transactions that started but have not committed yet
+ACTION_ROLLUP_LAG_SECONDS = float(os.getenv("ACTION_ROLLUP_LAG_SECONDS", "120"))
+
+# Recommendation Configuration
+RECOMMENDATION_TOP_N = int(os.getenv("RECOMMENDATION_TOP_N", "20"))
+RECOMMENDATION_NEIGHBOURS = int(os.getenv("RECOMMENDATION_NEIGHBOURS", "50"))
+RECOMMENDATION_LOG_DAYS = int(os.getenv("RECOMMENDATION_LOG_DAYS", "90"))
+# Incremental runs score with the stored item similarities; the next run is
+# a full one (recomputing them from every interaction) once they are this old
+RECOMMENDATION_FULL_REFRESH_SECONDS = float(os.getenv("RECOMMENDATION_FULL_REFRESH_SECONDS", "86400"))
+# 0 disables the in-app refresh; run `python manage.py build-recommendations` from cron instead
+RECOMMENDATION_REFRESH_SECONDS = float(os.getenv("RECOMMENDATION_REFRESH_SECONDS", "0"))
+
+# Frequently Bought Together Configuration
+CO_PURCHASE_TOP_K = int(os.getenv("CO_PURCHASE_TOP_K", "10"))
+CO_PURCHASE_MIN_COUNT = int(os.getenv("CO_PURCHASE_MIN_COUNT", "2"))
+CO_PURCHASE_WINDOW_DAYS = int(os.getenv("CO_PURCHASE_WINDOW_DAYS", "365"))
+CO_PURCHASE_REFRESH_SECONDS = float(os.getenv("CO_PURCHASE_REFRESH_SECONDS", "3600"))
+
+# Email Outbox Configuration
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "50"))
+EMAIL_OUTBOX_CONCURRENCY = int(os.getenv("EMAIL_OUTBOX_CONCURRENCY", "8"))
+EMAIL_OUTBOX_POLL_SECONDS = float(os.getenv("EMAIL_OUTBOX_POLL_SECONDS", "5"))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+# Claimed rows not marked sent or failed by then (a crashed worker) are retried
+EMAIL_OUTBOX_LEASE_SECONDS = float(os.getenv("EMAIL_OUTBOX_LEASE_SECONDS", "900"))
+
+# Session Configuration
+# Oldest sessions beyond this are evicted at login
+MAX_SESSIONS_PER_USER = int(os.getenv("MAX_SESSIONS_PER_USER", "10"))
+SESSION_SWEEP_INTERVAL_SECONDS = float(os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", "3600"))
+SESSION_SWEEP_BATCH_SIZE = int(os.getenv("SESSION_SWEEP_BATCH_SIZE", "1000"))
+
+# Password Hashing Configuration
+# Changing the cost re-hashes each password at its owner's next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Login Throttle Configuration
+LOGIN_THROTTLE_WINDOW_SECONDS = float(os.getenv("LOGIN_THROTTLE_WINDOW_SECONDS", "300"))
+LOGIN_THROTTLE_IP_LIMIT = int(os.getenv("LOGIN_THROTTLE_IP_LIMIT", "50"))
+LOGIN_THROTTLE_EMAIL_LIMIT = int(os.getenv("LOGIN_THROTTLE_EMAIL_LIMIT", "10"))
+# Attempts at one account from one IP, reset by a successful login
+LOGIN_THROTTLE_ACCOUNT_IP_LIMIT = int(os.getenv("LOGIN_THROTTLE_ACCOUNT_IP_LIMIT", "5"))
+# Logins are shed while this many password hashes are already waiting
+LOGIN_MAX_PENDING_HASHES = int(os.getenv("LOGIN_MAX_PENDING_HASHES", "64"))
+# Share counters between workers through Redis; in-memory per worker when empty
+LOGIN_THROTTLE_REDIS_URL = os.getenv("LOGIN_THROTTLE_REDIS_URL", "")
+# Comma-separated proxy IPs/CIDRs whose X-Forwarded-For names the client IP.
+# Empty trusts no header: the IP is the TCP peer, which is what uvicorn
+# --proxy-headers --forwarded-allow-ips=<proxy> already rewrites
+TRUSTED_PROXIES = os.getenv("TRUSTED_PROXIES", "")
+
+# JWT Cache Configuration
+# Verified access tokens are cached until their exp
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+JWT_NEGATIVE_CACHE_SECONDS = float(os.getenv("JWT_NEGATIVE_CACHE_SECONDS", "10"))
+
+# JWT Signing Keys Configuration (used when ALGO is RS256/ES256)
+# <kid>.pem private keys; create one with `python manage.py generate-jwt-key`
+JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR", "keys")
+# Empty signs with the newest kid
+JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID", "")
+
+# Metrics Configuration
+# How often each worker publishes pool/cache gauges with PROMETHEUS_MULTIPROC_DIR set
+METRICS_REFRESH_SECONDS = float(os.getenv("METRICS_REFRESH_SECONDS", "15"))
+
+# Query Diagnostics Configuration
+# Adds X-DB-Queries / X-DB-Time response headers
+DEBUG = os.getenv("DEBUG", "false").lower() in ("1", "true", "yes")
+# Same statement this many times in one request is logged as a likely N+1 (0 disables)
+QUERY_N_PLUS_ONE_THRESHOLD = int(os.getenv("QUERY_N_PLUS_ONE_THRESHOLD", "10"))
+
+# Logging Configuration
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Empty logs to stdout only; each process appends its pid (logs/api.1234.log)
+LOG_FILE = os.getenv("LOG_FILE", "logs/api.log")
+LOG_FILE_MAX_BYTES = int(os.getenv("LOG_FILE_MAX_BYTES", str(50 * 1024 * 1024)))
+LOG_FILE_BACKUP_COUNT = int(os.getenv("LOG_FILE_BACKUP_COUNT", "14"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Same warning/error logged more than LOG_SAMPLE_BURST times per window is sampled
+LOG_SAMPLE_BURST = int(os.getenv("LOG_SAMPLE_BURST", "5"))
+LOG_SAMPLE_WINDOW_SECONDS = float(os.getenv("LOG_SAMPLE_WINDOW_SECONDS", "60"))
@@ -1,11 +1,17 @@
 import os
+import time
+import hashlib
 from dotenv import load_dotenv
-from sqlalchemy import select
+from sqlalchemy import select, exists
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt, ExpiredSignatureError
-from app.models.user import User
+from app.models.user import User, Session
+from app.core.config import JWT_CACHE_SIZE, JWT_NEGATIVE_CACHE_SECONDS
+from app.core.jwt_keys import ASYMMETRIC_ALGORITHMS, get_key_ring
+from app.core.security import ACCESS_TOKEN_TYPE
+from app.services.cache import TTLCache
 import ssl
 
 load_dotenv()
@@ -52,34 +58,123 @@ async def get_db():
         yield session
 
 
-async def get_current_user(
-    session: AsyncSession = Depends(get_db),
-    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
-    settings: dict = Depends(get_settings),
-) -> User:
+# Verified claims (dict) or a recent failure (HTTPException args) per token digest
+_verified_tokens = TTLCache("verified_tokens", maxsize=JWT_CACHE_SIZE, ttl=JWT_NEGATIVE_CACHE_SECONDS)
+# Recently revoked session ids, kept as long as their access tokens can live
+revoked_sessions = TTLCache(
+    "revoked_sessions", maxsize=100000, ttl=60 * int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
+)
+
+
+def _decode_claims(token: str, settings: dict) -> dict:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    algorithm = settings["ALGO"]
     try:
+        if algorithm in ASYMMETRIC_ALGORITHMS:
+            key = get_key_ring(algorithm).verification_key(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                raise credentials_exception
+        else:
+            key = settings["SEC_KEY"]
         payload = jwt.decode(
-            token=token.credentials,
-            key=settings["SEC_KEY"],
-            algorithms=[settings["ALGO"]],
+            token=token,
+            key=key,
+            algorithms=[algorithm],
         )
         user_email: str = payload.get("sub")
         if user_email is None:
             raise credentials_exception
+        token_type = payload.get("typ")
+        if token_type is None:
+            # Issued before tokens were typed, and without sid when it is an
+            # access token. Refresh tokens of that time expire much later
+            # than an access token can: this closes by itself one access
+            # token lifetime after the upgrade.
+            lifetime = 60 * settings["ACCESS_TOKEN_EXPIRE_MINUTES"]
+            if "exp" not in payload or payload["exp"] - time.time() > lifetime:
+                raise credentials_exception
+        elif token_type != ACCESS_TOKEN_TYPE or "sid" not in payload:
+            raise credentials_exception
     except ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
     except JWTError:
         raise credentials_exception
 
-    result = await session.execute(select(User).where(User.email == user_email))
+    return payload
+
+
+def decode_access_token_claims(token: str, settings: dict) -> dict:
+    """
+    Validate an access token and return its claims
+
+    Signature checks are cached per token: valid claims until the token's
+    exp, failures for JWT_NEGATIVE_CACHE_SECONDS. Refresh tokens are
+    rejected, and so are tokens of a revoked session even while their
+    claims are cached.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    cached = _verified_tokens.get(key)
+    if cached is None:
+        try:
+            cached = _decode_claims(token, settings)
+        except HTTPException as e:
+            _verified_tokens.set(key, (e.status_code, e.detail, e.headers))
+            raise
+        if "exp" in cached:
+            _verified_tokens.set(key, cached, ttl=cached["exp"] - time.time())
+    if isinstance(cached, tuple):
+        raise HTTPException(*cached)
+    if "sid" in cached and revoked_sessions.get(cached["sid"]) is not None:
+        raise HTTPException(status_code=401, detail="Session has been revoked")
+    return cached
+
+
+def decode_access_token(token: str, settings: dict) -> str:
+    """Validate an access token and return its subject (the user's email)"""
+    return decode_access_token_claims(token, settings)["sub"]
+
+
+def revoke_session_ids(session_ids) -> None:
+    """Reject access tokens of these sessions on this worker from now on"""
+    for session_id in session_ids:
+        revoked_sessions.set(session_id, True)
+
+
+async def get_token_claims(
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    settings: dict = Depends(get_settings),
+) -> dict:
+    return decode_access_token_claims(token.credentials, settings)
+
+
+def session_user_query(claims: dict, entity=User):
+    """Select `entity` of the claims' user, only while its session still exists"""
+    query = select(entity).where(User.email == claims["sub"])
+    if "sid" in claims:
+        # Source of truth for revocation, also on workers that missed the notify
+        # (only untyped tokens from before sessions were tracked lack sid)
+        query = query.where(
+            exists().where(Session.id == claims["sid"], Session.user_id == User.id)
+        )
+    return query
+
+
+async def get_current_user(
+    session: AsyncSession = Depends(get_db),
+    claims: dict = Depends(get_token_claims),
+) -> User:
+    result = await session.execute(session_user_query(claims))
     user = result.scalar_one_or_none()
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
     return user
 
@@ -0,0 +1,61 @@
+import os
+from typing import Dict, Optional, Tuple
+from jose import jwk
+from app.core.config import JWT_KEYS_DIR, JWT_ACTIVE_KID
+
+# Algorithms signed with a private key from JWT_KEYS_DIR; anything else
+# (the HS256 default) keeps using SEC_KEY
+ASYMMETRIC_ALGORITHMS = {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+
+
+class KeyRing:
+    """
+    Signing keys by kid, loaded from <keys_dir>/<kid>.pem
+
+    Tokens are signed with the active key: active_kid if set, else the
+    last kid in sort order. Every key in the directory stays valid for
+    verification and is published in the JWKS, so rotating is:
+    add the new key, wait for JWKS caches to pick it up, switch the
+    active kid, and delete the old file once its tokens have expired.
+    """
+
+    def __init__(self, algorithm: str, keys_dir: str, active_kid: str = ""):
+        self.algorithm = algorithm
+        self._private: Dict[str, str] = {}
+        self._public: Dict[str, dict] = {}
+        if os.path.isdir(keys_dir):
+            for name in sorted(os.listdir(keys_dir)):
+                kid, ext = os.path.splitext(name)
+                if ext != ".pem":
+                    continue
+                with open(os.path.join(keys_dir, name)) as f:
+                    pem = f.read()
+                public = jwk.construct(pem, algorithm).public_key().to_dict()
+                self._private[kid] = pem
+                self._public[kid] = {**public, "kid": kid, "use": "sig", "alg": algorithm}
+        self.active_kid = active_kid or (max(self._private) if self._private else None)
+        if self.active_kid is not None and self.active_kid not in self._private:
+            raise RuntimeError(f"JWT_ACTIVE_KID {self.active_kid} not found in {keys_dir}")
+
+    def signing_key(self) -> Tuple[str, str]:
+        """(kid, private PEM) of the active key"""
+        if self.active_kid is None:
+            raise RuntimeError(f"No {self.algorithm} signing key configured")
+        return self.active_kid, self._private[self.active_kid]
+
+    def verification_key(self, kid: Optional[str]) -> Optional[dict]:
+        return self._public.get(kid)
+
+    def jwks(self) -> dict:
+        return {"keys": list(self._public.values())}
+
+
+_key_rings: Dict[str, KeyRing] = {}
+
+
+def get_key_ring(algorithm: str) -> KeyRing:
+    """Key ring of an asymmetric algorithm, loaded once per worker"""
+    ring = _key_rings.get(algorithm)
+    if ring is None:
+        ring = _key_rings[algorithm] = KeyRing(algorithm, JWT_KEYS_DIR, JWT_ACTIVE_KID)
+    return ring
@@ -0,0 +1,78 @@
+"""
+Local verification of our access tokens for other services
+
+Depends only on python-jose and httpx, so it can be copied as is:
+
+    verifier = JWKSVerifier("https://api.example.com/.well-known/jwks.json")
+    claims = verifier.verify(token)          # sync code
+    claims = await verifier.verify_async(token)  # async code
+
+Only access tokens are accepted: refresh tokens are signed with the same
+keys but carry typ "refresh".
+
+Keys are fetched once and cached for `ttl` seconds. A token signed with
+an unknown kid (a freshly rotated key) triggers a refetch, at most once
+every `min_refresh_interval` seconds so forged kids cannot hammer the
+JWKS endpoint.
+"""
+
+import time
+from typing import Dict, Iterable, Optional
+import httpx
+from jose import jwt, JWTError
+
+
+class JWKSVerifier:
+    def __init__(
+        self,
+        jwks_url: str,
+        algorithms: Iterable[str] = ("RS256", "ES256"),
+        ttl: float = 300.0,
+        min_refresh_interval: float = 30.0,
+        timeout: float = 5.0,
+    ):
+        self.jwks_url = jwks_url
+        self.algorithms = list(algorithms)
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        self._keys: Dict[str, dict] = {}
+        self._fetched_at = float("-inf")
+
+    def _needs_fetch(self, kid: Optional[str]) -> bool:
+        age = time.monotonic() - self._fetched_at
+        if age >= self.ttl:
+            return True
+        return kid not in self._keys and age >= self.min_refresh_interval
+
+    def _store(self, jwks: dict) -> None:
+        self._keys = {key["kid"]: key for key in jwks.get("keys", []) if "kid" in key}
+        self._fetched_at = time.monotonic()
+
+    def _decode(self, token: str, kid: Optional[str]) -> dict:
+        key = self._keys.get(kid)
+        if key is None:
+            raise JWTError(f"Unknown signing key {kid!r}")
+        claims = jwt.decode(token, key, algorithms=self.algorithms)
+        if claims.get("typ") != "access":
+            raise JWTError("Not an access token")
+        return claims
+
+    def verify(self, token: str) -> dict:
+        """Claims of a valid token; raises jose.JWTError otherwise"""
+        kid = jwt.get_unverified_header(token).get("kid")
+        if self._needs_fetch(kid):
+            response = httpx.get(self.jwks_url, timeout=self.timeout)
+            response.raise_for_status()
+            self._store(response.json())
+        return self._decode(token, kid)
+
+    async def verify_async(self, token: str) -> dict:
+        """verify() without blocking the event loop on a JWKS fetch"""
+        kid = jwt.get_unverified_header(token).get("kid")
+        if self._needs_fetch(kid):
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await client.get(self.jwks_url)
+            response.raise_for_status()
+            self._store(response.json())
+        return self._decode(token, kid)
@@ -0,0 +1,240 @@
+"""
+Structured, non-blocking logging
+
+Records are formatted as JSON lines. Request handlers only put them on
+a bounded queue (QueueHandler); a background thread (QueueListener)
+writes them to stdout and to a log file rotated by size and by day.
+Under an error storm, repeats of the same warning/error are sampled and
+a full queue drops records rather than blocking the event loop.
+
+Every worker process writes its own file (the pid goes before the
+extension: logs/api.1234.log), since processes rotating one shared file
+would rename or truncate it under each other and lose lines.
+"""
+
+import atexit
+import copy
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from app.core.config import (
+    LOG_LEVEL,
+    LOG_FILE,
+    LOG_FILE_MAX_BYTES,
+    LOG_FILE_BACKUP_COUNT,
+    LOG_QUEUE_SIZE,
+    LOG_SAMPLE_BURST,
+    LOG_SAMPLE_WINDOW_SECONDS,
+)
+
+# Correlation id of the request being handled ("-" outside requests)
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+# LogRecord attributes that are not user supplied `extra` fields
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in _RESERVED})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps the current request id (runs in the emitting task, before queueing)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        return True
+
+
+class RepeatSampler(logging.Filter):
+    """
+    Lets through the first `burst` warnings/errors with the same logger,
+    message template and exception type per `window` seconds, then drops
+    repeats until the window ends; the next one carries the count of
+    suppressed records.
+    """
+
+    def __init__(self, burst: int = 5, window: float = 60.0):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.suppressed_total = 0
+        self._windows: Dict[Tuple, list] = {}  # key -> [window start, seen, suppressed]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING or self.burst <= 0:
+            return True
+        exc_type = record.exc_info[0].__name__ if record.exc_info and record.exc_info[0] else None
+        key = (record.name, str(record.msg), exc_type)
+        now = time.monotonic()
+        state = self._windows.get(key)
+        if state is None or now - state[0] >= self.window:
+            if len(self._windows) > 10000:
+                self._windows.clear()
+            if state is not None and state[2]:
+                record.suppressed_repeats = state[2]
+            self._windows[key] = [now, 1, 0]
+            return True
+        state[1] += 1
+        if state[1] <= self.burst:
+            return True
+        state[2] += 1
+        self.suppressed_total += 1
+        return False
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks: records beyond the queue size are dropped"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Like the base class, but keeps the traceback out of msg for JsonFormatter
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class SizedTimedRotatingFileHandler(logging.handlers.TimedRotatingFileHandler):
+    """Rotates at midnight and whenever the file would exceed max_bytes"""
+
+    def __init__(self, filename: str, max_bytes: int, backup_count: int):
+        super().__init__(filename, when="midnight", backupCount=backup_count, encoding="utf-8", utc=True)
+        self.max_bytes = max_bytes
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if super().shouldRollover(record):
+            return True
+        # Checked before the write: a file may overshoot by one record
+        return self.max_bytes > 0 and self.stream is not None and self.stream.tell() >= self.max_bytes
+
+    def rotation_filename(self, default_name: str) -> str:
+        # Several size rollovers a day: app.log.2026-01-31, .1, .2, ...
+        name, index = default_name, 0
+        while os.path.exists(name):
+            index += 1
+            name = f"{default_name}.{index}"
+        return super().rotation_filename(name)
+
+
+class RequestIdMiddleware:
+    """
+    Pure ASGI middleware: takes X-Request-ID from the client (if sane)
+    or generates one, exposes it to logs and echoes it in the response.
+
+    It is also kept in request.state.request_id for the handlers that run
+    outside this middleware (the catch-all exception handler).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        if request_id is None or not _REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-request-id", request_id.encode()),
+                ]
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+queue_handler: Optional[DroppingQueueHandler] = None
+sampler = RepeatSampler(burst=LOG_SAMPLE_BURST, window=LOG_SAMPLE_WINDOW_SECONDS)
+
+
+def process_log_file(path: str) -> str:
+    """path with this process's pid before the extension"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{os.getpid()}{ext}"
+
+
+def setup_logging() -> None:
+    """Route the root logger through the queue (idempotent)"""
+    global _listener, queue_handler
+    if _listener is not None:
+        return
+
+    formatter = JsonFormatter()
+    handlers = [logging.StreamHandler()]
+    if LOG_FILE:
+        os.makedirs(os.path.dirname(LOG_FILE) or ".", exist_ok=True)
+        handlers.append(SizedTimedRotatingFileHandler(
+            process_log_file(LOG_FILE), LOG_FILE_MAX_BYTES, LOG_FILE_BACKUP_COUNT
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    queue_handler.addFilter(RequestIdFilter())
+    queue_handler.addFilter(sampler)
+
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
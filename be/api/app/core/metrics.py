@@ -0,0 +1,171 @@
+"""
+Prometheus metrics, served on GET /metrics
+
+With several worker processes, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory shared by the workers (wiped before each start). Every worker
+then writes its samples there and /metrics aggregates all of them.
+Gunicorn should also call `multiprocess.mark_process_dead(worker.pid)`
+in its child_exit hook.
+"""
+
+import asyncio
+import os
+import time
+from typing import Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.responses import Response
+from app.core import security
+from app.core.config import METRICS_REFRESH_SECONDS
+from app.core.dependencies import engine
+from app.services.cache import caches
+from app.services.login_throttle import login_throttle
+from app.services.notification_hub import notification_hub
+from app.services.action_log_buffer import action_log_buffer
+from app.services.email_outbox_service import email_outbox_worker
+
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template and status (its _count is the request count)",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests being handled (route is only known once routing is done)",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+
+def _runtime_gauge(name: str, documentation: str, labels=()) -> Gauge:
+    # Per worker values, summed over the live workers
+    return Gauge(name, documentation, labels, multiprocess_mode="livesum")
+
+
+DB_POOL_CONNECTIONS = _runtime_gauge("db_pool_connections", "Database pool connections by state", ["state"])
+CACHE_ENTRIES = _runtime_gauge("cache_entries", "Entries in an in-process cache", ["cache"])
+CACHE_LOOKUPS = _runtime_gauge("cache_lookups", "Cache lookups since worker start", ["cache", "result"])
+LOGIN_THROTTLE_EVENTS = _runtime_gauge("login_throttle_events", "Login attempts by outcome since worker start", ["event"])
+PASSWORD_HASH_PENDING = _runtime_gauge("password_hash_jobs_pending", "Password hashes running or queued")
+SSE_CONNECTIONS = _runtime_gauge("notification_stream_connections", "Open notification streams")
+SSE_DROPPED = _runtime_gauge("notification_stream_dropped_events", "Events dropped for slow stream clients")
+ACTION_LOG_ROWS = _runtime_gauge("action_log_rows", "Action log buffer rows by state", ["state"])
+EMAIL_OUTBOX_EMAILS = _runtime_gauge("email_outbox_emails", "Outbox emails handled since worker start", ["result"])
+
+
+def refresh_runtime_metrics() -> None:
+    """Copy this worker's pool, cache and background service state into the gauges"""
+    pool = engine.pool
+    DB_POOL_CONNECTIONS.labels("checked_out").set(pool.checkedout())
+    DB_POOL_CONNECTIONS.labels("idle").set(pool.checkedin())
+    DB_POOL_CONNECTIONS.labels("overflow").set(max(pool.overflow(), 0))
+
+    for name, cache in caches.items():
+        CACHE_ENTRIES.labels(name).set(len(cache))
+        CACHE_LOOKUPS.labels(name, "hit").set(cache.hits)
+        CACHE_LOOKUPS.labels(name, "miss").set(cache.misses)
+
+    for event, count in login_throttle.counters.items():
+        LOGIN_THROTTLE_EVENTS.labels(event).set(count)
+    PASSWORD_HASH_PENDING.set(security.hash_jobs_pending)
+
+    SSE_CONNECTIONS.set(notification_hub.connections)
+    SSE_DROPPED.set(notification_hub.dropped)
+
+    ACTION_LOG_ROWS.labels("pending").set(len(action_log_buffer))
+    ACTION_LOG_ROWS.labels("written").set(action_log_buffer.written)
+    ACTION_LOG_ROWS.labels("dropped").set(action_log_buffer.dropped)
+
+    EMAIL_OUTBOX_EMAILS.labels("sent").set(email_outbox_worker.sent)
+    EMAIL_OUTBOX_EMAILS.labels("failed").set(email_outbox_worker.failed)
+
+
+class RuntimeMetricsRefresher:
+    """
+    In multiprocess mode a scrape only runs in one worker, so every
+    worker refreshes its runtime gauges on a timer instead.
+    """
+
+    def __init__(self, interval: float = 15.0):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if MULTIPROCESS and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            refresh_runtime_metrics()
+            await asyncio.sleep(self.interval)
+
+
+runtime_metrics = RuntimeMetricsRefresher(interval=METRICS_REFRESH_SECONDS)
+
+
+class PrometheusMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task and body wrapping):
+    one gauge inc/dec and one histogram observation per request.
+
+    The route label is the matched template (/catalog/products/{product_id}),
+    read from the scope after routing, so cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        method = scope["method"]
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                method, route.path if route is not None else "<unmatched>", status_code
+            ).observe(time.perf_counter() - started)
+            in_progress.dec()
+
+
+def metrics_response() -> Response:
+    refresh_runtime_metrics()
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,122 @@
+"""
+Per-request SQL statement counting
+
+Cursor-level SQLAlchemy hooks add every statement and its duration to the
+collectors active in the current context (a contextvar, so concurrent
+requests never mix). QueryCounterMiddleware opens one collector per
+request; assert_max_queries opens one around test code.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Tuple
+from sqlalchemy import event
+from app.core.config import DEBUG, QUERY_N_PLUS_ONE_THRESHOLD
+from app.core.dependencies import engine
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int):
+        """(statement, times) run at least threshold times, most repeated first"""
+        return [(s, n) for s, n in self.statements.most_common() if n >= threshold]
+
+
+_collectors: ContextVar[Tuple[QueryStats, ...]] = ContextVar("query_collectors", default=())
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    collectors = _collectors.get()
+    if not collectors:
+        return
+    started = getattr(context, "_query_started", None)
+    duration = time.perf_counter() - started if started is not None else 0.0
+    for stats in collectors:
+        stats.record(statement, duration)
+
+
+@contextmanager
+def collect_queries() -> Iterator[QueryStats]:
+    """Count the statements run in this context (nests with outer collectors)"""
+    stats = QueryStats()
+    token = _collectors.set(_collectors.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryStats]:
+    """
+    Test helper: fail if the block runs more than `limit` statements
+
+        async with client() as c:
+            with assert_max_queries(3):
+                await c.get("/catalog/products")
+    """
+    with collect_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        repeated = "".join(f"\n  {n}x {s[:200]}" for s, n in stats.repeated(2))
+        raise AssertionError(f"{stats.count} queries, expected at most {limit}{repeated}")
+
+
+class QueryCounterMiddleware:
+    """
+    Pure ASGI middleware counting each request's statements.
+
+    In DEBUG the totals are sent as X-DB-Queries / X-DB-Time (ms) headers
+    (as of the response start, so streamed bodies are not included). A
+    statement repeated QUERY_N_PLUS_ONE_THRESHOLD times in one request is
+    reported as a likely N+1.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with collect_queries() as stats:
+            async def send_wrapper(message):
+                if DEBUG and message["type"] == "http.response.start":
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (b"x-db-queries", str(stats.count).encode()),
+                        (b"x-db-time", f"{stats.duration * 1000:.1f}".encode()),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        if QUERY_N_PLUS_ONE_THRESHOLD > 0:
+            for statement, times in stats.repeated(QUERY_N_PLUS_ONE_THRESHOLD):
+                logger.warning(
+                    "Possible N+1 on %s %s: %dx %s",
+                    scope["method"], scope["path"], times, " ".join(statement.split())[:200],
+                    extra={"queries": stats.count},
+                )
@@ -1,23 +1,77 @@
 from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from app.core.config import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS
+from app.core.jwt_keys import ASYMMETRIC_ALGORITHMS, get_key_ring
+import asyncio
+import secrets
 
-pwd_context = CryptContext(schemes=["bcrypt"])
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=BCRYPT_ROUNDS)
 
-def verify_password(plain: str, hased: str) -> bool:
-    return pwd_context.verify(plain, hased)
+# bcrypt takes 100+ ms of CPU and releases the GIL: run it on a small pool
+# so the event loop keeps serving other requests, and so a login burst can
+# use at most PASSWORD_HASH_WORKERS cores (extra calls wait in the queue).
+hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+# Hash jobs running or queued on hash_executor (read by the login throttle)
+hash_jobs_pending = 0
+# Stand-in for accounts without a password, made on first use
+_dummy_hash: Optional[str] = None
+
+
+async def _run_hash(fn, *args):
+    global hash_jobs_pending
+    hash_jobs_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(hash_executor, fn, *args)
+    finally:
+        hash_jobs_pending -= 1
+
+async def hash_password(password: str) -> str:
+    return await _run_hash(pwd_context.hash, password)
+
+async def verify_password(plain: str, hased: str) -> bool:
+    return await _run_hash(pwd_context.verify, plain, hased)
+
+async def verify_and_update_password(plain: str, hashed: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password; on success also returns a new hash when the stored
+    one was made with another cost than BCRYPT_ROUNDS (else None)
+
+    Without a stored hash (unknown email, Google-only account) a dummy
+    hash is checked instead, so the failure takes as long as a wrong
+    password and does not reveal whether the account exists.
+    """
+    global _dummy_hash
+    if hashed is None:
+        if _dummy_hash is None:
+            _dummy_hash = await _run_hash(pwd_context.hash, secrets.token_urlsafe(16))
+        await _run_hash(pwd_context.verify, plain, _dummy_hash)
+        return False, None
+    return await _run_hash(pwd_context.verify_and_update, plain, hashed)
+
+def encode_token(claims: dict, settings: dict) -> str:
+    """Sign with SEC_KEY, or with the active private key (and its kid) for RS*/ES*"""
+    algorithm = settings["ALGO"]
+    if algorithm in ASYMMETRIC_ALGORITHMS:
+        kid, private_key = get_key_ring(algorithm).signing_key()
+        return jwt.encode(claims, private_key, algorithm=algorithm, headers={"kid": kid})
+    return jwt.encode(claims, settings["SEC_KEY"], algorithm=algorithm)
 
 def create_access_token(data: dict, settings: dict) -> str:
     encoded = data.copy()
     expire = datetime.now(timezone.utc)+timedelta(minutes=settings["ACCESS_TOKEN_EXPIRE_MINUTES"])
-    encoded.update({"exp": expire})
-    return jwt.encode(encoded, settings["SEC_KEY"], algorithm=settings["ALGO"])
+    # typ tells both kinds apart: they are signed with the same key
+    encoded.update({"exp": expire, "typ": ACCESS_TOKEN_TYPE})
+    return encode_token(encoded, settings)
 
 def create_refresh_token(data: dict, settings: dict) -> str:
     encoded = data.copy()
     expire = datetime.now(timezone.utc)+timedelta(days=settings["REFRESH_TOKEN_EXPIRE_DAYS"])
-    encoded.update({"exp": expire})
-    return jwt.encode(encoded, settings["SEC_KEY"], algorithm=settings["ALGO"])
\ No newline at end of file
+    # jti keeps two logins within the same second from sharing a token
+    encoded.update({"exp": expire, "jti": secrets.token_urlsafe(16), "typ": REFRESH_TOKEN_TYPE})
+    return encode_token(encoded, settings)
\ No newline at end of file
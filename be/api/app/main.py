@@ -3,17 +3,84 @@ from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.middleware.sessions import SessionMiddleware
+from app.core.logging_config import setup_logging, RequestIdMiddleware
+
+# Before the other imports, so nothing logs through an unconfigured root logger
+setup_logging()
+
 from app.services.utils import create_tables
-from app.routes import user, order, engagement, cart, address, discount, category, product, variant, ingredient, tag, admin
+from app.core.config import (
+    ACTION_LOG_PARTITION_MONTHS_AHEAD,
+    ACTION_LOG_PARTITION_INTERVAL_SECONDS,
+    ACTION_ROLLUP_INTERVAL_SECONDS,
+    RECOMMENDATION_REFRESH_SECONDS,
+    CO_PURCHASE_REFRESH_SECONDS,
+    SESSION_SWEEP_INTERVAL_SECONDS,
+)
+from app.core.dependencies import AsyncSessionLocal, get_settings
+from app.core.jwt_keys import ASYMMETRIC_ALGORITHMS, get_key_ring
+from app.core.metrics import PrometheusMiddleware, metrics_response, runtime_metrics
+from app.core.query_counter import QueryCounterMiddleware
+from app.services.notification_hub import notification_hub, NOTIFICATION_CHANNEL
+from app.services.pg_listener import pg_listener
+from app.services.catalog_sync import CatalogSync, CATALOG_CHANNEL
+from app.services.action_log_buffer import action_log_buffer
+from app.services.partition_service import PartitionService
+from app.services.analytics_service import AnalyticsService
+from app.services.recommendation_service import RecommendationService
+from app.services.co_purchase_service import CoPurchaseService
+from app.services.session_service import SessionService, SESSION_REVOCATION_CHANNEL
+from app.services.scheduler import PeriodicTask
+from app.services.email_outbox_service import email_outbox_worker
+from app.routes import user, order, engagement, cart, address, discount, category, product, variant, ingredient, tag, admin, pricing
 from contextlib import asynccontextmanager
-import traceback
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
+
+periodic_tasks = [
+    PeriodicTask("action-rollups", ACTION_ROLLUP_INTERVAL_SECONDS, AnalyticsService.rollup_actions),
+    PeriodicTask(
+        "log-partitions", ACTION_LOG_PARTITION_INTERVAL_SECONDS,
+        lambda db: PartitionService.ensure_action_log_partitions(db, ACTION_LOG_PARTITION_MONTHS_AHEAD),
+    ),
+    PeriodicTask("co-purchases", CO_PURCHASE_REFRESH_SECONDS, CoPurchaseService.rebuild),
+    PeriodicTask("session-sweeper", SESSION_SWEEP_INTERVAL_SECONDS, SessionService.sweep_expired),
+]
+if RECOMMENDATION_REFRESH_SECONDS > 0:
+    periodic_tasks.append(
+        PeriodicTask("recommendations", RECOMMENDATION_REFRESH_SECONDS, RecommendationService.build_recommendations)
+    )
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     #await create_tables()
+    pg_listener.subscribe(NOTIFICATION_CHANNEL, notification_hub.dispatch)
+    pg_listener.subscribe(SESSION_REVOCATION_CHANNEL, SessionService.handle_revocation)
+    pg_listener.subscribe(CATALOG_CHANNEL, CatalogSync.handle_change)
+    pg_listener.on_reconnect(CatalogSync.handle_reconnect)
+    await pg_listener.start()
+    # Listen first, so no catalog change falls between the load and the LISTEN
+    if not await pg_listener.wait_connected(timeout=10):
+        logger.warning("Catalog change listener not connected, engines may go stale until it is")
+    async with AsyncSessionLocal() as db:
+        await CatalogSync.rebuild(db)
+        await PartitionService.ensure_action_log_partitions(db, ACTION_LOG_PARTITION_MONTHS_AHEAD)
+    await action_log_buffer.start()
+    for task in periodic_tasks:
+        await task.start()
+    await email_outbox_worker.start()
+    await runtime_metrics.start()
     yield
+    await runtime_metrics.stop()
+    await email_outbox_worker.stop()
+    for task in periodic_tasks:
+        await task.stop()
+    await action_log_buffer.stop()
+    await pg_listener.stop()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -36,6 +103,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(QueryCounterMiddleware)
+app.add_middleware(RequestIdMiddleware)
+
+# Outermost, so its latency covers the other middlewares
+app.add_middleware(PrometheusMiddleware)
+
 app.include_router(user.router)
 app.include_router(order.router)
 app.include_router(category.router)
@@ -43,6 +116,7 @@ app.include_router(product.router)
 app.include_router(variant.router)
 app.include_router(ingredient.router)
 app.include_router(tag.router)
+app.include_router(pricing.router)
 app.include_router(engagement.router)
 app.include_router(cart.router)
 app.include_router(address.router)
@@ -55,15 +129,17 @@ async def http_exception_handler(request, exc):
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
+        headers=exc.headers,
     )
 
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    error_msg = f"Global Exception: {str(exc)}\n{traceback.format_exc()}"
-    print(error_msg)  # Show in terminal
-    with open("error.log", "a") as f:
-        f.write(error_msg + "\n" + "-" * 20 + "\n")
+    logger.error(
+        "Unhandled exception on %s %s", request.method, request.url.path,
+        exc_info=(type(exc), exc, exc.__traceback__),
+        extra={"request_id": getattr(request.state, "request_id", "-")},
+    )
     return JSONResponse(
         status_code=500,
         content={"detail": "Internal Server Error", "debug": str(exc)},
@@ -73,3 +149,16 @@ async def global_exception_handler(request: Request, exc: Exception):
 @app.get("/")
 async def root():
     return {"message": "tmdt"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_response()
+
+
+@app.get("/.well-known/jwks.json")
+async def jwks():
+    """Public keys for verifying access tokens (empty with HS256)"""
+    algorithm = get_settings()["ALGO"]
+    keys = get_key_ring(algorithm).jwks() if algorithm in ASYMMETRIC_ALGORITHMS else {"keys": []}
+    return JSONResponse(content=keys, headers={"Cache-Control": "public, max-age=300"})
@@ -2,7 +2,7 @@ from .base import Base
 from .user import User, Address, Session, Role, UserRole
 from .cart import Cart, CartItem
 from .category import Category
-from .product import Product, ProductTag, ProductIngredient
+from .product import Product, ProductTag, ProductIngredient, ProductPriceHistory
 from .tag import Tag
 from .discount import Discount, Discount_Type
 from .product_variant import ProductVariant
@@ -14,6 +14,9 @@ from .engagement import (
     Notification,
     LoggingUserAction,
     Recommendation,
+    ProductRatingStats,
+    EmailOutbox,
 )
+from .analytics import JobWatermark, ActionRollupHourly, ProductCoPurchase, ProductSimilarity
 
 # from .vnpay import PaymentTransaction # Check if this exists later, assume yes for now if logical
\ No newline at end of file
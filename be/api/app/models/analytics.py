@@ -0,0 +1,80 @@
+import datetime
+from sqlalchemy import ForeignKey, String, DateTime, Integer, BigInteger, Float, SmallInteger, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import Mapped, mapped_column
+from .base import Base
+
+
+class JobWatermark(Base):
+    """Progress marker of an incremental batch job, one row per job"""
+
+    __tablename__ = "job_watermarks"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    watermark: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+class ActionRollupHourly(Base):
+    """
+    Count of logged actions per hour, action type and product.
+
+    product_id is 0 for actions whose metadata carries no product_id.
+    It is not a foreign key so history survives product deletion.
+    """
+
+    __tablename__ = "action_rollups_hourly"
+
+    bucket: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True
+    )
+    action_type: Mapped[str] = mapped_column(String(255), primary_key=True)
+    product_id: Mapped[int] = mapped_column(Integer, primary_key=True, default=0)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class ProductCoPurchase(Base):
+    """
+    Top K products most often bought together with a product, recomputed
+    periodically from order_items (see CoPurchaseService).
+
+    lift = P(both) / (P(product) * P(related)); above 1 means the pair is
+    bought together more often than chance.
+    """
+
+    __tablename__ = "product_co_purchases"
+
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="cascade"), primary_key=True
+    )
+    related_product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="cascade"), primary_key=True
+    )
+    co_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    lift: Mapped[float] = mapped_column(Float, nullable=False)
+    rank: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+
+
+Index("ix_product_co_purchases_rank", ProductCoPurchase.product_id, ProductCoPurchase.rank)
+
+
+class ProductSimilarity(Base):
+    """
+    Nearest neighbours of each product by item-item cosine similarity,
+    written by full recommendation runs and read by incremental ones
+    (see RecommendationService).
+    """
+
+    __tablename__ = "product_similarities"
+
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="cascade"), primary_key=True
+    )
+    similar_product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="cascade"), primary_key=True
+    )
+    score: Mapped[float] = mapped_column(Float, nullable=False)
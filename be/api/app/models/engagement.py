@@ -11,9 +11,12 @@ from sqlalchemy import (
     Enum as SQLEnum,
     JSON,
     UniqueConstraint,
+    Index,
+    DDL,
+    event,
 )
 from sqlalchemy.sql import func
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, backref
 from .base import Base
 
 
@@ -24,6 +27,14 @@ class NotificationType(enum.Enum):
     PROMOTION = "promotion"
 
 
+class EmailStatus(enum.Enum):
+    PENDING = "pending"
+    # Claimed by an outbox worker until next_attempt_at (the lease)
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
 class Feedback(Base):
     __tablename__ = "feedback"
     __table_args__ = (
@@ -49,6 +60,52 @@ class Feedback(Base):
     )
 
 
+Index(
+    "ix_feedback_product_recent",
+    Feedback.product_id,
+    Feedback.created_at.desc(),
+    Feedback.id.desc(),
+)
+Index(
+    "ix_feedback_product_rating",
+    Feedback.product_id,
+    Feedback.rating.desc(),
+    Feedback.created_at.desc(),
+    Feedback.id.desc(),
+)
+
+
+class ProductRatingStats(Base):
+    """Running rating aggregates per product, maintained with each review"""
+
+    __tablename__ = "product_rating_stats"
+
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="cascade"), primary_key=True
+    )
+    rating_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_1: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_2: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_3: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_4: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_5: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_avg: Mapped[float] = mapped_column(Float, nullable=True)
+
+    product: Mapped["Product"] = relationship(
+        "Product", backref=backref("rating_stats", uselist=False, lazy="selectin")
+    )
+
+
+# Walked from the top by the rating sort of the product list
+Index(
+    "ix_product_rating_stats_rank",
+    ProductRatingStats.rating_avg.desc().nulls_last(),
+    ProductRatingStats.rating_count.desc(),
+    ProductRatingStats.product_id,
+)
+
+
 class Notification(Base):
     __tablename__ = "notifications"
 
@@ -72,8 +129,65 @@ class Notification(Base):
     )
 
 
+# Unread counts only touch the (small) unread part of the table
+Index(
+    "ix_notifications_unread_user",
+    Notification.user_id,
+    postgresql_where=Notification.is_read == False,
+)
+Index("ix_notifications_user_recent", Notification.user_id, Notification.id.desc())
+
+# Publish new notifications on the "notifications" channel so each
+# worker's PgListener can push them to connected clients. One NOTIFY per
+# statement and message, listing up to 150 (id, user_id) recipients: a
+# price alert to many wishlists must not queue one NOTIFY per row. Content
+# is cut to stay well under the 8000 byte NOTIFY payload limit.
+event.listen(Notification.__table__, "after_create", DDL("""
+    CREATE OR REPLACE FUNCTION notify_notification_insert() RETURNS trigger AS $$
+    DECLARE
+        batch record;
+    BEGIN
+        FOR batch IN
+            SELECT title, content, type, is_read, created_at,
+                   json_agg(json_build_array(id, user_id) ORDER BY id) AS recipients
+            FROM (
+                SELECT id, user_id, title, left(content, 1000) AS content,
+                       lower(type::text) AS type, is_read, created_at,
+                       (row_number() OVER (
+                           PARTITION BY title, content, type, is_read, created_at ORDER BY id
+                       ) - 1) / 150 AS chunk
+                FROM new_rows
+            ) numbered
+            GROUP BY title, content, type, is_read, created_at, chunk
+        LOOP
+            PERFORM pg_notify('notifications', json_build_object(
+                'title', batch.title,
+                'content', batch.content,
+                'type', batch.type,
+                'is_read', batch.is_read,
+                'created_at', batch.created_at,
+                'recipients', batch.recipients
+            )::text);
+        END LOOP;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""))
+event.listen(Notification.__table__, "after_create", DDL("""
+    CREATE TRIGGER notifications_notify_insert
+    AFTER INSERT ON notifications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_notification_insert()
+"""))
+
+
 class LoggingUserAction(Base):
+    """
+    Clickstream log, range-partitioned by month on created_at so old months
+    are dropped as whole partitions (see PartitionService).
+    """
     __tablename__ = "logging_user_actions"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(
@@ -81,15 +195,30 @@ class LoggingUserAction(Base):
     )
     action_type: Mapped[str] = mapped_column(String(255), nullable=False)
     metadata_action: Mapped[dict] = mapped_column(JSON, nullable=True)
+    # Part of the primary key: Postgres requires the partition key in it
     created_at: Mapped[datetime.datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
+        DateTime(timezone=True), primary_key=True, server_default=func.now()
     )
 
     user: Mapped["User"] = relationship("User", backref="actions", lazy="selectin")
 
 
+# Rows arrive in created_at order, so a BRIN index keeps time-range scans
+# (analytics rollups) cheap at a fraction of a btree's size and write cost
+Index("ix_logging_user_actions_created_brin", LoggingUserAction.created_at, postgresql_using="brin")
+
+# Catch-all for rows outside the monthly partitions
+event.listen(LoggingUserAction.__table__, "after_create", DDL(
+    "CREATE TABLE logging_user_actions_default "
+    "PARTITION OF logging_user_actions DEFAULT"
+))
+
+
 class Recommendation(Base):
     __tablename__ = "recommendations"
+    __table_args__ = (
+        UniqueConstraint("user_id", "product_id", name="uq_user_product_recommendation"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(
@@ -129,3 +258,44 @@ class Wishlist(Base):
     product: Mapped["Product"] = relationship(
         "Product", backref="in_wishlists", lazy="selectin"
     )
+
+
+# Fan-out by product (price-drop alerts); the unique key leads with user_id
+Index("ix_wishlist_product_id", Wishlist.product_id)
+
+
+class EmailOutbox(Base):
+    """
+    Emails waiting for asynchronous delivery by the outbox worker.
+
+    Rows are enqueued in bulk with INSERT ... SELECT and rendered at send
+    time from a template name and its context.
+    """
+
+    __tablename__ = "email_outbox"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    to_email: Mapped[str] = mapped_column(String(255), nullable=False)
+    template: Mapped[str] = mapped_column(String(50), nullable=False)
+    context: Mapped[dict] = mapped_column(JSON, nullable=False)
+    status: Mapped[EmailStatus] = mapped_column(
+        SQLEnum(EmailStatus, name="email_status"),
+        default=EmailStatus.PENDING,
+        nullable=False,
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    next_attempt_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    sent_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+Index(
+    "ix_email_outbox_due",
+    EmailOutbox.next_attempt_at,
+    postgresql_where=EmailOutbox.status.in_([EmailStatus.PENDING, EmailStatus.SENDING]),
+)
@@ -1,5 +1,7 @@
+import datetime
 from typing import List
 from sqlalchemy import (
+    DateTime,
     ForeignKey,
     String,
     Text,
@@ -9,6 +11,7 @@ from sqlalchemy import (
     UniqueConstraint,
     JSON
 )
+from sqlalchemy.sql import func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base import Base
 
@@ -89,3 +92,19 @@ class ProductIngredient(Base):
     ingredient: Mapped["Ingredient"] = relationship(
         back_populates="product_ingredients", lazy="selectin"
     )
+
+
+class ProductPriceHistory(Base):
+    """Every price change of a product, written by ProductService.update_product"""
+
+    __tablename__ = "product_price_history"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="cascade"), nullable=False, index=True
+    )
+    old_price: Mapped[float] = mapped_column(Float, nullable=False)
+    new_price: Mapped[float] = mapped_column(Float, nullable=False)
+    changed_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
@@ -8,6 +8,8 @@ from sqlalchemy import (
     Boolean,
     Text,
     UniqueConstraint,
+    LargeBinary,
+    Index,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base import Base
@@ -30,8 +32,9 @@ class User(Base):
     addresses: Mapped[List["Address"]] = relationship(
         back_populates="user", cascade="save-update, merge", lazy="selectin"
     )
+    # Can grow to MAX_SESSIONS_PER_USER rows: query SessionService instead
     sessions: Mapped[List["Session"]] = relationship(
-        back_populates="user", cascade="save-update, merge", lazy="selectin"
+        back_populates="user", cascade="save-update, merge", lazy="raise", passive_deletes=True
     )
     user_roles: Mapped[List["UserRole"]] = relationship(
         back_populates="user", cascade="save-update, merge", lazy="selectin"
@@ -63,9 +66,15 @@ class Address(Base):
 
 class Session(Base):
     __tablename__ = "sessions"
+    __table_args__ = (
+        # Per-user cap and the expired-session sweeper
+        Index("ix_sessions_user_id", "user_id", "id"),
+        Index("ix_sessions_expired_at", "expired_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    refresh_token: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
+    # sha256 of the refresh token; the token itself is never stored
+    token_hash: Mapped[bytes] = mapped_column(LargeBinary(32), unique=True, nullable=False)
     device_info: Mapped[str] = mapped_column(String(255), nullable=False)
     expired_at: Mapped[datetime.datetime] = mapped_column(
         DateTime(timezone=True), nullable=False
@@ -75,7 +84,7 @@ class Session(Base):
         ForeignKey("users.id", ondelete="cascade"), nullable=False
     )
 
-    user: Mapped["User"] = relationship(back_populates="sessions", lazy="selectin")
+    user: Mapped["User"] = relationship(back_populates="sessions", lazy="raise")
 
 
 class Role(Base):
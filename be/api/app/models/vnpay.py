@@ -1,7 +1,10 @@
+import logging
 import hashlib
 import hmac
 import urllib.parse
 
+logger = logging.getLogger(__name__)
+
 class vnpay:
     responseData = {}
 
@@ -43,8 +46,7 @@ class vnpay:
                     hasData = str(key) + '=' + urllib.parse.quote_plus(str(val))
         hashValue = self.__hmacsha512(self.secret_key, hasData)
 
-        print(
-            'Validate debug, HashData:' + hasData + "\n HashValue:" + hashValue + "\nInputHash:" + vnp_SecureHash)
+        logger.debug("VNPay response hash check: data=%s computed=%s received=%s", hasData, hashValue, vnp_SecureHash)
 
         return vnp_SecureHash == hashValue
 
@@ -1,5 +1,6 @@
-from typing import List
-from fastapi import APIRouter, Depends
+import datetime
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -7,9 +8,15 @@ from app.core.dependencies import get_db, get_current_admin_user
 from app.models.user import User
 from app.models.order import Order
 from app.models.engagement import Feedback, LoggingUserAction
-from app.schemas.user import UserOut, UserAdminOut
+from app.schemas.user import UserOut, UserAdminOut, SessionUserIds
 from app.schemas.order import OrderOut
-from app.schemas.engagement import FeedbackOut, LoggingActionOut
+from app.schemas.engagement import FeedbackOut, LoggingActionOut, ActionCountOut
+from app.services.analytics_service import AnalyticsService
+from app.services.notification_hub import notification_hub
+from app.services.pg_listener import pg_listener
+from app.services.login_throttle import login_throttle
+from app.services.session_service import SessionService
+from app.core import security
 
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
@@ -49,3 +56,64 @@ async def get_all_logs(
 ):
     result = await session.execute(select(LoggingUserAction))
     return result.scalars().all()
+
+
+@router.get("/analytics/actions", response_model=List[ActionCountOut])
+async def get_action_analytics(
+    start_ms: int = Query(..., description="Range start, epoch milliseconds (inclusive)"),
+    end_ms: int = Query(..., description="Range end, epoch milliseconds (exclusive)"),
+    granularity: Literal["hour", "day"] = Query("hour"),
+    action_type: Optional[str] = Query(None),
+    product_id: Optional[int] = Query(None),
+    by_product: bool = Query(False, description="Break counts down per product"),
+    session: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Action counts from the hourly rollups
+
+    Buckets are returned as epoch milliseconds. The most recent minutes
+    are not rolled up yet (see ACTION_ROLLUP_LAG_SECONDS).
+    """
+    if end_ms <= start_ms:
+        raise HTTPException(status_code=400, detail="end_ms must be after start_ms")
+    start = datetime.datetime.fromtimestamp(start_ms / 1000, tz=datetime.timezone.utc)
+    end = datetime.datetime.fromtimestamp(end_ms / 1000, tz=datetime.timezone.utc)
+    return await AnalyticsService.get_action_counts(
+        session, start, end, granularity, action_type, product_id, by_product
+    )
+
+
+@router.get("/notifications/stream-stats")
+async def get_notification_stream_stats(
+    current_user: User = Depends(get_current_admin_user),
+):
+    """Connection gauge of this worker's notification stream"""
+    return {
+        "connections": notification_hub.connections,
+        "dropped_events": notification_hub.dropped,
+        "listener_connected": pg_listener.connected,
+    }
+
+
+@router.get("/auth/login-throttle-stats")
+async def get_login_throttle_stats(
+    current_user: User = Depends(get_current_admin_user),
+):
+    """Login attempts admitted and shed by this worker since startup"""
+    return {
+        **login_throttle.counters,
+        "backend": type(login_throttle.backend).__name__,
+        "hash_jobs_pending": security.hash_jobs_pending,
+    }
+
+
+@router.post("/sessions/revoke")
+async def revoke_user_sessions(
+    data: SessionUserIds,
+    session: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """Force-logout users: deletes all their sessions and rejects their access tokens"""
+    revoked = await SessionService.revoke_users(data.user_ids, session)
+    return {"revoked": len(revoked)}
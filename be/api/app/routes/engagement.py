@@ -1,19 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from typing import List
+from sqlalchemy import select, update, func, and_
+from sqlalchemy.orm import noload
+from typing import List, Optional, Literal
 
-from app.core.dependencies import get_db, get_current_user
+from app.core.dependencies import (
+    AsyncSessionLocal, get_db, get_current_user, get_settings,
+    decode_access_token_claims, revoked_sessions, session_user_query,
+)
 from app.models.user import User
-from app.models.engagement import Feedback, Notification, LoggingUserAction, Recommendation, Wishlist
+from app.models.engagement import Feedback, Notification, Recommendation, Wishlist
 from app.schemas.engagement import (
-    FeedbackCreate, FeedbackOut,
-    NotificationOut,
-    LoggingActionCreate, LoggingActionOut,
+    FeedbackCreate, FeedbackOut, ReviewPage, RatingSummaryOut,
+    NotificationOut, NotificationIds, UnreadCountOut,
+    LoggingActionCreate, LoggingActionBatch,
     RecommendationOut,
-    WishlistCreate, WishlistOut
+    WishlistCreate, WishlistOut, WishlistProductIds, WishlistProductIdsOut
 )
-from app.services.utils import commit_to_db
+from app.services.action_log_buffer import action_log_buffer
+from app.services.notification_hub import notification_hub
+from app.services.rating_service import RatingService
+from app.services.review_service import ReviewService
+from app.services.wishlist_service import WishlistService
+from app.services.utils import commit_to_db, flush_to_db
 
 router = APIRouter(tags=["Engagement"])
 
@@ -25,37 +36,160 @@ async def create_feedback(data: FeedbackCreate, db: AsyncSession = Depends(get_d
         **data.model_dump()
     )
     db.add(new_feedback)
+    await flush_to_db(db)
+    # Keep the product's rating stats in the same transaction
+    await RatingService.apply_rating_change(db, data.product_id, added=data.rating)
     await commit_to_db(db)
+    ReviewService.invalidate(data.product_id)
     await db.refresh(new_feedback)
     return new_feedback
 
-@router.get("/products/{product_id}/feedback", response_model=List[FeedbackOut])
-async def get_product_feedback(product_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Feedback).where(Feedback.product_id == product_id))
-    return result.scalars().all()
+@router.get("/products/{product_id}/feedback", response_model=ReviewPage)
+async def get_product_feedback(
+    product_id: int,
+    sort: Literal["newest", "rating"] = "newest",
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        return await ReviewService.get_reviews(product_id, sort, limit, cursor, db)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/products/{product_id}/feedback/summary", response_model=RatingSummaryOut)
+async def get_product_feedback_summary(product_id: int, db: AsyncSession = Depends(get_db)):
+    return await ReviewService.get_summary(product_id, db)
 
 # --- Notifications ---
 @router.get("/notifications", response_model=List[NotificationOut])
-async def get_my_notifications(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    result = await db.execute(select(Notification).where(Notification.user_id == current_user.id).order_by(Notification.created_at.desc()))
+async def get_my_notifications(
+    limit: int = Query(50, ge=1, le=100),
+    before_id: Optional[int] = Query(None, description="Return notifications older than this id"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    query = select(Notification).where(Notification.user_id == current_user.id)
+    if before_id is not None:
+        query = query.where(Notification.id < before_id)
+    result = await db.execute(query.order_by(Notification.id.desc()).limit(limit))
     return result.scalars().all()
 
+@router.get("/notifications/unread-count", response_model=UnreadCountOut)
+async def get_unread_count(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    # Served by the partial index ix_notifications_unread_user
+    result = await db.execute(
+        select(func.count()).select_from(Notification).where(
+            and_(Notification.user_id == current_user.id, Notification.is_read == False)
+        )
+    )
+    return {"unread": result.scalar_one()}
+
+@router.get("/notifications/stream")
+async def stream_notifications(
+    token: Optional[str] = Query(None, description="Access token, for clients that cannot send headers (EventSource)"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    settings: dict = Depends(get_settings),
+):
+    """
+    Server-sent events stream of new notifications
+
+    Sends an `event: notification` per new notification and a comment
+    heartbeat while idle. Missed events can be fetched via GET /notifications.
+    The stream closes (`event: close`) when the access token expires or its
+    session is revoked; reconnect with a fresh token.
+    """
+    raw_token = credentials.credentials if credentials else token
+    if not raw_token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    claims = decode_access_token_claims(raw_token, settings)
+
+    async def find_user_id() -> Optional[int]:
+        # Short-lived session: the stream must not hold a pooled connection
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(session_user_query(claims, User.id))
+            return result.scalar_one_or_none()
+
+    async def is_active() -> bool:
+        if "sid" in claims and revoked_sessions.get(claims["sid"]) is not None:
+            return False
+        return await find_user_id() is not None
+
+    user_id = await find_user_id()
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+
+    return StreamingResponse(
+        notification_hub.stream(user_id, expires_at=claims.get("exp"), is_active=is_active),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/notifications/mark-all-read")
+async def mark_all_notifications_read(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    result = await db.execute(
+        update(Notification)
+        .where(and_(Notification.user_id == current_user.id, Notification.is_read == False))
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    await commit_to_db(db)
+    return {"message": "Marked as read", "updated": result.rowcount}
+
+@router.post("/notifications/mark-read")
+async def mark_notifications_read(data: NotificationIds, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    result = await db.execute(
+        update(Notification)
+        .where(and_(
+            Notification.user_id == current_user.id,
+            Notification.id.in_(data.ids),
+            Notification.is_read == False,
+        ))
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    await commit_to_db(db)
+    return {"message": "Marked as read", "updated": result.rowcount}
+
 @router.put("/notifications/{id}/read")
 async def mark_notification_read(id: int, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    result = await db.execute(select(Notification).where(and_(Notification.id == id, Notification.user_id == current_user.id)))
-    notif = result.scalar_one_or_none()
-    if not notif:
+    result = await db.execute(
+        update(Notification)
+        .where(and_(Notification.id == id, Notification.user_id == current_user.id))
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Notification not found")
-    notif.is_read = True
     await commit_to_db(db)
     return {"message": "Marked as read"}
 
 # --- Wishlist ---
 @router.get("/wishlist", response_model=List[WishlistOut])
 async def get_wishlist(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    result = await db.execute(select(Wishlist).where(Wishlist.user_id == current_user.id))
+    # WishlistOut has no nested objects; skip the eager user/product graphs
+    result = await db.execute(
+        select(Wishlist)
+        .options(noload(Wishlist.user), noload(Wishlist.product))
+        .where(Wishlist.user_id == current_user.id)
+    )
     return result.scalars().all()
 
+@router.post("/wishlist/contains", response_model=WishlistProductIdsOut)
+async def wishlist_contains(data: WishlistProductIds, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Which of the given products are in the wishlist (for listing pages)"""
+    return {"product_ids": await WishlistService.contains(current_user.id, data.product_ids, db)}
+
+@router.post("/wishlist/bulk", response_model=WishlistProductIdsOut)
+async def add_many_to_wishlist(data: WishlistProductIds, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Add several products; returns the ids actually added"""
+    return {"product_ids": await WishlistService.add_many(current_user.id, data.product_ids, db)}
+
+@router.post("/wishlist/bulk-remove", response_model=WishlistProductIdsOut)
+async def remove_many_from_wishlist(data: WishlistProductIds, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Remove several products; returns the ids actually removed"""
+    return {"product_ids": await WishlistService.remove_many(current_user.id, data.product_ids, db)}
+
 @router.post("/wishlist", response_model=WishlistOut)
 async def add_to_wishlist(data: WishlistCreate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
     # Check if exists
@@ -66,6 +200,7 @@ async def add_to_wishlist(data: WishlistCreate, db: AsyncSession = Depends(get_d
     item = Wishlist(user_id=current_user.id, product_id=data.product_id)
     db.add(item)
     await commit_to_db(db)
+    WishlistService.invalidate(current_user.id)
     await db.refresh(item)
     return item
 
@@ -76,6 +211,7 @@ async def remove_from_wishlist(product_id: int, db: AsyncSession = Depends(get_d
     if item:
         await db.delete(item)
         await commit_to_db(db)
+        WishlistService.invalidate(current_user.id)
     return {"message": "Removed from wishlist"}
 
 # --- Recommendations ---
@@ -86,12 +222,13 @@ async def get_recommendations(db: AsyncSession = Depends(get_db), current_user:
 
 # --- Logging ---
 @router.post("/logs")
-async def log_action(data: LoggingActionCreate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    log = LoggingUserAction(
-        user_id=current_user.id,
-        action_type=data.action_type,
-        metadata_action=data.metadata_action
-    )
-    db.add(log)
-    await commit_to_db(db)
+async def log_action(data: LoggingActionCreate, current_user: User = Depends(get_current_user)):
+    action_log_buffer.add(current_user.id, data.action_type, data.metadata_action)
     return {"message": "Logged"}
+
+@router.post("/logs/batch", status_code=202)
+async def log_actions_batch(data: LoggingActionBatch, current_user: User = Depends(get_current_user)):
+    """Buffer a batch of actions; they are written asynchronously in bulk"""
+    for event in data.events:
+        action_log_buffer.add(current_user.id, event.action_type, event.metadata_action)
+    return {"message": "Logged", "count": len(data.events)}
@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.core.dependencies import get_db
-from app.schemas.catalog import IngredientCreate, IngredientOut
+from app.schemas.catalog import IngredientCreate, IngredientUpdate, IngredientOut
 from app.services.ingredient_service import IngredientService
 
 router = APIRouter(prefix="/catalog/ingredients", tags=["Ingredients"])
@@ -51,6 +51,31 @@ async def get_ingredient(
     return ingredient
 
 
+@router.put("/{ingredient_id}", response_model=IngredientOut)
+async def update_ingredient(
+    ingredient_id: int,
+    data: IngredientUpdate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Update an ingredient"""
+    # Check if new name conflicts
+    if data.name:
+        existing = await IngredientService.get_ingredient_by_name(data.name, db)
+        if existing and existing.id != ingredient_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Ingredient with name '{data.name}' already exists"
+            )
+
+    ingredient = await IngredientService.update_ingredient(ingredient_id, data, db)
+    if not ingredient:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Ingredient with id {ingredient_id} not found"
+        )
+    return ingredient
+
+
 @router.patch("/{ingredient_id}/stock")
 async def update_ingredient_stock(
     ingredient_id: int,
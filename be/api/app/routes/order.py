@@ -1,3 +1,4 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, Request, Body
 from fastapi.responses import RedirectResponse, JSONResponse
 from datetime import datetime, timedelta, timezone
@@ -18,10 +19,14 @@ from app.services.utils import commit_to_db
 from app.models.cart import Cart, CartItem
 from app.models.user import User, Address
 from app.services.email_service import EmailService
+from app.services.pricing_service import pricing_engine
+from app.services.inventory_service import InventoryService
 from typing import List
 
 router = APIRouter(prefix="/order", tags=["Order"])
 
+logger = logging.getLogger(__name__)
+
 
 @router.post("/payment_url", response_model=PaymentUrlOut)
 def payment_url(
@@ -52,8 +57,7 @@ def payment_url(
     # req["vnp_ExpireDate"] = (created_date + timedelta(minutes=int(vnpay_config["vnp_ExpiredDate"]))).strftime('%Y%m%d%H%M%S')
 
     payment_url = Vnpay.get_payment_url(req)
-    print(f"debug: request goc: {req}")
-    #  print(f"DEBUG: url: {url}")
+    logger.debug("VNPay payment request: %s", req)
     return PaymentUrlOut.model_validate(payment_url)
 
 
@@ -93,8 +97,9 @@ async def payment_return(
     except (ValueError, AttributeError):
         return "❌ Mã giao dịch không hợp lệ"
 
-    # Query order
-    result = await db.execute(select(Order).where(Order.id == order_id))
+    # Query order, locked until commit: a concurrent IPN for the same payment
+    # waits here and then sees PAID, so stock is deducted once
+    result = await db.execute(select(Order).where(Order.id == order_id).with_for_update())
     order = result.scalar_one_or_none()
 
     if not order:
@@ -110,8 +115,12 @@ async def payment_return(
         if payment_status == "00":
             order.status = Order_Status.PAID
             order.payment_status = Order_Payment_Status.PAID
+            # Deduct ingredient stock in the same transaction
+            low_stock = await InventoryService.consume_order_ingredients(order_id, db)
             await commit_to_db(db)
-            print(f"✅ [Payment Return] Order #{order_id} marked as PAID")
+            for event in low_stock:
+                logger.warning("Low stock: %s (%g %s left)", event["name"], event["remaining"], event["unit"])
+            logger.info("Payment return: order #%s marked as PAID", order_id)
             
             # Send confirmation email
             try:
@@ -171,19 +180,17 @@ async def payment_return(
                         items=email_items,
                         shipping_address=shipping_address
                     )
-                    print(f"📧 [Payment Return] Confirmation email sent to {order_with_details.user.email}")
+                    logger.info("Payment return: confirmation email sent for order #%s", order_id)
             except Exception as e:
                 # Don't let email failure affect payment confirmation
-                print(f"⚠️ [Payment Return] Failed to send email for Order #{order_id}: {str(e)}")
+                logger.warning("Payment return: failed to send email for order #%s: %s", order_id, e)
             
             return f"✅ Thanh toán thành công! Đơn hàng #{order_id} đã được xác nhận. Email xác nhận đã được gửi."
         else:
             order.status = Order_Status.CANCELLED
             order.payment_status = Order_Payment_Status.UNPAID
             await commit_to_db(db)
-            print(
-                f"❌ [Payment Return] Order #{order_id} payment failed, code: {payment_status}"
-            )
+            logger.info("Payment return: order #%s payment failed, code %s", order_id, payment_status)
             return f"❌ Thanh toán thất bại. Mã lỗi: {payment_status}"
     else:
         return f"✅ Đơn hàng #{order_id} đã được thanh toán trước đó."
@@ -225,8 +232,8 @@ async def payment_ipn(
     except (ValueError, AttributeError):
         return JSONResponse({"RspCode": "01", "Message": "Invalid TxnRef"})
 
-    # Query order
-    result = await db.execute(select(Order).where(Order.id == order_id))
+    # Query order, locked until commit (see payment_return)
+    result = await db.execute(select(Order).where(Order.id == order_id).with_for_update())
     order = result.scalar_one_or_none()
 
     if not order:
@@ -246,10 +253,15 @@ async def payment_ipn(
         # Payment success
         order.status = Order_Status.PAID
         order.payment_status = Order_Payment_Status.PAID
-        
+
+        # Deduct ingredient stock in the same transaction
+        low_stock = await InventoryService.consume_order_ingredients(order_id, db)
+
         # Commit to database first
         await commit_to_db(db)
-        print(f"✅ Payment Success for Order #{order_id}")
+        for event in low_stock:
+            logger.warning("Low stock: %s (%g %s left)", event["name"], event["remaining"], event["unit"])
+        logger.info("IPN: payment success for order #%s", order_id)
         
         # Send confirmation email asynchronously (don't block IPN response)
         try:
@@ -309,17 +321,17 @@ async def payment_ipn(
                     items=email_items,
                     shipping_address=shipping_address
                 )
-                print(f"📧 Confirmation email sent to {order_with_details.user.email}")
+                logger.info("IPN: confirmation email sent for order #%s", order_id)
         except Exception as e:
             # Don't let email failure affect IPN response
-            print(f"⚠️ Failed to send email for Order #{order_id}: {str(e)}")
+            logger.warning("IPN: failed to send email for order #%s: %s", order_id, e)
             
     else:
         # Payment failed
         order.status = Order_Status.CANCELLED
         order.payment_status = Order_Payment_Status.UNPAID
         await commit_to_db(db)
-        print(f"❌ Payment Failed for Order #{order_id}, Code: {payment_status}")
+        logger.info("IPN: payment failed for order #%s, code %s", order_id, payment_status)
 
     return JSONResponse({"RspCode": "00", "Message": "Confirm Success"})
 
@@ -369,17 +381,19 @@ async def create_order(
     # (Optional: Validate address_id belongs to user)
 
     # 3. Calculate Total
-    subtotal = 0.0
-    for item in cart.items:
-        # Assuming product loaded in cart items. If not, might need join.
-        # But lazy="selectin" in models helps.
-        # NOTE: item.product might rely on async loading if not careful.
-        # With selectin, it should be fine if committed.
-        if item.product:
-            subtotal += item.quantity * item.product.price
-        else:
-            # Should fetch product price
-            pass
+    # Base price plus configured ingredients, priced for the whole cart at once.
+    # Same checks as the price quote: inactive products and unknown
+    # ingredients are rejected, not silently skipped
+    try:
+        unit_prices = await pricing_engine.quote(
+            [(item.product_id, item.quantity, item.custom_configuration) for item in cart.items],
+            db,
+        )
+    except (LookupError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    subtotal = sum(
+        price * item.quantity for price, item in zip(unit_prices, cart.items)
+    )
 
     total_amount = subtotal  # + shipping fee logic?
 
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import get_db
+from app.schemas.catalog import PriceQuoteRequest, PriceQuoteOut, PriceQuoteLine
+from app.services.pricing_service import pricing_engine
+
+router = APIRouter(prefix="/catalog", tags=["Pricing"])
+
+
+@router.post("/price-quote", response_model=PriceQuoteOut)
+async def price_quote(
+    data: PriceQuoteRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Quote a batch of product configurations
+
+    - Unit price = product price + configured ingredient quantity x price_per_unit
+    - Accepts up to 1000 items per request
+    """
+    items = [(i.product_id, i.quantity, i.custom_configuration) for i in data.items]
+    try:
+        unit_prices = await pricing_engine.quote(items, db)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    lines = [
+        PriceQuoteLine(
+            product_id=item.product_id,
+            quantity=item.quantity,
+            unit_price=price,
+            line_total=round(price * item.quantity, 2),
+        )
+        for item, price in zip(data.items, unit_prices)
+    ]
+    return PriceQuoteOut(items=lines, total=round(sum(l.line_total for l in lines), 2))
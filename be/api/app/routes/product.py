@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import List, Optional, Literal
 
+from app.core.config import CO_PURCHASE_TOP_K
 from app.core.dependencies import get_db
-from app.schemas.catalog import ProductCreate, ProductUpdate, ProductOut
+from app.schemas.catalog import ProductCreate, ProductUpdate, ProductOut, BoughtTogetherOut
 from app.services.product_service import ProductService
 from app.services.category_service import CategoryService
 from app.services.cloudinary_service import CloudinaryService
+from app.services.co_purchase_service import CoPurchaseService
 
 router = APIRouter(prefix="/catalog/products", tags=["Products"])
 
@@ -50,7 +52,9 @@ async def create_product(
             detail=f"Category with id {data.category_id} not found"
         )
     
-    return await ProductService.create_product(data, db)
+    product = await ProductService.create_product(data, db)
+    ProductService.attach_nutrition([product])
+    return product
 
 
 @router.get("", response_model=List[ProductOut])
@@ -60,6 +64,10 @@ async def get_products(
     category_id: Optional[int] = None,
     search: Optional[str] = None,
     is_active: Optional[bool] = True,
+    tags_all: Optional[List[int]] = Query(None),
+    tags_any: Optional[List[int]] = Query(None),
+    tags_none: Optional[List[int]] = Query(None),
+    sort_by: Optional[Literal["rating"]] = None,
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -70,15 +78,25 @@ async def get_products(
     - **category_id**: Filter by category ID
     - **search**: Search in product name and description
     - **is_active**: Filter by active status (default: True)
+    - **tags_all**: Products having every one of these tag IDs
+    - **tags_any**: Products having at least one of these tag IDs
+    - **tags_none**: Products having none of these tag IDs
+    - **sort_by**: `rating` for best rated first
     """
-    return await ProductService.get_products(
+    products = await ProductService.get_products(
         skip=skip,
         limit=limit,
         category_id=category_id,
         search=search,
         is_active=is_active,
+        tags_all=tags_all,
+        tags_any=tags_any,
+        tags_none=tags_none,
+        sort_by=sort_by,
         db=db
     )
+    ProductService.attach_nutrition(products)
+    return products
 
 
 @router.get("/{product_id}", response_model=ProductOut)
@@ -93,9 +111,26 @@ async def get_product(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Product with id {product_id} not found"
         )
+    ProductService.attach_nutrition([product])
     return product
 
 
+@router.get("/{product_id}/bought-together", response_model=List[BoughtTogetherOut])
+async def get_bought_together(
+    product_id: int,
+    limit: int = Query(CO_PURCHASE_TOP_K, ge=1, le=CO_PURCHASE_TOP_K),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Products frequently bought together with this one
+
+    Precomputed periodically from orders and ranked by lift; empty until
+    the product has enough co-purchases. Only the top CO_PURCHASE_TOP_K
+    are stored, so limit cannot exceed it.
+    """
+    return await CoPurchaseService.get_bought_together(product_id, limit, db)
+
+
 @router.put("/{product_id}", response_model=ProductOut)
 async def update_product(
     product_id: int,
@@ -127,6 +162,7 @@ async def update_product(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Product with id {product_id} not found"
         )
+    ProductService.attach_nutrition([product])
     return product
 
 
@@ -1,17 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, Body
-from app.models.user import User, Session
-from app.schemas.user import UserCreate, UserLoginRequest, UserOut
-from app.core.dependencies import get_current_user, get_db, get_settings, engine
+from fastapi import APIRouter, Depends, HTTPException, Request, Body, Query
+from typing import List, Optional
+from app.models.user import User
+from app.schemas.user import UserCreate, UserLoginRequest, UserOut, SessionOut
+from app.core.dependencies import get_current_user, get_db, get_settings, get_token_claims, engine
 from app.core.security import (
     hash_password,
-    verify_password,
+    verify_and_update_password,
     create_access_token,
-    create_refresh_token,
 )
 from app.services.utils import commit_to_db
+from app.services.session_service import SessionService
+from app.services.login_throttle import client_ip, login_throttle
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, text
 from datetime import datetime, timedelta, timezone
+import math
 import os
 from authlib.integrations.starlette_client import OAuth
 from starlette.responses import RedirectResponse
@@ -38,7 +41,7 @@ async def register_user(data: UserCreate, db: AsyncSession = Depends(get_db)):
             status_code=400, detail=f"Email {email} is already registered"
         )
 
-    hashed_password = hash_password(data.password)
+    hashed_password = await hash_password(data.password)
     new_user = User(
         fullname=data.fullname,
         email=data.email,
@@ -58,34 +61,36 @@ async def login_user(
     db: AsyncSession = Depends(get_db),
     settings: dict = Depends(get_settings),
 ):
-    user = await db.execute(select(User).where(User.email == data.email))
-    user = user.scalar_one_or_none()
-    if not user:
+    # Shed before touching the database or the hash pool
+    ip = client_ip(request)
+    retry_after = await login_throttle.check(ip, data.email)
+    if retry_after is not None:
         raise HTTPException(
-            status_code=404, detail="User email not found, please register"
+            status_code=429,
+            detail="Too many login attempts, please try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
         )
 
-    if not verify_password(data.password, user.password_hashed):
-        raise HTTPException(status_code=401, detail="Invalid password")
-
-    access_token: str = create_access_token(data={"sub": user.email}, settings=settings)
+    user = await db.execute(select(User).where(User.email == data.email))
+    user = user.scalar_one_or_none()
 
-    refresh_token: str = create_refresh_token(
-        data={"sub": user.email}, settings=settings
+    # Same error and hashing cost whether the email exists or not
+    verified, new_hash = await verify_and_update_password(
+        data.password, user.password_hashed if user else None
     )
+    if not verified:
+        login_throttle.record_failure()
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+    await login_throttle.record_success(ip, data.email)
+    if new_hash:
+        # BCRYPT_ROUNDS changed: committed together with the new session
+        user.password_hashed = new_hash
+
     device_info: str = request.headers.get("User-Agent", "unknown device")
-    expried_at: datetime = datetime.now(timezone.utc) + timedelta(
-        days=settings["REFRESH_TOKEN_EXPIRE_DAYS"]
-    )
-    new_session = Session(
-        refresh_token=refresh_token,
-        device_info=device_info,
-        expired_at=expried_at,
-        user_id=user.id,
+    session_id, refresh_token = await SessionService.create(user, device_info, db, settings)
+    access_token: str = create_access_token(
+        data={"sub": user.email, "sid": session_id}, settings=settings
     )
-    db.add(new_session)
-    await commit_to_db(db)
-    await db.refresh(new_session)
     return {
         "access_token": access_token,
         "token_type": "bearer",
@@ -99,10 +104,7 @@ async def refresh_token(
     db: AsyncSession = Depends(get_db),
     settings: dict = Depends(get_settings),
 ):
-    session = await db.execute(
-        select(Session).where(Session.refresh_token == refresh_token)
-    )
-    session = session.scalar_one_or_none()
+    session = await SessionService.get_by_token(refresh_token, db)
     if not session:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
 
@@ -114,7 +116,9 @@ async def refresh_token(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    new_access_token = create_access_token(data={"sub": user.email}, settings=settings)
+    new_access_token = create_access_token(
+        data={"sub": user.email, "sid": session.id}, settings=settings
+    )
 
     # new_refresh_token = create_refresh_token(data={"sub": user.email}, settings=settings)
     # session.refresh_token = new_refresh_token
@@ -130,21 +134,47 @@ async def logout(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    session_query = await db.execute(
-        select(Session).where(
-            and_(
-                Session.refresh_token == refresh_token,
-                Session.user_id == current_user.id,
-            )
-        )
-    )
-    session = session_query.scalar_one_or_none()
-    if session:
-        await db.delete(session)
-        await commit_to_db(db)
+    await SessionService.revoke(refresh_token, current_user.id, db)
     return {"message": "Logged out"}
 
 
+@router.get("/sessions", response_model=List[SessionOut])
+async def get_my_sessions(
+    limit: int = Query(20, ge=1, le=100),
+    before_id: Optional[int] = Query(None, description="Return sessions older than this id"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    claims: dict = Depends(get_token_claims),
+):
+    sessions = await SessionService.list_active(current_user.id, db, limit, before_id)
+    return [
+        SessionOut.model_validate(session).model_copy(update={"is_current": session.id == claims.get("sid")})
+        for session in sessions
+    ]
+
+
+@router.delete("/sessions", response_model=dict)
+async def revoke_my_other_sessions(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    claims: dict = Depends(get_token_claims),
+):
+    """Sign out every other device (all of them for tokens without a session id)"""
+    revoked = await SessionService.revoke_others(current_user.id, claims.get("sid"), db)
+    return {"message": "Signed out other sessions", "revoked": len(revoked)}
+
+
+@router.delete("/sessions/{session_id}", response_model=dict)
+async def revoke_my_session(
+    session_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if not await SessionService.revoke_by_id(session_id, current_user.id, db):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"message": "Session revoked"}
+
+
 @router.get("/me", response_model=UserOut)
 async def get_me(current_user: User = Depends(get_current_user)):
     return UserOut.model_validate(current_user)
@@ -200,22 +230,10 @@ async def google_callback(
             user.google_id = google_id
             await commit_to_db(db)
         
-        # Create tokens
-        access_token = create_access_token(data={"sub": user.email}, settings=settings)
-        refresh_token = create_refresh_token(data={"sub": user.email}, settings=settings)
-        
-        # Create session
+        # Create session and tokens
         device_info = request.headers.get("User-Agent", "Google OAuth")
-        expired_at = datetime.now(timezone.utc) + timedelta(days=settings["REFRESH_TOKEN_EXPIRE_DAYS"])
-        
-        new_session = Session(
-            refresh_token=refresh_token,
-            device_info=device_info,
-            expired_at=expired_at,
-            user_id=user.id
-        )
-        db.add(new_session)
-        await commit_to_db(db)
+        session_id, refresh_token = await SessionService.create(user, device_info, db, settings)
+        access_token = create_access_token(data={"sub": user.email, "sid": session_id}, settings=settings)
         
         # Redirect to frontend with tokens (or return JSON for API)
         frontend_url = os.getenv('FRONTEND_URL', 'http://localhost:3000')
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, computed_field, field_validator
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 
 # --- Category ---
 class CategoryBase(BaseModel):
@@ -42,6 +42,21 @@ class IngredientBase(BaseModel):
 class IngredientCreate(IngredientBase):
     pass
 
+class IngredientUpdate(BaseModel):
+    name: Optional[str] = Field(None, max_length=255)
+    unit: Optional[str] = Field(None, max_length=50)
+    price_per_unit: Optional[float] = None
+    calories_per_unit: Optional[float] = None
+    stock_quantity: Optional[float] = None
+
+    @field_validator("*")
+    @classmethod
+    def reject_null(cls, value):
+        # Fields may be left out, but every ingredient column is NOT NULL
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
 class IngredientOut(IngredientBase):
     id: int
     model_config = ConfigDict(from_attributes=True)
@@ -84,6 +99,12 @@ class Nutrition(BaseModel):
     fat: float
     fiber: Optional[float] = 0
 
+class NutritionRange(BaseModel):
+    """Calories per 100 units of product, computed from the recipe"""
+    calories_min: float
+    calories_max: float
+    calories_typical: float
+
 class ProductBase(BaseModel):
     name: str = Field(..., max_length=255)
     description: str
@@ -110,6 +131,18 @@ class ProductUpdate(BaseModel):
     category_id: Optional[int] = None
     nutritions: Optional[Nutrition] = None
     tags: Optional[List[int]] = None
+    ingredients: Optional[List[ProductIngredientCreate]] = None
+
+class RatingStatsOut(BaseModel):
+    rating_count: int
+    rating_sum: int
+    rating_1: int
+    rating_2: int
+    rating_3: int
+    rating_4: int
+    rating_5: int
+    rating_avg: Optional[float] = None
+    model_config = ConfigDict(from_attributes=True)
 
 class ProductOut(ProductBase):
     id: int
@@ -117,4 +150,46 @@ class ProductOut(ProductBase):
     # product_tags: List[TagOut] # logic might be needed to flatten
     variants: List[ProductVariantOut] = []
     ingredients: List[ProductIngredientOut] = []
+    rating_stats: Optional[RatingStatsOut] = Field(default=None, exclude=True)
+    # Filled in by ProductService.attach_nutrition
+    computed_nutrition: Optional[NutritionRange] = None
     model_config = ConfigDict(from_attributes=True)
+
+    @computed_field
+    def rating_average(self) -> Optional[float]:
+        if not self.rating_stats or self.rating_stats.rating_avg is None:
+            return None
+        return round(self.rating_stats.rating_avg, 2)
+
+    @computed_field
+    def rating_count(self) -> int:
+        return self.rating_stats.rating_count if self.rating_stats else 0
+
+
+class BoughtTogetherOut(BaseModel):
+    product_id: int
+    name: str
+    price: float
+    image_url: Optional[str] = None
+    co_count: int
+    lift: float
+
+
+# --- Price Quote ---
+class PriceQuoteItem(BaseModel):
+    product_id: int
+    quantity: int = Field(1, gt=0)
+    custom_configuration: Optional[Dict[str, Any]] = None
+
+class PriceQuoteRequest(BaseModel):
+    items: List[PriceQuoteItem] = Field(..., min_length=1, max_length=1000)
+
+class PriceQuoteLine(BaseModel):
+    product_id: int
+    quantity: int
+    unit_price: float
+    line_total: float
+
+class PriceQuoteOut(BaseModel):
+    items: List[PriceQuoteLine]
+    total: float
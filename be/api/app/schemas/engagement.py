@@ -24,6 +24,27 @@ class FeedbackOut(FeedbackBase):
     created_at: datetime
     model_config = ConfigDict(from_attributes=True)
 
+class ReviewAuthor(BaseModel):
+    id: int
+    fullname: str
+
+class ReviewOut(BaseModel):
+    id: int
+    rating: int
+    comment: Optional[str] = None
+    created_at: datetime
+    author: ReviewAuthor
+
+class ReviewPage(BaseModel):
+    items: List[ReviewOut]
+    next_cursor: Optional[str] = None
+
+class RatingSummaryOut(BaseModel):
+    product_id: int
+    rating_count: int
+    rating_average: Optional[float] = None
+    histogram: Dict[int, int]
+
 # --- Notification ---
 class NotificationBase(BaseModel):
     title: str = Field(..., max_length=255)
@@ -40,17 +61,32 @@ class NotificationOut(NotificationBase):
     created_at: datetime
     model_config = ConfigDict(from_attributes=True)
 
+class NotificationIds(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=500)
+
+class UnreadCountOut(BaseModel):
+    unread: int
+
 # --- Logging ---
 class LoggingActionCreate(BaseModel):
     action_type: str
     metadata_action: Optional[Dict[str, Any]] = None
 
+class LoggingActionBatch(BaseModel):
+    events: List[LoggingActionCreate] = Field(..., min_length=1, max_length=500)
+
 class LoggingActionOut(LoggingActionCreate):
     id: int
     user_id: int
     created_at: datetime
     model_config = ConfigDict(from_attributes=True)
 
+class ActionCountOut(BaseModel):
+    bucket_ms: int
+    action_type: str
+    product_id: Optional[int] = None
+    count: int
+
 # --- Recommendation ---
 class RecommendationOut(BaseModel):
     id: int
@@ -71,3 +107,9 @@ class WishlistOut(WishlistBase):
     user_id: int
     created_at: datetime
     model_config = ConfigDict(from_attributes=True)
+
+class WishlistProductIds(BaseModel):
+    product_ids: List[int] = Field(..., min_length=1, max_length=500)
+
+class WishlistProductIdsOut(BaseModel):
+    product_ids: List[int]
@@ -50,9 +50,13 @@ class SessionOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     id: int
-    refresh_token: str
     device_info: str
     expired_at: datetime
+    is_current: bool = False
+
+
+class SessionUserIds(BaseModel):
+    user_ids: List[int] = Field(..., min_length=1, max_length=500)
 
 
 class AddressBase(BaseModel):
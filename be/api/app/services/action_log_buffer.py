@@ -0,0 +1,130 @@
+import logging
+import asyncio
+import json
+from typing import List, Optional, Tuple
+import asyncpg
+from app.core.config import ACTION_LOG_BATCH_SIZE, ACTION_LOG_FLUSH_SECONDS, ACTION_LOG_MAX_PENDING
+from app.core.dependencies import engine
+
+logger = logging.getLogger(__name__)
+
+# created_at is left to the column default: now() of the COPY transaction,
+# so rows are stamped when written and rollups never see one arrive late
+_COLUMNS = ["user_id", "action_type", "metadata_action"]
+# Rejected for their content (a deleted user, a value that does not fit),
+# so retrying them can never succeed. ValueError covers asyncpg's client-side
+# encoding errors.
+_BAD_ROWS = (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError, ValueError)
+
+
+class ActionLogBuffer:
+    """
+    In-process buffer of user actions, written to logging_user_actions
+    with COPY when batch_size rows are pending or every flush_interval
+    seconds, whichever comes first.
+
+    Rows still buffered are flushed on graceful shutdown (lifespan) and
+    lost on a crash. If the database is unavailable, rows are kept up to
+    max_pending and the oldest are dropped beyond that. A batch the
+    database rejects for its content is split in halves until the bad
+    rows are isolated; those are dropped, the rest is written. Actions
+    are timed when written, up to flush_interval (longer while the
+    database is down) after they happened.
+    """
+
+    def __init__(self, batch_size: int = 500, flush_interval: float = 2.0, max_pending: int = 50000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.written = 0
+        self.dropped = 0
+        self._rows: List[Tuple] = []
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def add(self, user_id: int, action_type: str, metadata_action: Optional[dict] = None) -> None:
+        self._rows.append((
+            user_id,
+            action_type,
+            json.dumps(metadata_action) if metadata_action is not None else None,
+        ))
+        if len(self._rows) >= self.batch_size and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the timer and write out everything still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        await self.flush()
+
+    async def flush(self) -> int:
+        async with self._lock:
+            rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+            written = 0
+            batches = [rows]
+            while batches:
+                batch = batches.pop()
+                try:
+                    await self._copy(batch)
+                except _BAD_ROWS as e:
+                    if len(batch) > 1:
+                        middle = len(batch) // 2
+                        batches += [batch[middle:], batch[:middle]]
+                    else:
+                        self.dropped += 1
+                        user_id, action_type = batch[0][:2]
+                        logger.error(
+                            "Dropped an action log row the database rejected (user %s, %.64r): %s",
+                            user_id, action_type, e,
+                        )
+                    continue
+                except Exception as e:
+                    # Put what is left back in front of newer rows, within the cap
+                    unwritten = batch + [row for pending in reversed(batches) for row in pending]
+                    self._rows = unwritten + self._rows
+                    overflow = len(self._rows) - self.max_pending
+                    if overflow > 0:
+                        del self._rows[:overflow]
+                        self.dropped += overflow
+                    logger.warning("Flush of %d action log rows failed: %s", len(unwritten), e)
+                    break
+                written += len(batch)
+            self.written += written
+            return written
+
+    async def _copy(self, rows: List[Tuple]) -> None:
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                "logging_user_actions", records=rows, columns=_COLUMNS
+            )
+            await conn.commit()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+
+action_log_buffer = ActionLogBuffer(
+    batch_size=ACTION_LOG_BATCH_SIZE,
+    flush_interval=ACTION_LOG_FLUSH_SECONDS,
+    max_pending=ACTION_LOG_MAX_PENDING,
+)
@@ -0,0 +1,135 @@
+import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, text
+from sqlalchemy.dialects.postgresql import insert
+from typing import List, Optional
+from app.core.config import ACTION_ROLLUP_LAG_SECONDS
+from app.models.analytics import JobWatermark, ActionRollupHourly
+
+ACTION_ROLLUP_JOB = "action_rollups_hourly"
+# Advisory lock keys of the batch jobs, so one worker runs each at a time
+ACTION_ROLLUP_LOCK_KEY = 835_001
+
+ROLLUP_ACTIONS = text("""
+    INSERT INTO action_rollups_hourly (bucket, action_type, product_id, count)
+    SELECT date_trunc('hour', created_at),
+           action_type,
+           CASE WHEN metadata_action->>'product_id' ~ '^[0-9]{1,9}$'
+                THEN (metadata_action->>'product_id')::integer
+                ELSE 0 END,
+           count(*)
+    FROM logging_user_actions
+    WHERE created_at >= coalesce(CAST(:lower AS timestamptz), '-infinity')
+      AND created_at < :upper
+    GROUP BY 1, 2, 3
+    ON CONFLICT (bucket, action_type, product_id)
+    DO UPDATE SET count = action_rollups_hourly.count + EXCLUDED.count
+""")
+
+
+async def try_job_lock(db: AsyncSession, key: int) -> bool:
+    """Transaction-scoped advisory lock; False if another worker holds it"""
+    result = await db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": key})
+    return result.scalar_one()
+
+
+async def get_watermark(db: AsyncSession, name: str) -> Optional[datetime.datetime]:
+    result = await db.execute(select(JobWatermark.watermark).where(JobWatermark.name == name))
+    return result.scalar_one_or_none()
+
+
+async def set_watermark(db: AsyncSession, name: str, value: datetime.datetime) -> None:
+    stmt = insert(JobWatermark).values(name=name, watermark=value)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[JobWatermark.name],
+        set_={"watermark": stmt.excluded.watermark, "updated_at": func.now()},
+    )
+    await db.execute(stmt)
+
+
+class AnalyticsService:
+    """Service layer for pre-aggregated action analytics"""
+
+    @staticmethod
+    async def rollup_actions(db: AsyncSession) -> Optional[datetime.datetime]:
+        """
+        Fold actions logged since the last run into action_rollups_hourly
+
+        Covers [watermark, now - lag) in one transaction with the watermark
+        update, so every row is counted once. created_at is set by the
+        inserting transaction (see ActionLogBuffer), so no row can commit
+        behind the watermark once the lag has passed. Returns the new watermark, or
+        None if another worker is already running the job.
+        """
+        if not await try_job_lock(db, ACTION_ROLLUP_LOCK_KEY):
+            await db.rollback()
+            return None
+
+        lower = await get_watermark(db, ACTION_ROLLUP_JOB)
+        upper = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+            seconds=ACTION_ROLLUP_LAG_SECONDS
+        )
+        if lower is not None and upper <= lower:
+            await db.rollback()
+            return lower
+
+        await db.execute(ROLLUP_ACTIONS, {"lower": lower, "upper": upper})
+        await set_watermark(db, ACTION_ROLLUP_JOB, upper)
+        await db.commit()
+        return upper
+
+    @staticmethod
+    async def rebuild_action_rollups(db: AsyncSession, since: Optional[datetime.datetime] = None) -> Optional[datetime.datetime]:
+        """Recompute rollups from the hour of `since` (everything if None)"""
+        await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ACTION_ROLLUP_LOCK_KEY})
+        query = delete(ActionRollupHourly)
+        if since is not None:
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=datetime.timezone.utc)
+            since = since.replace(minute=0, second=0, microsecond=0)
+            query = query.where(ActionRollupHourly.bucket >= since)
+            await set_watermark(db, ACTION_ROLLUP_JOB, since)
+        else:
+            await db.execute(delete(JobWatermark).where(JobWatermark.name == ACTION_ROLLUP_JOB))
+        await db.execute(query)
+        # Same session, so the rollup re-acquires the lock and commits both
+        return await AnalyticsService.rollup_actions(db)
+
+    @staticmethod
+    async def get_action_counts(
+        db: AsyncSession,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        granularity: str = "hour",
+        action_type: Optional[str] = None,
+        product_id: Optional[int] = None,
+        by_product: bool = False,
+    ) -> List[dict]:
+        """Action counts per bucket from the rollups, for buckets in [start, end)"""
+        rollup = ActionRollupHourly
+        bucket = rollup.bucket if granularity == "hour" else func.date_trunc("day", rollup.bucket)
+        keys = [bucket.label("bucket"), rollup.action_type]
+        if by_product or product_id is not None:
+            keys.append(rollup.product_id)
+
+        query = (
+            select(*keys, func.sum(rollup.count).label("count"))
+            .where(rollup.bucket >= start, rollup.bucket < end)
+            .group_by(*keys)
+            .order_by(*keys)
+        )
+        if action_type is not None:
+            query = query.where(rollup.action_type == action_type)
+        if product_id is not None:
+            query = query.where(rollup.product_id == product_id)
+
+        rows = (await db.execute(query)).all()
+        return [
+            {
+                "bucket_ms": int(row.bucket.timestamp() * 1000),
+                "action_type": row.action_type,
+                "product_id": row.product_id if len(keys) == 3 else None,
+                "count": int(row.count),
+            }
+            for row in rows
+        ]
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import logging
+import secrets
+from typing import Iterable, Set
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from app.core.dependencies import AsyncSessionLocal
+from app.services.cache import caches
+from app.services.nutrition_service import nutrition_engine
+from app.services.pricing_service import pricing_engine
+from app.services.tag_index_service import tag_index
+
+logger = logging.getLogger(__name__)
+
+# Channel that carries changed catalog ids to every worker
+CATALOG_CHANNEL = "catalog_changes"
+# Tells this worker's own notifications apart: it refreshed already
+_ORIGIN = secrets.token_hex(8)
+
+
+class CatalogSync:
+    """
+    Keeps the in-memory catalog engines of every worker in step with the
+    database.
+
+    A write refreshes its own worker's engines directly and publishes the
+    changed ids on CATALOG_CHANNEL in its transaction; the other workers
+    reload those ids when the NOTIFY arrives (at commit). A worker whose
+    listener reconnects may have missed changes, so it rebuilds instead.
+    The same message can name TTL caches that every other worker clears.
+    """
+
+    _tasks: Set[asyncio.Task] = set()
+
+    @staticmethod
+    async def publish(
+        db: AsyncSession,
+        ingredient_ids: Iterable[int] = (),
+        product_ids: Iterable[int] = (),
+        cache_names: Iterable[str] = (),
+    ) -> None:
+        """Queue a NOTIFY for these ids and caches; delivered when db commits"""
+        payload = {
+            "origin": _ORIGIN,
+            "ingredients": sorted(set(ingredient_ids)),
+            "products": sorted(set(product_ids)),
+            "caches": sorted(set(cache_names)),
+        }
+        await db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": CATALOG_CHANNEL, "payload": json.dumps(payload)},
+        )
+
+    @staticmethod
+    async def rebuild(db: AsyncSession) -> None:
+        """Load every engine from scratch"""
+        await nutrition_engine.rebuild(db)
+        await pricing_engine.rebuild(db)
+        await tag_index.rebuild(db)
+
+    @staticmethod
+    async def apply(message: dict) -> None:
+        async with AsyncSessionLocal() as db:
+            await nutrition_engine.refresh_ingredients(message["ingredients"], db)
+            await pricing_engine.refresh_ingredients(message["ingredients"], db)
+            await nutrition_engine.refresh_products(message["products"], db)
+            await tag_index.refresh_products(message["products"], db)
+
+    @staticmethod
+    def handle_change(payload: str) -> None:
+        """PgListener callback for CATALOG_CHANNEL"""
+        message = json.loads(payload)
+        if message["origin"] == _ORIGIN:
+            return
+        for name in message.get("caches", ()):
+            if name in caches:
+                caches[name].clear()
+        if message["ingredients"] or message["products"]:
+            CatalogSync._spawn(CatalogSync.apply(message))
+
+    @staticmethod
+    def handle_reconnect() -> None:
+        """PgListener reconnect callback"""
+        CatalogSync._spawn(CatalogSync._rebuild_in_session())
+
+    @staticmethod
+    async def _rebuild_in_session() -> None:
+        async with AsyncSessionLocal() as db:
+            await CatalogSync.rebuild(db)
+
+    @staticmethod
+    def _spawn(job) -> None:
+        task = asyncio.create_task(job)
+        CatalogSync._tasks.add(task)
+        task.add_done_callback(CatalogSync._done)
+
+    @staticmethod
+    def _done(task: asyncio.Task) -> None:
+        CatalogSync._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Catalog refresh failed: %s", task.exception(), exc_info=task.exception())
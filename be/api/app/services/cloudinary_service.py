@@ -1,8 +1,11 @@
+import logging
 import cloudinary.uploader
 from fastapi import UploadFile, HTTPException
 from typing import Optional
 import os
 
+logger = logging.getLogger(__name__)
+
 class CloudinaryService:
     
     @staticmethod
@@ -77,5 +80,5 @@ class CloudinaryService:
             result = cloudinary.uploader.destroy(public_id)
             return result.get("result") == "ok"
         except Exception as e:
-            print(f"Delete failed: {str(e)}")
+            logger.warning("Cloudinary delete of %s failed: %s", public_id, e)
             return False
\ No newline at end of file
@@ -0,0 +1,118 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, text
+from typing import List, Optional
+from app.core.config import CO_PURCHASE_TOP_K, CO_PURCHASE_MIN_COUNT, CO_PURCHASE_WINDOW_DAYS
+from app.models.analytics import ProductCoPurchase
+from app.models.product import Product
+from app.services.analytics_service import try_job_lock
+from app.services.catalog_sync import CatalogSync
+from app.services.cache import TTLCache
+
+CO_PURCHASE_LOCK_KEY = 835_003
+
+_bought_together = TTLCache("bought_together", maxsize=4096, ttl=600)
+
+# Every product pair sharing an order in the window, with its support and
+# lift, keeping the top_k pairs per product by lift
+REBUILD_CO_PURCHASES = text("""
+    WITH baskets AS (
+        SELECT DISTINCT oi.order_id, oi.product_id
+        FROM order_items oi
+        JOIN orders o ON o.id = oi.order_id
+        WHERE o.status <> 'CANCELLED'
+          AND o.created_at >= now() - make_interval(days => :window_days)
+    ),
+    total AS (
+        SELECT count(DISTINCT order_id)::double precision AS orders FROM baskets
+    ),
+    support AS (
+        SELECT product_id, count(*) AS orders FROM baskets GROUP BY product_id
+    ),
+    pairs AS (
+        SELECT a.product_id, b.product_id AS related_product_id, count(*) AS co_count
+        FROM baskets a
+        JOIN baskets b ON b.order_id = a.order_id AND b.product_id <> a.product_id
+        GROUP BY a.product_id, b.product_id
+        HAVING count(*) >= :min_count
+    ),
+    ranked AS (
+        SELECT p.product_id, p.related_product_id, p.co_count,
+               p.co_count * total.orders / (sa.orders * sb.orders) AS lift
+        FROM pairs p
+        JOIN support sa ON sa.product_id = p.product_id
+        JOIN support sb ON sb.product_id = p.related_product_id
+        CROSS JOIN total
+    )
+    INSERT INTO product_co_purchases (product_id, related_product_id, co_count, lift, rank)
+    SELECT product_id, related_product_id, co_count, lift, rank
+    FROM (
+        SELECT ranked.*, row_number() OVER (
+            PARTITION BY product_id
+            ORDER BY lift DESC, co_count DESC, related_product_id
+        ) AS rank
+        FROM ranked
+    ) top
+    WHERE rank <= :top_k
+""")
+
+
+class CoPurchaseService:
+    """Service layer for "frequently bought together" suggestions"""
+
+    @staticmethod
+    async def rebuild(db: AsyncSession) -> Optional[int]:
+        """
+        Recompute product_co_purchases in one transaction
+
+        Readers keep seeing the previous table until commit, when every
+        worker drops its cached suggestions. Returns the number of pairs
+        kept, or None if another worker holds the job lock.
+        """
+        if not await try_job_lock(db, CO_PURCHASE_LOCK_KEY):
+            await db.rollback()
+            return None
+        await db.execute(delete(ProductCoPurchase))
+        result = await db.execute(REBUILD_CO_PURCHASES, {
+            "window_days": CO_PURCHASE_WINDOW_DAYS,
+            "min_count": CO_PURCHASE_MIN_COUNT,
+            "top_k": CO_PURCHASE_TOP_K,
+        })
+        await CatalogSync.publish(db, cache_names=[_bought_together.name])
+        await db.commit()
+        _bought_together.clear()
+        return result.rowcount
+
+    @staticmethod
+    async def get_bought_together(product_id: int, limit: int, db: AsyncSession) -> List[dict]:
+        """Active products bought together with a product, best first (cached)"""
+        items = _bought_together.get(product_id)
+        if items is None:
+            result = await db.execute(
+                select(
+                    Product.id,
+                    Product.name,
+                    Product.price,
+                    Product.image_url,
+                    ProductCoPurchase.co_count,
+                    ProductCoPurchase.lift,
+                )
+                .join(Product, Product.id == ProductCoPurchase.related_product_id)
+                .where(
+                    ProductCoPurchase.product_id == product_id,
+                    Product.is_active == True,
+                )
+                .order_by(ProductCoPurchase.rank)
+            )
+            items = [
+                {
+                    "product_id": row.id,
+                    "name": row.name,
+                    "price": row.price,
+                    "image_url": row.image_url,
+                    "co_count": row.co_count,
+                    "lift": round(row.lift, 4),
+                }
+                for row in result
+            ]
+            _bought_together.set(product_id, items)
+        return items[:limit]
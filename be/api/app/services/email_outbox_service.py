@@ -0,0 +1,151 @@
+import logging
+import asyncio
+from sqlalchemy import text
+from typing import Optional
+from app.core.config import (
+    EMAIL_OUTBOX_BATCH_SIZE,
+    EMAIL_OUTBOX_CONCURRENCY,
+    EMAIL_OUTBOX_POLL_SECONDS,
+    EMAIL_OUTBOX_MAX_ATTEMPTS,
+    EMAIL_OUTBOX_LEASE_SECONDS,
+)
+from app.core.dependencies import AsyncSessionLocal
+from app.services.email_service import EmailService
+
+logger = logging.getLogger(__name__)
+
+# Template name -> EmailService method, called with the row's context
+TEMPLATES = {
+    "price_drop": "send_price_drop_email",
+}
+
+# Due rows, and SENDING rows whose lease ran out (their worker died),
+# are leased for :lease seconds; the attempt counts from the claim
+CLAIM_BATCH = text("""
+    UPDATE email_outbox
+    SET status = 'SENDING',
+        attempts = attempts + 1,
+        next_attempt_at = now() + make_interval(secs => :lease)
+    WHERE id IN (
+        SELECT id FROM email_outbox
+        WHERE status IN ('PENDING', 'SENDING') AND next_attempt_at <= now()
+        ORDER BY next_attempt_at
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, to_email, template, context, attempts
+""")
+
+MARK_SENT = text("""
+    UPDATE email_outbox
+    SET status = 'SENT', sent_at = now(), last_error = NULL
+    WHERE id = ANY(CAST(:ids AS integer[]))
+""")
+
+# Exponential backoff: 1, 2, 4, ... minutes, then FAILED
+MARK_FAILED = text("""
+    UPDATE email_outbox
+    SET last_error = :error,
+        status = CASE WHEN attempts >= :max_attempts
+                      THEN 'FAILED'::email_status ELSE 'PENDING'::email_status END,
+        next_attempt_at = now() + make_interval(mins => power(2, attempts - 1)::integer)
+    WHERE id = ANY(CAST(:ids AS integer[]))
+""")
+
+
+class EmailOutboxWorker:
+    """
+    Drains email_outbox in the background of every worker.
+
+    A batch is leased in a short transaction (status SENDING until
+    next_attempt_at, taken with FOR UPDATE SKIP LOCKED so workers never
+    wait on each other), sent with no transaction or connection held, and
+    its results recorded in a second short transaction. Rows of a worker
+    that dies mid-batch are retried once the lease expires. SMTP calls are
+    blocking and run in threads, at most `concurrency` at a time.
+    """
+
+    def __init__(
+        self, batch_size: int = 50, concurrency: int = 8, poll_interval: float = 5.0,
+        max_attempts: int = 5, lease: float = 900.0,
+    ):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self.sent = 0
+        self.failed = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def drain_once(self) -> int:
+        """Send one batch; returns the number of rows claimed"""
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(CLAIM_BATCH, {"limit": self.batch_size, "lease": self.lease})).all()
+            await db.commit()
+        if not rows:
+            return 0
+
+        email_service = EmailService()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send(row) -> bool:
+            method = TEMPLATES.get(row.template)
+            if method is None:
+                return False
+            async with semaphore:
+                return await asyncio.to_thread(
+                    getattr(email_service, method), row.to_email, **row.context
+                )
+
+        results = await asyncio.gather(*(send(row) for row in rows), return_exceptions=True)
+        sent = [row.id for row, ok in zip(rows, results) if ok is True]
+        failed = [row.id for row, ok in zip(rows, results) if ok is not True]
+
+        async with AsyncSessionLocal() as db:
+            if sent:
+                await db.execute(MARK_SENT, {"ids": sent})
+            if failed:
+                await db.execute(MARK_FAILED, {
+                    "ids": failed,
+                    "error": "send failed",
+                    "max_attempts": self.max_attempts,
+                })
+            await db.commit()
+
+        self.sent += len(sent)
+        self.failed += len(failed)
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                claimed = await self.drain_once()
+            except Exception as e:
+                logger.exception("Outbox drain failed: %s", e)
+                claimed = 0
+            # Keep going while there is a backlog
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+
+email_outbox_worker = EmailOutboxWorker(
+    batch_size=EMAIL_OUTBOX_BATCH_SIZE,
+    concurrency=EMAIL_OUTBOX_CONCURRENCY,
+    poll_interval=EMAIL_OUTBOX_POLL_SECONDS,
+    max_attempts=EMAIL_OUTBOX_MAX_ATTEMPTS,
+    lease=EMAIL_OUTBOX_LEASE_SECONDS,
+)
@@ -1,3 +1,4 @@
+import logging
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -5,6 +6,8 @@ from typing import Optional
 import os
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 
 class EmailService:
     """Service for sending emails via SMTP"""
@@ -57,11 +60,11 @@ class EmailService:
                 server.login(self.smtp_username, self.smtp_password)
                 server.send_message(message)
             
-            print(f"✅ Email sent successfully to {to_email}")
+            logger.info("Email sent to %s", to_email)
             return True
             
         except Exception as e:
-            print(f"❌ Failed to send email to {to_email}: {str(e)}")
+            logger.error("Failed to send email to %s: %s", to_email, e)
             return False
     
     def send_order_confirmation_email(
@@ -219,3 +222,75 @@ class EmailService:
         """
         
         return self.send_email(to_email, subject, html_content, plain_content)
+    
+    def send_price_drop_email(
+        self,
+        to_email: str,
+        product_id: int,
+        product_name: str,
+        old_price: float,
+        new_price: float
+    ) -> bool:
+        """
+        Tell a user that a product in their wishlist got cheaper
+        
+        Args:
+            to_email: Customer email
+            product_id: Product ID
+            product_name: Product name
+            old_price: Price before the change
+            new_price: Price after the change
+        
+        Returns:
+            True if sent successfully
+        """
+        subject = f"🔥 {product_name} đang giảm giá!"
+        discount = round((1 - new_price / old_price) * 100) if old_price else 0
+        
+        html_content = f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        </head>
+        <body style="margin: 0; padding: 0; font-family: Arial, sans-serif; background-color: #f4f4f4;">
+            <div style="max-width: 600px; margin: 20px auto; background-color: #ffffff; border-radius: 10px; overflow: hidden; box-shadow: 0 2px 5px rgba(0,0,0,0.1);">
+                
+                <!-- Header -->
+                <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 30px; text-align: center;">
+                    <h1 style="margin: 0; color: #ffffff; font-size: 28px;">Sản phẩm yêu thích đang giảm giá</h1>
+                </div>
+                
+                <!-- Body -->
+                <div style="padding: 30px;">
+                    <p style="font-size: 14px; color: #666; line-height: 1.6;">
+                        <strong>{product_name}</strong> trong danh sách yêu thích của bạn vừa giảm {discount}%.
+                    </p>
+                    <div style="background-color: #f8f9fa; padding: 20px; border-radius: 8px; margin: 20px 0; text-align: center;">
+                        <p style="margin: 0; color: #999; text-decoration: line-through;">{old_price:,.0f} ₫</p>
+                        <p style="margin: 5px 0 0 0; color: #667eea; font-weight: bold; font-size: 24px;">{new_price:,.0f} ₫</p>
+                    </div>
+                </div>
+                
+                <!-- Footer -->
+                <div style="background-color: #f8f9fa; padding: 20px; text-align: center; font-size: 12px; color: #999;">
+                    <p style="margin: 0 0 5px 0;">© 2025 E-Commerce Store. All rights reserved.</p>
+                    <p style="margin: 0;">Email này được gửi tự động, vui lòng không trả lời.</p>
+                </div>
+                
+            </div>
+        </body>
+        </html>
+        """
+        
+        plain_content = f"""
+        {product_name} đang giảm giá!
+        
+        Giá cũ: {old_price:,.0f} ₫
+        Giá mới: {new_price:,.0f} ₫ (-{discount}%)
+        
+        Mã sản phẩm: #{product_id}
+        """
+        
+        return self.send_email(to_email, subject, html_content, plain_content)
@@ -2,8 +2,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
 from app.models.ingredient import Ingredient
-from app.schemas.catalog import IngredientCreate
-from app.services.utils import commit_to_db
+from app.schemas.catalog import IngredientCreate, IngredientUpdate
+from app.services.nutrition_service import nutrition_engine
+from app.services.pricing_service import pricing_engine
+from app.services.catalog_sync import CatalogSync
+from app.services.utils import commit_to_db, flush_to_db
 
 
 class IngredientService:
@@ -14,8 +17,11 @@ class IngredientService:
         """Create a new ingredient"""
         new_ingredient = Ingredient(**data.model_dump())
         db.add(new_ingredient)
+        await flush_to_db(db)
+        await CatalogSync.publish(db, ingredient_ids=[new_ingredient.id])
         await commit_to_db(db)
         await db.refresh(new_ingredient)
+        await pricing_engine.refresh_ingredients([new_ingredient.id], db)
         return new_ingredient
 
     @staticmethod
@@ -40,6 +46,31 @@ class IngredientService:
         result = await db.execute(select(Ingredient).where(Ingredient.name == name))
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def update_ingredient(
+        ingredient_id: int,
+        data: IngredientUpdate,
+        db: AsyncSession
+    ) -> Optional[Ingredient]:
+        """Update an ingredient"""
+        ingredient = await IngredientService.get_ingredient_by_id(ingredient_id, db)
+        if not ingredient:
+            return None
+
+        update_data = data.model_dump(exclude_unset=True)
+        for key, value in update_data.items():
+            setattr(ingredient, key, value)
+
+        if update_data.keys() & {"price_per_unit", "calories_per_unit"}:
+            await CatalogSync.publish(db, ingredient_ids=[ingredient_id])
+        await commit_to_db(db)
+        await db.refresh(ingredient)
+        if "calories_per_unit" in update_data:
+            await nutrition_engine.refresh_ingredients([ingredient_id], db)
+        if "price_per_unit" in update_data:
+            await pricing_engine.refresh_ingredients([ingredient_id], db)
+        return ingredient
+
     @staticmethod
     async def update_ingredient_stock(
         ingredient_id: int,
@@ -64,5 +95,8 @@ class IngredientService:
             return False
 
         await db.delete(ingredient)
+        await CatalogSync.publish(db, ingredient_ids=[ingredient_id])
         await commit_to_db(db)
+        await nutrition_engine.refresh_ingredients([ingredient_id], db)
+        await pricing_engine.refresh_ingredients([ingredient_id], db)
         return True
@@ -0,0 +1,126 @@
+import logging
+from collections import defaultdict
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, text
+from typing import Dict, List, Optional
+from app.core.config import INGREDIENT_LOW_STOCK_THRESHOLD
+from app.models.order import OrderItem
+from app.models.product import ProductIngredient
+from app.services.pricing_service import parse_configuration
+
+logger = logging.getLogger(__name__)
+
+
+# Deduct every ingredient of an order at once. The second scan of
+# ingredients reads the pre-update snapshot, which gives the previous stock.
+CONSUME_INGREDIENTS = text("""
+    UPDATE ingredients AS i
+    SET stock_quantity = GREATEST(i.stock_quantity - u.quantity, 0)
+    FROM ingredients AS prev,
+         unnest(CAST(:ids AS integer[]), CAST(:quantities AS double precision[]))
+            AS u(id, quantity)
+    WHERE i.id = u.id AND prev.id = u.id AND u.quantity > 0
+    RETURNING i.id, i.name, i.unit, prev.stock_quantity AS previous,
+              i.stock_quantity AS remaining, u.quantity
+""")
+
+NOTIFY_ADMINS = text("""
+    INSERT INTO notifications (user_id, title, content, type, is_read, created_at)
+    SELECT ur.user_id, e.title, e.content, 'WARNING', false, now()
+    FROM user_roles AS ur
+    JOIN roles AS r ON r.id = ur.role_id
+    CROSS JOIN unnest(CAST(:titles AS text[]), CAST(:contents AS text[])) AS e(title, content)
+    WHERE r.name = 'admin'
+""")
+
+
+def _recipe_quantity(min_percentage: Optional[float], max_percentage: Optional[float]) -> float:
+    """Typical units per product unit; a missing bound falls back to the other"""
+    low = min_percentage if min_percentage is not None else max_percentage
+    high = max_percentage if max_percentage is not None else min_percentage
+    if low is None:
+        return 0.0
+    return (low + high) / 2
+
+
+class InventoryService:
+    """Service layer for ingredient stock consumption"""
+
+    @staticmethod
+    async def expand_order_ingredients(order_id: int, db: AsyncSession) -> Dict[int, float]:
+        """Total quantity of each ingredient used by an order (recipe + configuration)"""
+        items = (await db.execute(
+            select(OrderItem.product_id, OrderItem.quantity, OrderItem.custom_configuration)
+            .where(OrderItem.order_id == order_id)
+        )).all()
+        if not items:
+            return {}
+
+        recipes = (await db.execute(
+            select(
+                ProductIngredient.product_id,
+                ProductIngredient.ingredient_id,
+                ProductIngredient.min_percentage,
+                ProductIngredient.max_percentage,
+            ).where(ProductIngredient.product_id.in_({item.product_id for item in items}))
+        )).all()
+        recipe_by_product = defaultdict(list)
+        for r in recipes:
+            recipe_by_product[r.product_id].append(
+                (r.ingredient_id, _recipe_quantity(r.min_percentage, r.max_percentage))
+            )
+
+        usage: Dict[int, float] = defaultdict(float)
+        for item in items:
+            for ingredient_id, quantity in recipe_by_product[item.product_id]:
+                usage[ingredient_id] += quantity * item.quantity
+            try:
+                extras = parse_configuration(item.custom_configuration)
+            except ValueError as e:
+                # Configurations are validated at checkout; never block a paid order
+                logger.warning("Order #%s: %s", order_id, e)
+                extras = []
+            for ingredient_id, quantity in extras:
+                usage[ingredient_id] += quantity * item.quantity
+        return usage
+
+    @staticmethod
+    async def consume_order_ingredients(order_id: int, db: AsyncSession) -> List[dict]:
+        """
+        Deduct the ingredients used by an order with one bulk UPDATE
+
+        Runs in the caller's transaction. Stock is clamped at zero. Returns
+        a low-stock event for every ingredient that crossed
+        INGREDIENT_LOW_STOCK_THRESHOLD; admins are notified in one INSERT.
+        """
+        usage = await InventoryService.expand_order_ingredients(order_id, db)
+        if not usage:
+            return []
+
+        result = await db.execute(
+            CONSUME_INGREDIENTS,
+            {"ids": list(usage.keys()), "quantities": list(usage.values())},
+        )
+        threshold = INGREDIENT_LOW_STOCK_THRESHOLD
+        events = [
+            {
+                "ingredient_id": row.id,
+                "name": row.name,
+                "unit": row.unit,
+                "previous": row.previous,
+                "remaining": row.remaining,
+                "shortfall": max(row.quantity - row.previous, 0),
+            }
+            for row in result.all()
+            if row.previous >= threshold > row.remaining
+        ]
+
+        if events:
+            await db.execute(NOTIFY_ADMINS, {
+                "titles": [f"Low stock: {e['name']}" for e in events],
+                "contents": [
+                    f"{e['name']} dropped to {e['remaining']:g} {e['unit']} after order #{order_id}"
+                    for e in events
+                ],
+            })
+        return events
@@ -0,0 +1,213 @@
+import ipaddress
+import logging
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Union
+from fastapi import Request
+from app.core import security
+from app.core.config import (
+    LOGIN_THROTTLE_WINDOW_SECONDS,
+    LOGIN_THROTTLE_IP_LIMIT,
+    LOGIN_THROTTLE_ACCOUNT_IP_LIMIT,
+    LOGIN_THROTTLE_EMAIL_LIMIT,
+    LOGIN_MAX_PENDING_HASHES,
+    LOGIN_THROTTLE_REDIS_URL,
+    TRUSTED_PROXIES,
+)
+
+logger = logging.getLogger(__name__)
+
+ProxyNetworks = List[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]]
+
+
+def parse_proxies(value: str) -> ProxyNetworks:
+    """Networks of a comma-separated list of IPs and CIDRs"""
+    return [ipaddress.ip_network(entry.strip(), strict=False) for entry in value.split(",") if entry.strip()]
+
+
+_trusted_proxies = parse_proxies(TRUSTED_PROXIES)
+
+
+def _is_trusted(host: str, proxies: ProxyNetworks) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in proxies)
+
+
+def client_ip(request: Request, proxies: Optional[ProxyNetworks] = None) -> str:
+    """
+    IP of the client behind any trusted proxies
+
+    X-Forwarded-For is only read when the peer is a trusted proxy, and
+    from the right: each trusted proxy appends the address it got the
+    request from, so the first untrusted hop is the client. Anything
+    further left was written by the client itself.
+    """
+    proxies = _trusted_proxies if proxies is None else proxies
+    peer = request.client.host if request.client else "unknown"
+    if not _is_trusted(peer, proxies):
+        return peer
+    hops = [
+        hop.strip()
+        for header in request.headers.getlist("x-forwarded-for")
+        for hop in header.split(",")
+        if hop.strip()
+    ]
+    for hop in reversed(hops):
+        if not _is_trusted(hop, proxies):
+            return hop
+    return hops[0] if hops else peer
+
+
+class MemoryWindow:
+    """
+    Sliding-window attempt log per key, local to this worker.
+
+    Only admitted attempts are recorded, so a key holds at most `limit`
+    timestamps; the least recently used keys beyond max_keys are dropped.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._keys: "OrderedDict[str, deque]" = OrderedDict()
+
+    async def hit(self, key: str, limit: int, window: float) -> Optional[float]:
+        """Record an attempt; returns None if admitted, else seconds to wait"""
+        now = time.monotonic()
+        attempts = self._keys.get(key)
+        if attempts is None:
+            attempts = self._keys[key] = deque()
+        self._keys.move_to_end(key)
+        while attempts and attempts[0] <= now - window:
+            attempts.popleft()
+        if len(attempts) >= limit:
+            return attempts[0] + window - now
+        attempts.append(now)
+        while len(self._keys) > self.max_keys:
+            self._keys.popitem(last=False)
+        return None
+
+    async def reset(self, key: str) -> None:
+        self._keys.pop(key, None)
+
+
+# Same algorithm on a Redis sorted set, atomic across workers
+_REDIS_HIT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    return tostring(tonumber(oldest[2]) + window - now)
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('PEXPIRE', KEYS[1], math.ceil(window * 1000))
+return false
+"""
+
+
+class RedisWindow:
+    """Sliding-window attempt log shared by every worker (needs the redis package)"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self._hit = self._redis.register_script(_REDIS_HIT)
+
+    async def hit(self, key: str, limit: int, window: float) -> Optional[float]:
+        retry_after = await self._hit(
+            keys=[f"login-throttle:{key}"],
+            args=[time.time(), window, limit, uuid.uuid4().hex],
+        )
+        return None if retry_after is None else float(retry_after)
+
+    async def reset(self, key: str) -> None:
+        await self._redis.delete(f"login-throttle:{key}")
+
+
+class LoginThrottle:
+    """
+    Sheds login attempts before any password hashing: per client IP,
+    per account from one IP, per account, and while the hash pool is
+    saturated.
+
+    The shared backend fails open: if Redis is unreachable, logins are
+    only limited by the hash pool check.
+    """
+
+    def __init__(
+        self,
+        window: float,
+        ip_limit: int,
+        account_ip_limit: int,
+        email_limit: int,
+        max_pending_hashes: int,
+        redis_url: str = "",
+    ):
+        self.window = window
+        self.ip_limit = ip_limit
+        self.account_ip_limit = account_ip_limit
+        self.email_limit = email_limit
+        self.max_pending_hashes = max_pending_hashes
+        self.backend = RedisWindow(redis_url) if redis_url else MemoryWindow()
+        self.counters: Dict[str, int] = {
+            "admitted": 0,
+            "shed_ip": 0,
+            "shed_account_ip": 0,
+            "shed_email": 0,
+            "shed_busy": 0,
+            "failed": 0,
+            "backend_errors": 0,
+        }
+
+    async def check(self, ip: str, email: str) -> Optional[float]:
+        """Returns None if the attempt may go on, else a Retry-After in seconds"""
+        if security.hash_jobs_pending >= self.max_pending_hashes:
+            self.counters["shed_busy"] += 1
+            return 1.0
+        email = email.lower()
+        # Guessing at one account from one IP runs out before the account's
+        # own budget, which the owner shares
+        for kind, key, limit in (
+            ("ip", f"ip:{ip}", self.ip_limit),
+            ("account_ip", f"account-ip:{email}:{ip}", self.account_ip_limit),
+            ("email", f"email:{email}", self.email_limit),
+        ):
+            try:
+                retry_after = await self.backend.hit(key, limit, self.window)
+            except Exception as e:
+                self.counters["backend_errors"] += 1
+                logger.warning("Throttle backend unavailable: %s", e)
+                break
+            if retry_after is not None:
+                self.counters[f"shed_{kind}"] += 1
+                return max(retry_after, 1.0)
+        self.counters["admitted"] += 1
+        return None
+
+    def record_failure(self) -> None:
+        self.counters["failed"] += 1
+
+    async def record_success(self, ip: str, email: str) -> None:
+        """A correct password clears the account's attempts (not the IP's)"""
+        email = email.lower()
+        try:
+            await self.backend.reset(f"email:{email}")
+            await self.backend.reset(f"account-ip:{email}:{ip}")
+        except Exception as e:
+            self.counters["backend_errors"] += 1
+            logger.warning("Throttle backend unavailable: %s", e)
+
+
+login_throttle = LoginThrottle(
+    window=LOGIN_THROTTLE_WINDOW_SECONDS,
+    ip_limit=LOGIN_THROTTLE_IP_LIMIT,
+    account_ip_limit=LOGIN_THROTTLE_ACCOUNT_IP_LIMIT,
+    email_limit=LOGIN_THROTTLE_EMAIL_LIMIT,
+    max_pending_hashes=LOGIN_MAX_PENDING_HASHES,
+    redis_url=LOGIN_THROTTLE_REDIS_URL,
+)
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+from app.core.config import NOTIFICATION_STREAM_HEARTBEAT_SECONDS, NOTIFICATION_STREAM_QUEUE_SIZE
+
+# Channel the notifications insert trigger publishes to
+NOTIFICATION_CHANNEL = "notifications"
+
+
+class NotificationHub:
+    """
+    In-process fan-out of new notifications to connected SSE clients.
+
+    Each connection owns a bounded queue. A client that does not keep up
+    loses its oldest undelivered events instead of growing the queue;
+    it can resync through GET /notifications.
+    """
+
+    def __init__(self, queue_size: int = 100, heartbeat: float = 15.0):
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.connections = 0
+        self.dropped = 0
+        self._queues: Dict[int, Set[asyncio.Queue]] = {}
+
+    def connect(self, user_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._queues.setdefault(user_id, set()).add(queue)
+        self.connections += 1
+        return queue
+
+    def disconnect(self, user_id: int, queue: asyncio.Queue) -> None:
+        queues = self._queues.get(user_id)
+        if queues is None or queue not in queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._queues[user_id]
+        self.connections -= 1
+
+    def publish(self, user_id: int, event_id: int, data: str) -> None:
+        for queue in self._queues.get(user_id, ()):
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait((event_id, data))
+
+    def dispatch(self, payload: str) -> None:
+        """
+        PgListener callback: route a trigger payload to its users
+
+        A payload carries one message and the (id, user_id) pairs it was
+        sent to; only recipients connected to this worker cost an event.
+        """
+        message = json.loads(payload)
+        recipients = message.pop("recipients")
+        for notification_id, user_id in recipients:
+            if user_id in self._queues:
+                data = json.dumps({"id": notification_id, "user_id": user_id, **message})
+                self.publish(user_id, notification_id, data)
+
+    async def stream(
+        self,
+        user_id: int,
+        expires_at: Optional[float] = None,
+        is_active: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Server-sent events for one connection, with comment heartbeats
+
+        The stream ends with an `event: close` once expires_at (epoch
+        seconds) has passed, or when is_active(), checked on every
+        heartbeat, returns False.
+        """
+        queue = self.connect(user_id)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                timeout = self.heartbeat
+                if expires_at is not None:
+                    remaining = expires_at - time.time()
+                    if remaining <= 0:
+                        yield _close_event("expired")
+                        return
+                    timeout = min(timeout, remaining)
+                try:
+                    event_id, data = await asyncio.wait_for(queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    if timeout < self.heartbeat:
+                        # Woke up for expires_at: closed at the top of the loop
+                        continue
+                    if is_active is not None and not await is_active():
+                        yield _close_event("revoked")
+                        return
+                    yield ": ping\n\n"
+                    continue
+                yield f"id: {event_id}\nevent: notification\ndata: {data}\n\n"
+        finally:
+            self.disconnect(user_id, queue)
+
+
+def _close_event(reason: str) -> str:
+    return f"event: close\ndata: {json.dumps({'reason': reason})}\n\n"
+
+notification_hub = NotificationHub(
+    queue_size=NOTIFICATION_STREAM_QUEUE_SIZE,
+    heartbeat=NOTIFICATION_STREAM_HEARTBEAT_SECONDS,
+)
@@ -0,0 +1,207 @@
+import asyncio
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Dict, Iterable, Optional
+from app.models.ingredient import Ingredient
+from app.models.product import ProductIngredient
+
+
+class NutritionEngine:
+    """
+    In-memory nutrition table for the whole catalog.
+
+    Recipes are kept as a sparse products x ingredients matrix in coordinate
+    form (row, col, min %, max %). A percentage is read as units of the
+    ingredient per 100 units of product, so the calories of a product are
+    sum(percentage * calories_per_unit) over its recipe.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._product_index: Dict[int, int] = {}
+        self._ingredient_index: Dict[int, int] = {}
+        self._calories = np.zeros(0)
+        self._rows = np.zeros(0, dtype=np.int64)
+        self._cols = np.zeros(0, dtype=np.int64)
+        self._min_pct = np.zeros(0)
+        self._max_pct = np.zeros(0)
+        # One row per product: calories min, max, typical
+        self._values = np.zeros((0, 3))
+        self._has_recipe = np.zeros(0, dtype=bool)
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """Load every recipe and ingredient and compute the whole catalog"""
+        ingredients = (await db.execute(
+            select(Ingredient.id, Ingredient.calories_per_unit)
+        )).all()
+        recipes = (await db.execute(
+            select(
+                ProductIngredient.product_id,
+                ProductIngredient.ingredient_id,
+                ProductIngredient.min_percentage,
+                ProductIngredient.max_percentage,
+            )
+        )).all()
+
+        async with self._lock:
+            self._reset()
+            self._set_calories(ingredients)
+            self._append_recipes(recipes)
+            self._recompute(None)
+
+    async def refresh_products(self, product_ids: Iterable[int], db: AsyncSession) -> None:
+        """Reload the recipes of the given products and recompute only them"""
+        product_ids = list(set(product_ids))
+        if not product_ids:
+            return
+
+        recipes = (await db.execute(
+            select(
+                ProductIngredient.product_id,
+                ProductIngredient.ingredient_id,
+                ProductIngredient.min_percentage,
+                ProductIngredient.max_percentage,
+            ).where(ProductIngredient.product_id.in_(product_ids))
+        )).all()
+
+        # Recipes may reference ingredients created after the last rebuild
+        missing = {r.ingredient_id for r in recipes} - self._ingredient_index.keys()
+        ingredients = []
+        if missing:
+            ingredients = (await db.execute(
+                select(Ingredient.id, Ingredient.calories_per_unit)
+                .where(Ingredient.id.in_(missing))
+            )).all()
+
+        async with self._lock:
+            self._set_calories(ingredients)
+            rows = self._rows_for(product_ids)
+            keep = ~np.isin(self._rows, rows)
+            self._drop_entries(keep)
+            self._append_recipes(recipes)
+            self._recompute(rows)
+
+    async def refresh_ingredients(self, ingredient_ids: Iterable[int], db: AsyncSession) -> None:
+        """Reload the given ingredients and recompute the products that use them"""
+        ingredient_ids = list(set(ingredient_ids))
+        if not ingredient_ids:
+            return
+
+        ingredients = (await db.execute(
+            select(Ingredient.id, Ingredient.calories_per_unit)
+            .where(Ingredient.id.in_(ingredient_ids))
+        )).all()
+
+        async with self._lock:
+            self._set_calories(ingredients)
+            cols = np.array(
+                [self._ingredient_index[i] for i in ingredient_ids if i in self._ingredient_index],
+                dtype=np.int64,
+            )
+            touched = np.isin(self._cols, cols)
+            rows = np.unique(self._rows[touched])
+
+            # Deleted ingredients cascade to their recipe rows
+            deleted = set(ingredient_ids) - {i.id for i in ingredients}
+            if deleted:
+                deleted_cols = np.array(
+                    [self._ingredient_index[i] for i in deleted if i in self._ingredient_index],
+                    dtype=np.int64,
+                )
+                self._drop_entries(~np.isin(self._cols, deleted_cols))
+
+            self._recompute(rows)
+
+    def get(self, product_id: int) -> Optional[dict]:
+        """Precomputed calories for a product, None if it has no recipe"""
+        row = self._product_index.get(product_id)
+        if row is None or not self._has_recipe[row]:
+            return None
+        low, high, typical = self._values[row]
+        return {
+            "calories_min": round(float(low), 2),
+            "calories_max": round(float(high), 2),
+            "calories_typical": round(float(typical), 2),
+        }
+
+    def _set_calories(self, ingredients) -> None:
+        for ingredient_id, _ in ingredients:
+            if ingredient_id not in self._ingredient_index:
+                self._ingredient_index[ingredient_id] = len(self._ingredient_index)
+
+        size = len(self._ingredient_index)
+        if self._calories.shape[0] < size:
+            self._calories = np.concatenate(
+                [self._calories, np.zeros(size - self._calories.shape[0])]
+            )
+        for ingredient_id, calories in ingredients:
+            self._calories[self._ingredient_index[ingredient_id]] = calories
+
+    def _rows_for(self, product_ids: Iterable[int]) -> np.ndarray:
+        rows = []
+        for product_id in product_ids:
+            row = self._product_index.get(product_id)
+            if row is None:
+                row = len(self._product_index)
+                self._product_index[product_id] = row
+            rows.append(row)
+
+        size = len(self._product_index)
+        if self._values.shape[0] < size:
+            self._values = np.vstack([self._values, np.zeros((size - self._values.shape[0], 3))])
+            self._has_recipe = np.concatenate(
+                [self._has_recipe, np.zeros(size - self._has_recipe.shape[0], dtype=bool)]
+            )
+        return np.array(rows, dtype=np.int64)
+
+    def _append_recipes(self, recipes) -> None:
+        if not recipes:
+            return
+        rows = self._rows_for([r.product_id for r in recipes])
+        cols = np.array([self._ingredient_index[r.ingredient_id] for r in recipes], dtype=np.int64)
+        low = np.array([r.min_percentage for r in recipes], dtype=float)
+        high = np.array([r.max_percentage for r in recipes], dtype=float)
+
+        # A missing bound falls back to the other one, both missing count as 0
+        low = np.nan_to_num(np.where(np.isnan(low), high, low))
+        high = np.nan_to_num(np.where(np.isnan(high), low, high))
+
+        self._rows = np.concatenate([self._rows, rows])
+        self._cols = np.concatenate([self._cols, cols])
+        self._min_pct = np.concatenate([self._min_pct, low])
+        self._max_pct = np.concatenate([self._max_pct, high])
+
+    def _drop_entries(self, keep: np.ndarray) -> None:
+        self._rows = self._rows[keep]
+        self._cols = self._cols[keep]
+        self._min_pct = self._min_pct[keep]
+        self._max_pct = self._max_pct[keep]
+
+    def _recompute(self, rows: Optional[np.ndarray]) -> None:
+        """Sparse matrix-vector products for the given rows (all when None)"""
+        size = len(self._product_index)
+        if rows is None:
+            rows = np.arange(size)
+            entries = slice(None)
+        else:
+            entries = np.isin(self._rows, rows)
+        if rows.size == 0:
+            return
+
+        r = self._rows[entries]
+        calories = self._calories[self._cols[entries]]
+        low = np.bincount(r, weights=self._min_pct[entries] * calories, minlength=size)
+        high = np.bincount(r, weights=self._max_pct[entries] * calories, minlength=size)
+        count = np.bincount(r, minlength=size)
+
+        self._values[rows, 0] = low[rows]
+        self._values[rows, 1] = high[rows]
+        self._values[rows, 2] = (low[rows] + high[rows]) / 2
+        self._has_recipe[rows] = count[rows] > 0
+
+
+nutrition_engine = NutritionEngine()
@@ -0,0 +1,93 @@
+import datetime
+import re
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from typing import List
+
+ACTION_LOG_TABLE = "logging_user_actions"
+_PARTITION_NAME = re.compile(rf"^{ACTION_LOG_TABLE}_y(\d{{4}})m(\d{{2}})$")
+# Serializes partition DDL between workers starting at the same time
+_PARTITION_LOCK_KEY = 834_001
+
+
+def month_start(day: datetime.date, offset: int = 0) -> datetime.date:
+    """First day of the month `offset` months after `day`"""
+    months = day.year * 12 + day.month - 1 + offset
+    return datetime.date(months // 12, months % 12 + 1, 1)
+
+
+def partition_name(month: datetime.date) -> str:
+    return f"{ACTION_LOG_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+class PartitionService:
+    """Monthly partitions of logging_user_actions"""
+
+    @staticmethod
+    async def ensure_action_log_partitions(db: AsyncSession, months_ahead: int = 2, months_back: int = 0) -> List[str]:
+        """
+        Create the partitions of the current and next months_ahead months
+        (and of the months_back past months, for backfills)
+
+        Rows that already landed in the default partition for a new month
+        are moved into it, since Postgres refuses to attach a partition
+        that overlaps rows in the default one.
+        """
+        await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PARTITION_LOCK_KEY})
+        existing = set(await PartitionService._partitions(db))
+
+        created = []
+        today = datetime.date.today()
+        for offset in range(-months_back, months_ahead + 1):
+            start, end = month_start(today, offset), month_start(today, offset + 1)
+            name = partition_name(start)
+            if name in existing:
+                continue
+            bounds = {"start": start, "end": end}
+            await db.execute(text(
+                f"CREATE TABLE {name} (LIKE {ACTION_LOG_TABLE} INCLUDING DEFAULTS)"
+            ))
+            await db.execute(text(f"""
+                WITH moved AS (
+                    DELETE FROM {ACTION_LOG_TABLE}_default
+                    WHERE created_at >= :start AND created_at < :end
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+            """), bounds)
+            await db.execute(text(
+                f"ALTER TABLE {ACTION_LOG_TABLE} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            ))
+            created.append(name)
+
+        await db.commit()
+        return created
+
+    @staticmethod
+    async def drop_action_log_partitions(db: AsyncSession, keep_months: int) -> List[str]:
+        """Drop monthly partitions older than the last keep_months months"""
+        cutoff = month_start(datetime.date.today(), -keep_months)
+        await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PARTITION_LOCK_KEY})
+
+        dropped = []
+        for name in await PartitionService._partitions(db):
+            year, month = map(int, _PARTITION_NAME.match(name).groups())
+            if datetime.date(year, month, 1) < cutoff:
+                await db.execute(text(f"ALTER TABLE {ACTION_LOG_TABLE} DETACH PARTITION {name}"))
+                await db.execute(text(f"DROP TABLE {name}"))
+                dropped.append(name)
+
+        await db.commit()
+        return dropped
+
+    @staticmethod
+    async def _partitions(db: AsyncSession) -> List[str]:
+        result = await db.execute(text("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :table
+        """), {"table": ACTION_LOG_TABLE})
+        return sorted(name for name in result.scalars() if _PARTITION_NAME.match(name))
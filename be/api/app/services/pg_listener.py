@@ -0,0 +1,102 @@
+import logging
+import asyncio
+import asyncpg
+from typing import Callable, Dict, List, Optional
+from app.core.dependencies import get_settings, ctx
+
+logger = logging.getLogger(__name__)
+
+
+class PgListener:
+    """
+    One dedicated Postgres connection per worker that LISTENs on behalf of
+    in-process subscribers, so a NOTIFY from any worker reaches all of them.
+
+    The connection is re-established with backoff when it drops.
+    Notifications sent while it is down are lost, so subscribers must
+    treat them as hints, not as the source of truth. Subscribers that
+    cache state can register an on_reconnect callback to resync.
+    """
+
+    def __init__(self, max_backoff: float = 30.0):
+        self.max_backoff = max_backoff
+        self._callbacks: Dict[str, List[Callable[[str], None]]] = {}
+        self._reconnect_callbacks: List[Callable[[], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._listening = asyncio.Event()
+        self.connected = False
+
+    def subscribe(self, channel: str, callback: Callable[[str], None]) -> None:
+        """Register a (non-blocking) callback for a channel's payloads"""
+        self._callbacks.setdefault(channel, []).append(callback)
+
+    def on_reconnect(self, callback: Callable[[], None]) -> None:
+        """Register a (non-blocking) callback run after every reconnect but the first"""
+        self._reconnect_callbacks.append(callback)
+
+    async def wait_connected(self, timeout: float) -> bool:
+        """Wait until the first LISTEN is in place; False on timeout"""
+        try:
+            await asyncio.wait_for(self._listening.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _dispatch(self, connection, pid: int, channel: str, payload: str) -> None:
+        for callback in self._callbacks.get(channel, []):
+            try:
+                callback(payload)
+            except Exception as e:
+                logger.exception("Callback failed on channel %r: %s", channel, e)
+
+    def _resync(self) -> None:
+        for callback in self._reconnect_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.exception("Reconnect callback failed: %s", e)
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                conn = await asyncpg.connect(get_settings()["DATABASE_URL"], ssl=ctx)
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning("Connect failed, retrying in %gs: %s", backoff, e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+
+            lost = asyncio.Event()
+            conn.add_termination_listener(lambda _: lost.set())
+            try:
+                for channel in self._callbacks:
+                    await conn.add_listener(channel, self._dispatch)
+                self.connected = True
+                backoff = 1.0
+                if self._listening.is_set():
+                    self._resync()
+                self._listening.set()
+                await lost.wait()
+                logger.warning("Connection lost, reconnecting")
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning("Listen failed: %s", e)
+            finally:
+                self.connected = False
+                conn.terminate()
+
+
+pg_listener = PgListener()
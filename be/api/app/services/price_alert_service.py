@@ -0,0 +1,61 @@
+import json
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from app.models.product import Product, ProductPriceHistory
+
+# One statement each, whatever the number of wishlisting users; both are
+# served by ix_wishlist_product_id
+NOTIFY_WISHLISTS = text("""
+    INSERT INTO notifications (user_id, title, content, type, is_read, created_at)
+    SELECT w.user_id, :title, :content, 'PROMOTION', false, now()
+    FROM wishlist w
+    WHERE w.product_id = :product_id
+""")
+
+ENQUEUE_EMAILS = text("""
+    INSERT INTO email_outbox (to_email, template, context, status, attempts, next_attempt_at, created_at)
+    SELECT u.email, 'price_drop', CAST(:context AS json), 'PENDING', 0, now(), now()
+    FROM wishlist w
+    JOIN users u ON u.id = w.user_id
+    WHERE w.product_id = :product_id
+""")
+
+
+class PriceAlertService:
+    """Price history and price-drop alerts for wishlisted products"""
+
+    @staticmethod
+    async def record_price_change(
+        product: Product,
+        old_price: float,
+        db: AsyncSession
+    ) -> int:
+        """
+        Record a price change in the caller's transaction
+
+        On a drop of an active product, every user wishlisting it gets a
+        PROMOTION notification and a queued email. Returns the number of
+        users notified.
+        """
+        new_price = product.price
+        if new_price == old_price:
+            return 0
+        db.add(ProductPriceHistory(product_id=product.id, old_price=old_price, new_price=new_price))
+        if new_price > old_price or not product.is_active:
+            return 0
+
+        result = await db.execute(NOTIFY_WISHLISTS, {
+            "product_id": product.id,
+            "title": f"Giảm giá: {product.name}",
+            "content": f"{product.name} giảm từ {old_price:,.0f} ₫ còn {new_price:,.0f} ₫",
+        })
+        await db.execute(ENQUEUE_EMAILS, {
+            "product_id": product.id,
+            "context": json.dumps({
+                "product_id": product.id,
+                "product_name": product.name,
+                "old_price": old_price,
+                "new_price": new_price,
+            }),
+        })
+        return result.rowcount
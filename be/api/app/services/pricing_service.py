@@ -0,0 +1,131 @@
+import asyncio
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from app.models.ingredient import Ingredient
+from app.models.product import Product
+
+
+def parse_configuration(configuration: Optional[dict]) -> List[Tuple[int, float]]:
+    """
+    Extract (ingredient_id, quantity) pairs from a custom_configuration.
+
+    Expected shape: {"ingredients": [{"ingredient_id": 1, "quantity": 20}, ...]}.
+    Other keys are ignored, so configurations without ingredients are free.
+    """
+    if not configuration:
+        return []
+    entries = configuration.get("ingredients") or []
+    if not isinstance(entries, list):
+        raise ValueError("custom_configuration.ingredients must be a list")
+
+    pairs = []
+    for entry in entries:
+        try:
+            ingredient_id = int(entry["ingredient_id"])
+            quantity = float(entry.get("quantity", 1))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            raise ValueError(f"Invalid configured ingredient: {entry!r}")
+        if quantity < 0:
+            raise ValueError(f"Negative quantity for ingredient {ingredient_id}")
+        pairs.append((ingredient_id, quantity))
+    return pairs
+
+
+class PricingEngine:
+    """
+    In-memory ingredient price table used to price configured items.
+
+    The unit price of a line is the product base price plus
+    sum(quantity * price_per_unit) over its configured ingredients.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._index: Dict[int, int] = {}
+        self._prices = np.zeros(0)
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """Load the full ingredient price table"""
+        rows = (await db.execute(select(Ingredient.id, Ingredient.price_per_unit))).all()
+        async with self._lock:
+            self._index = {row.id: i for i, row in enumerate(rows)}
+            self._prices = np.array([row.price_per_unit for row in rows], dtype=float)
+
+    async def refresh_ingredients(self, ingredient_ids: Iterable[int], db: AsyncSession) -> None:
+        """Reload prices for the given ingredients, dropping deleted ones"""
+        ingredient_ids = set(ingredient_ids)
+        if not ingredient_ids:
+            return
+
+        rows = (await db.execute(
+            select(Ingredient.id, Ingredient.price_per_unit)
+            .where(Ingredient.id.in_(ingredient_ids))
+        )).all()
+
+        async with self._lock:
+            new_ids = [row.id for row in rows if row.id not in self._index]
+            if new_ids:
+                start = len(self._prices)
+                self._index.update({ingredient_id: start + i for i, ingredient_id in enumerate(new_ids)})
+                self._prices = np.concatenate([self._prices, np.full(len(new_ids), np.nan)])
+            for row in rows:
+                self._prices[self._index[row.id]] = row.price_per_unit
+            for ingredient_id in ingredient_ids - {row.id for row in rows}:
+                if ingredient_id in self._index:
+                    self._prices[self._index[ingredient_id]] = np.nan
+
+    def unit_prices(
+        self,
+        base_prices: Sequence[float],
+        configurations: Sequence[Optional[dict]],
+    ) -> List[float]:
+        """Price every line in one vectorized pass"""
+        lines, cols, quantities = [], [], []
+        for line, configuration in enumerate(configurations):
+            for ingredient_id, quantity in parse_configuration(configuration):
+                col = self._index.get(ingredient_id)
+                if col is None or np.isnan(self._prices[col]):
+                    raise ValueError(f"Unknown ingredient {ingredient_id}")
+                lines.append(line)
+                cols.append(col)
+                quantities.append(quantity)
+
+        extras = np.bincount(
+            np.array(lines, dtype=np.int64),
+            weights=np.array(quantities, dtype=float) * self._prices[np.array(cols, dtype=np.int64)],
+            minlength=len(base_prices),
+        )
+        prices = np.asarray(base_prices, dtype=float) + extras
+        return np.round(prices, 2).tolist()
+
+    async def quote(
+        self,
+        items: Sequence[Tuple[int, int, Optional[dict]]],
+        db: AsyncSession,
+    ) -> List[float]:
+        """
+        Unit prices for (product_id, quantity, custom_configuration) items.
+
+        Raises LookupError for unknown or inactive products and ValueError
+        for invalid configurations.
+        """
+        product_ids = {product_id for product_id, _, _ in items}
+        rows = (await db.execute(
+            select(Product.id, Product.price)
+            .where(Product.id.in_(product_ids), Product.is_active == True)
+        )).all()
+        base = {row.id: row.price for row in rows}
+
+        missing = product_ids - base.keys()
+        if missing:
+            raise LookupError(f"Products not found: {sorted(missing)}")
+
+        return self.unit_prices(
+            [base[product_id] for product_id, _, _ in items],
+            [configuration for _, _, configuration in items],
+        )
+
+
+pricing_engine = PricingEngine()
@@ -1,8 +1,14 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
-from typing import List, Optional
+from sqlalchemy import select, delete, exists, func, or_, any_, bindparam, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from typing import Iterable, List, Optional
 from app.models.product import Product, ProductTag, ProductIngredient
+from app.models.engagement import ProductRatingStats
 from app.schemas.catalog import ProductCreate, ProductUpdate
+from app.services.nutrition_service import nutrition_engine
+from app.services.price_alert_service import PriceAlertService
+from app.services.tag_index_service import tag_index
+from app.services.catalog_sync import CatalogSync
 from app.services.utils import commit_to_db
 
 
@@ -34,8 +40,15 @@ class ProductService:
                 )
                 db.add(product_ing)
 
+        await CatalogSync.publish(db, product_ids=[new_product.id])
         await commit_to_db(db)
-        await db.refresh(new_product)
+        tag_index.set_product_tags(new_product.id, data.tags or [])
+        # Reload from a clean identity map so new ProductIngredient rows
+        # come back with their ingredient eagerly loaded
+        db.expunge_all()
+        new_product = await ProductService.get_product_by_id(new_product.id, db)
+        if data.ingredients:
+            await nutrition_engine.refresh_products([new_product.id], db)
         return new_product
 
     @staticmethod
@@ -45,11 +58,24 @@ class ProductService:
         category_id: Optional[int] = None,
         search: Optional[str] = None,
         is_active: Optional[bool] = None,
+        tags_all: Optional[List[int]] = None,
+        tags_any: Optional[List[int]] = None,
+        tags_none: Optional[List[int]] = None,
+        sort_by: Optional[str] = None,
         db: AsyncSession = None
     ) -> List[Product]:
         """Get list of products with filters and pagination"""
         query = select(Product)
 
+        # Resolve tag filters from the in-memory index before querying
+        candidates = tag_index.candidates(tags_all, tags_any, tags_none)
+        if candidates is not None:
+            if candidates.size == 0:
+                return []
+            query = query.where(Product.id == any_(
+                bindparam("candidate_ids", candidates.tolist(), type_=ARRAY(Integer))
+            ))
+
         # Apply filters
         if category_id:
             query = query.where(Product.category_id == category_id)
@@ -63,9 +89,48 @@ class ProductService:
         if is_active is not None:
             query = query.where(Product.is_active == is_active)
 
+        if sort_by == "rating":
+            return await ProductService._get_products_by_rating(query, skip, limit, db)
+
         result = await db.execute(query.offset(skip).limit(limit))
         return result.scalars().all()
 
+    @staticmethod
+    async def _get_products_by_rating(query, skip: int, limit: int, db: AsyncSession) -> List[Product]:
+        """
+        Best rated products of query first, then those without reviews (no
+        stats row) by id
+
+        The reviewed part walks ix_product_rating_stats_rank and stops once
+        the page is full, instead of joining every product and sorting;
+        the unreviewed part is only read when the reviewed ones run out.
+        """
+        stats = ProductRatingStats
+        reviewed = query.join(stats, stats.product_id == Product.id)
+        result = await db.execute(
+            reviewed.order_by(stats.rating_avg.desc().nulls_last(), stats.rating_count.desc(), stats.product_id)
+            .offset(skip).limit(limit)
+        )
+        products = list(result.scalars().all())
+        if len(products) == limit:
+            return products
+
+        # Offset into the unreviewed part: 0 if this page holds reviewed ones
+        if products:
+            skip = 0
+        elif skip:
+            count = select(func.count()).select_from(reviewed.subquery())
+            skip -= (await db.execute(count)).scalar_one()
+        unreviewed = query.where(~exists().where(stats.product_id == Product.id)).order_by(Product.id)
+        result = await db.execute(unreviewed.offset(skip).limit(limit - len(products)))
+        return products + list(result.scalars().all())
+
+    @staticmethod
+    def attach_nutrition(products: Iterable[Product]) -> None:
+        """Set computed_nutrition (for ProductOut) from the nutrition engine"""
+        for product in products:
+            product.computed_nutrition = nutrition_engine.get(product.id)
+
     @staticmethod
     async def get_product_by_id(product_id: int, db: AsyncSession) -> Optional[Product]:
         """Get a product by ID with all relations"""
@@ -90,9 +155,11 @@ class ProductService:
             return None
 
         # Update basic fields
-        update_data = data.model_dump(exclude={"tags"}, exclude_unset=True)
+        old_price = product.price
+        update_data = data.model_dump(exclude={"tags", "ingredients"}, exclude_unset=True)
         for key, value in update_data.items():
             setattr(product, key, value)
+        await PriceAlertService.record_price_change(product, old_price, db)
 
         # Update tags if provided
         if data.tags is not None:
@@ -111,8 +178,23 @@ class ProductService:
                 product_tag = ProductTag(product_id=product_id, tag_id=tag_id)
                 db.add(product_tag)
 
+        # Replace the recipe if provided
+        if data.ingredients is not None:
+            await db.execute(
+                delete(ProductIngredient).where(ProductIngredient.product_id == product_id)
+            )
+            for ing_data in data.ingredients:
+                db.add(ProductIngredient(product_id=product_id, **ing_data.model_dump()))
+
+        if data.tags is not None or data.ingredients is not None:
+            await CatalogSync.publish(db, product_ids=[product_id])
         await commit_to_db(db)
-        await db.refresh(product)
+        if data.tags is not None:
+            tag_index.set_product_tags(product_id, data.tags)
+        db.expunge_all()
+        product = await ProductService.get_product_by_id(product_id, db)
+        if data.ingredients is not None:
+            await nutrition_engine.refresh_products([product_id], db)
         return product
 
     @staticmethod
@@ -150,5 +232,8 @@ class ProductService:
             return False
 
         await db.delete(product)
+        await CatalogSync.publish(db, product_ids=[product_id])
         await commit_to_db(db)
+        tag_index.remove_product(product_id)
+        await nutrition_engine.refresh_products([product_id], db)
         return True
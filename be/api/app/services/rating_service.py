@@ -0,0 +1,72 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Float, cast, delete, func, text
+from sqlalchemy.dialects.postgresql import insert
+from typing import Optional
+from app.models.engagement import ProductRatingStats
+
+
+REBUILD_RATING_STATS = text("""
+    INSERT INTO product_rating_stats (
+        product_id, rating_count, rating_sum,
+        rating_1, rating_2, rating_3, rating_4, rating_5, rating_avg
+    )
+    SELECT product_id, count(*), sum(rating),
+           count(*) FILTER (WHERE rating = 1),
+           count(*) FILTER (WHERE rating = 2),
+           count(*) FILTER (WHERE rating = 3),
+           count(*) FILTER (WHERE rating = 4),
+           count(*) FILTER (WHERE rating = 5),
+           avg(rating)
+    FROM feedback
+    GROUP BY product_id
+""")
+
+
+class RatingService:
+    """Service layer for product rating aggregates"""
+
+    @staticmethod
+    async def apply_rating_change(
+        db: AsyncSession,
+        product_id: int,
+        added: Optional[int] = None,
+        removed: Optional[int] = None,
+    ) -> None:
+        """
+        Adjust the stats of a product in the caller's transaction
+
+        Pass added for a new review, removed for a deleted one and both
+        for an edited rating.
+        """
+        count = (added is not None) - (removed is not None)
+        total = (added or 0) - (removed or 0)
+        buckets = {f"rating_{r}": (added == r) - (removed == r) for r in range(1, 6)}
+        if count == 0 and total == 0:
+            return
+
+        stmt = insert(ProductRatingStats).values(
+            product_id=product_id,
+            rating_count=count,
+            rating_sum=total,
+            rating_avg=total / count if count > 0 else None,
+            **buckets,
+        )
+        stats = ProductRatingStats
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[stats.product_id],
+            set_={
+                "rating_count": stats.rating_count + count,
+                "rating_sum": stats.rating_sum + total,
+                "rating_avg": cast(stats.rating_sum + total, Float)
+                / func.nullif(stats.rating_count + count, 0),
+                **{name: getattr(stats, name) + delta for name, delta in buckets.items()},
+            },
+        )
+        await db.execute(stmt)
+
+    @staticmethod
+    async def rebuild_rating_stats(db: AsyncSession) -> None:
+        """Recompute every product's stats from the feedback table"""
+        await db.execute(delete(ProductRatingStats))
+        await db.execute(REBUILD_RATING_STATS)
+        await db.commit()
@@ -0,0 +1,295 @@
+import asyncio
+import datetime
+import numpy as np
+import scipy.sparse as sp
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, text
+from typing import Optional, Tuple
+from app.core.config import (
+    RECOMMENDATION_TOP_N,
+    RECOMMENDATION_NEIGHBOURS,
+    RECOMMENDATION_LOG_DAYS,
+    RECOMMENDATION_FULL_REFRESH_SECONDS,
+)
+from app.models.analytics import ProductSimilarity
+from app.services.analytics_service import try_job_lock, get_watermark, set_watermark
+
+RECOMMENDATION_JOB = "recommendations"
+# Watermark of the last full run, when the stored similarities were computed
+SIMILARITY_JOB = "recommendations_full"
+RECOMMENDATION_LOCK_KEY = 835_002
+WRITE_CHUNK = 1000
+SIMILARITY_WRITE_CHUNK = 50000
+# Entries per dense block when picking the top k of each row
+TOP_K_BLOCK_ELEMENTS = 1 << 20
+
+# Implicit feedback strength per (user, product); repeated signals are
+# damped with ln(1 + n). Ratings below 3 count as seen, not as interest.
+_INTERACTIONS = """
+    SELECT o.user_id, oi.product_id, 5.0 * ln(1 + count(*)) AS weight
+    FROM order_items oi
+    JOIN orders o ON o.id = oi.order_id
+    WHERE o.status <> 'CANCELLED'
+    GROUP BY o.user_id, oi.product_id
+    UNION ALL
+    SELECT user_id, product_id, 3.0 FROM wishlist
+    UNION ALL
+    SELECT user_id, product_id, greatest(rating - 2.0, 0) FROM feedback
+    UNION ALL
+    SELECT user_id, (metadata_action->>'product_id')::integer, ln(1 + count(*))
+    FROM logging_user_actions
+    WHERE created_at >= now() - make_interval(days => :log_days)
+      AND metadata_action->>'product_id' ~ '^[0-9]{1,9}$'
+    GROUP BY 1, 2
+"""
+INTERACTIONS = text(_INTERACTIONS)
+# The user filter is pushed down into every branch
+USER_INTERACTIONS = text(f"""
+    SELECT * FROM ({_INTERACTIONS}) interactions
+    WHERE user_id = ANY(CAST(:user_ids AS integer[]))
+""")
+
+ACTIVE_USERS = text("""
+    SELECT user_id FROM orders WHERE created_at >= :since
+    UNION SELECT user_id FROM wishlist WHERE created_at >= :since
+    UNION SELECT user_id FROM feedback WHERE created_at >= :since
+    UNION SELECT user_id FROM logging_user_actions WHERE created_at >= :since
+""")
+
+SIMILARITIES_OF = text("""
+    SELECT product_id, similar_product_id, score
+    FROM product_similarities
+    WHERE product_id = ANY(CAST(:product_ids AS integer[]))
+""")
+
+INSERT_SIMILARITIES = text("""
+    INSERT INTO product_similarities (product_id, similar_product_id, score)
+    SELECT * FROM unnest(
+        CAST(:product_ids AS integer[]),
+        CAST(:similar_ids AS integer[]),
+        CAST(:scores AS double precision[])
+    )
+""")
+
+UPSERT_RECOMMENDATIONS = text("""
+    INSERT INTO recommendations (user_id, product_id, score)
+    SELECT * FROM unnest(
+        CAST(:user_ids AS integer[]),
+        CAST(:product_ids AS integer[]),
+        CAST(:scores AS double precision[])
+    )
+    ON CONFLICT (user_id, product_id) DO UPDATE SET score = EXCLUDED.score
+""")
+
+# Recommendations of the refreshed users that did not make the new top N
+PRUNE_RECOMMENDATIONS = text("""
+    DELETE FROM recommendations r
+    WHERE r.user_id = ANY(CAST(:target_ids AS integer[]))
+      AND NOT EXISTS (
+          SELECT 1
+          FROM unnest(CAST(:user_ids AS integer[]), CAST(:product_ids AS integer[]))
+               AS fresh(user_id, product_id)
+          WHERE fresh.user_id = r.user_id AND fresh.product_id = r.product_id
+      )
+""")
+
+
+def _top_k_per_row(matrix: sp.csr_matrix, k: int) -> sp.csr_matrix:
+    """
+    Keep the k largest entries of each row
+
+    Rows longer than k are grouped by length (within a factor of 2) and
+    laid out as dense blocks padded with -inf, so each block is a single
+    argpartition instead of one per row.
+    """
+    matrix = matrix.tocsr()
+    lengths = np.diff(matrix.indptr)
+    long_rows = np.flatnonzero(lengths > k)
+    if long_rows.size == 0:
+        return matrix
+    if k <= 0:
+        matrix.data[:] = 0
+        matrix.eliminate_zeros()
+        return matrix
+
+    keep = np.ones(matrix.nnz, dtype=bool)
+    widths = 1 << np.ceil(np.log2(lengths[long_rows])).astype(np.int64)
+    for width in np.unique(widths):
+        group = long_rows[widths == width]
+        rows_per_block = max(1, TOP_K_BLOCK_ELEMENTS // width)
+        for start in range(0, len(group), rows_per_block):
+            block = group[start:start + rows_per_block]
+            offsets = np.arange(width)
+            positions = matrix.indptr[block][:, None] + offsets
+            padding = offsets >= lengths[block][:, None]
+            values = np.where(padding, -np.inf, matrix.data[np.where(padding, 0, positions)])
+            top = np.argpartition(-values, k - 1, axis=1)[:, :k]
+            keep[positions.ravel()[~padding.ravel()]] = False
+            keep[np.take_along_axis(positions, top, axis=1).ravel()] = True
+    matrix.data[~keep] = 0
+    matrix.eliminate_zeros()
+    return matrix
+
+
+def item_similarity(interactions: sp.csr_matrix, neighbours: int) -> sp.csr_matrix:
+    """Item x item cosine similarity, pruned to each item's top neighbours"""
+    norms = np.sqrt(np.asarray(interactions.multiply(interactions).sum(axis=0)).ravel())
+    inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    normalized = interactions @ sp.diags(inverse)
+    similarity = (normalized.T @ normalized).tocsr()
+    similarity.setdiag(0)
+    similarity.eliminate_zeros()
+    return _top_k_per_row(similarity, neighbours)
+
+
+def score_users(
+    interactions: sp.csr_matrix,
+    seen: sp.csr_matrix,
+    similarity: sp.csr_matrix,
+    rows: np.ndarray,
+    recommendable: np.ndarray,
+    top_n: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Top N unseen recommendable items for the given user rows
+
+    seen is a 0/1 matrix of every (user, item) with any interaction.
+
+    Returns parallel (row, item, score) arrays.
+    """
+    history = interactions[rows]
+    scores = (history @ (similarity @ sp.diags(recommendable.astype(float)))).tocsr()
+    scores = (scores - scores.multiply(seen[rows])).tocsr()
+    scores.eliminate_zeros()
+    scores = _top_k_per_row(scores, top_n)
+
+    coo = scores.tocoo()
+    return rows[coo.row], coo.col, coo.data
+
+
+def _stored_similarity(rows, product_ids: np.ndarray) -> sp.csr_matrix:
+    """Item x item matrix of stored neighbour rows (of products that still exist)"""
+    sources = np.array([row.product_id for row in rows], dtype=np.int64)
+    targets = np.array([row.similar_product_id for row in rows], dtype=np.int64)
+    scores = np.array([row.score for row in rows], dtype=float)
+    known = np.isin(sources, product_ids) & np.isin(targets, product_ids)
+    return sp.csr_matrix(
+        (scores[known], (np.searchsorted(product_ids, sources[known]), np.searchsorted(product_ids, targets[known]))),
+        shape=(len(product_ids), len(product_ids)),
+    )
+
+
+async def _store_similarity(similarity: sp.csr_matrix, product_ids: np.ndarray, db: AsyncSession) -> None:
+    """Replace the stored neighbours with those of a full run"""
+    await db.execute(delete(ProductSimilarity))
+    coo = similarity.tocoo()
+    for start in range(0, coo.nnz, SIMILARITY_WRITE_CHUNK):
+        end = start + SIMILARITY_WRITE_CHUNK
+        await db.execute(INSERT_SIMILARITIES, {
+            "product_ids": product_ids[coo.row[start:end]].tolist(),
+            "similar_ids": product_ids[coo.col[start:end]].tolist(),
+            "scores": np.round(coo.data[start:end], 6).tolist(),
+        })
+
+
+class RecommendationService:
+    """Offline item-item collaborative filtering into the recommendations table"""
+
+    @staticmethod
+    async def build_recommendations(db: AsyncSession, full: bool = False) -> Optional[dict]:
+        """
+        Rebuild recommendations for users active since the last run
+
+        A full run (when full is set, on the first run, or once the stored
+        similarities are RECOMMENDATION_FULL_REFRESH_SECONDS old) loads
+        every interaction, recomputes and stores the item similarities and
+        scores every user. Other runs only load the interactions of the
+        active users and the stored neighbours of the items they touched.
+        Returns run stats, or None when another worker is already running
+        the job.
+        """
+        if not await try_job_lock(db, RECOMMENDATION_LOCK_KEY):
+            await db.rollback()
+            return None
+        started_at = datetime.datetime.now(datetime.timezone.utc)
+        since = None if full else await get_watermark(db, RECOMMENDATION_JOB)
+        if since is not None:
+            computed_at = await get_watermark(db, SIMILARITY_JOB)
+            if computed_at is None or (started_at - computed_at).total_seconds() >= RECOMMENDATION_FULL_REFRESH_SECONDS:
+                since = None
+
+        products = (await db.execute(text("SELECT id, is_active FROM products ORDER BY id"))).all()
+        product_ids = np.array([row.id for row in products], dtype=np.int64)
+        recommendable = np.array([bool(row.is_active) for row in products])
+
+        if since is None:
+            rows = (await db.execute(INTERACTIONS, {"log_days": RECOMMENDATION_LOG_DAYS})).all()
+        else:
+            active = (await db.execute(ACTIVE_USERS, {"since": since})).scalars().all()
+            rows = (await db.execute(
+                USER_INTERACTIONS, {"log_days": RECOMMENDATION_LOG_DAYS, "user_ids": list(active)}
+            )).all()
+        raw_users = np.array([row[0] for row in rows], dtype=np.int64)
+        raw_items = np.array([row[1] for row in rows], dtype=np.int64)
+        weights = np.array([row[2] for row in rows], dtype=float)
+
+        # Drop interactions with products that no longer exist (old logs)
+        known = np.isin(raw_items, product_ids)
+        cols = np.searchsorted(product_ids, raw_items[known])
+        user_ids, user_rows = np.unique(raw_users[known], return_inverse=True)
+        shape = (len(user_ids), len(product_ids))
+
+        stored = None
+        if since is not None:
+            stored = (await db.execute(
+                SIMILARITIES_OF, {"product_ids": product_ids[np.unique(cols)].tolist()}
+            )).all()
+
+        def compute():
+            interactions = sp.csr_matrix((weights[known], (user_rows, cols)), shape=shape)
+            interactions.eliminate_zeros()
+            seen = sp.csr_matrix((np.ones(len(cols)), (user_rows, cols)), shape=shape)
+            seen.data[:] = 1.0
+            if stored is None:
+                similarity = item_similarity(interactions, RECOMMENDATION_NEIGHBOURS)
+            else:
+                similarity = _stored_similarity(stored, product_ids)
+            return similarity, score_users(
+                interactions, seen, similarity, np.arange(len(user_ids)), recommendable, RECOMMENDATION_TOP_N
+            )
+
+        # CPU bound: keep the event loop free for requests
+        similarity, (rec_rows, rec_cols, rec_scores) = await asyncio.to_thread(compute)
+        rec_users = user_ids[rec_rows]
+        rec_products = product_ids[rec_cols]
+
+        for start in range(0, len(user_ids), WRITE_CHUNK):
+            chunk = user_ids[start:start + WRITE_CHUNK]
+            mask = np.isin(rec_users, chunk)
+            params = {
+                "user_ids": rec_users[mask].tolist(),
+                "product_ids": rec_products[mask].tolist(),
+                "scores": np.round(rec_scores[mask], 6).tolist(),
+            }
+            await db.execute(UPSERT_RECOMMENDATIONS, params)
+            await db.execute(PRUNE_RECOMMENDATIONS, {
+                "target_ids": chunk.tolist(),
+                "user_ids": params["user_ids"],
+                "product_ids": params["product_ids"],
+            })
+        if since is None:
+            # Users who no longer have any interaction
+            await db.execute(
+                text("DELETE FROM recommendations WHERE user_id <> ALL(CAST(:user_ids AS integer[]))"),
+                {"user_ids": user_ids.tolist()},
+            )
+            await _store_similarity(similarity, product_ids, db)
+            await set_watermark(db, SIMILARITY_JOB, started_at)
+
+        await set_watermark(db, RECOMMENDATION_JOB, started_at)
+        await db.commit()
+        return {
+            "users": int(len(user_ids)),
+            "recommendations": int(len(rec_scores)),
+            "full": since is None,
+        }
@@ -0,0 +1,147 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, tuple_
+from typing import Optional
+from app.models.engagement import Feedback, ProductRatingStats
+from app.models.user import User
+from app.services.cache import TTLCache
+
+_first_pages = TTLCache("review_first_page", maxsize=2048, ttl=300)
+_summaries = TTLCache("review_summary", maxsize=4096, ttl=300)
+
+# Range of the integer columns a cursor is compared with
+_INT_MIN, _INT_MAX = -2**31, 2**31 - 1
+
+
+def encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, sort: str) -> list:
+    """
+    Keyset values of a cursor: [rating,] created_at, id
+
+    Anything a client can put in a cursor is checked here, so a forged one
+    is a ValueError instead of a database error.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != (3 if sort == "rating" else 2):
+        raise ValueError("Invalid cursor")
+
+    *rating, created_at, review_id = values
+    if not all(type(value) is int and _INT_MIN <= value <= _INT_MAX for value in [*rating, review_id]):
+        raise ValueError("Invalid cursor")
+    try:
+        created_at = datetime.fromisoformat(created_at)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if created_at.tzinfo is None:
+        raise ValueError("Invalid cursor")
+    return [*rating, created_at, review_id]
+
+
+class ReviewService:
+    """Service layer for product reviews"""
+
+    @staticmethod
+    async def get_reviews(
+        product_id: int,
+        sort: str = "newest",
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        db: AsyncSession = None
+    ) -> dict:
+        """
+        Keyset-paginated reviews of a product
+
+        - sort "newest": created_at DESC, id DESC
+        - sort "rating": rating DESC, created_at DESC, id DESC
+        The first page is cached until a new review is posted.
+        """
+        if cursor is None:
+            cached = _first_pages.get(product_id, {}).get((sort, limit))
+            if cached is not None:
+                return cached
+
+        if sort == "rating":
+            keys = (Feedback.rating, Feedback.created_at, Feedback.id)
+        else:
+            keys = (Feedback.created_at, Feedback.id)
+
+        query = (
+            select(
+                Feedback.id,
+                Feedback.rating,
+                Feedback.comment,
+                Feedback.created_at,
+                User.id.label("author_id"),
+                User.fullname.label("author_name"),
+            )
+            .join(User, User.id == Feedback.user_id)
+            .where(Feedback.product_id == product_id)
+            .order_by(*[key.desc() for key in keys])
+            .limit(limit + 1)
+        )
+        if cursor is not None:
+            values = decode_cursor(cursor, sort)
+            query = query.where(tuple_(*keys) < tuple_(*values))
+
+        rows = (await db.execute(query)).all()
+        items = [
+            {
+                "id": row.id,
+                "rating": row.rating,
+                "comment": row.comment,
+                "created_at": row.created_at,
+                "author": {"id": row.author_id, "fullname": row.author_name},
+            }
+            for row in rows[:limit]
+        ]
+
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            values = [last.created_at.isoformat(), last.id]
+            if sort == "rating":
+                values.insert(0, last.rating)
+            next_cursor = encode_cursor(values)
+
+        page = {"items": items, "next_cursor": next_cursor}
+        if cursor is None:
+            pages = _first_pages.get(product_id) or {}
+            pages[(sort, limit)] = page
+            _first_pages.set(product_id, pages)
+        return page
+
+    @staticmethod
+    async def get_summary(product_id: int, db: AsyncSession) -> dict:
+        """Rating count, average and histogram of a product (cached)"""
+        summary = _summaries.get(product_id)
+        if summary is not None:
+            return summary
+
+        result = await db.execute(
+            select(ProductRatingStats).where(ProductRatingStats.product_id == product_id)
+        )
+        stats = result.scalar_one_or_none()
+        summary = {
+            "product_id": product_id,
+            "rating_count": stats.rating_count if stats else 0,
+            "rating_average": round(stats.rating_avg, 2) if stats and stats.rating_avg is not None else None,
+            "histogram": {
+                r: getattr(stats, f"rating_{r}") if stats else 0 for r in range(1, 6)
+            },
+        }
+        _summaries.set(product_id, summary)
+        return summary
+
+    @staticmethod
+    def invalidate(product_id: int) -> None:
+        """Drop the cached first pages and summary of a product"""
+        _first_pages.pop(product_id)
+        _summaries.pop(product_id)
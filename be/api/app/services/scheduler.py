@@ -0,0 +1,46 @@
+import logging
+import asyncio
+from typing import Awaitable, Callable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.dependencies import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Runs job(db) every interval seconds with a fresh session.
+
+    Every worker runs its own copy, so jobs must serialize themselves
+    (e.g. with a Postgres advisory lock). Failures are logged and the job
+    is retried on the next tick.
+    """
+
+    def __init__(self, name: str, interval: float, job: Callable[[AsyncSession], Awaitable]):
+        self.name = name
+        self.interval = interval
+        self.job = job
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.job(db)
+            except Exception as e:
+                logger.exception("Periodic task %s failed: %s", self.name, e)
+
@@ -0,0 +1,184 @@
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, text
+from app.core.config import MAX_SESSIONS_PER_USER, SESSION_SWEEP_BATCH_SIZE
+from app.core.security import create_refresh_token
+from app.core.dependencies import revoke_session_ids
+from app.models.user import User, Session
+from app.services.utils import commit_to_db, flush_to_db
+
+# Channel that carries revoked session ids to every worker
+SESSION_REVOCATION_CHANNEL = "session_revocations"
+# Ids per NOTIFY, well under the 8000 byte payload limit
+_NOTIFY_CHUNK = 500
+
+# Sessions of a user beyond the newest :keep, plus any that already expired
+EVICT_SESSIONS = text("""
+    DELETE FROM sessions
+    WHERE user_id = :user_id
+      AND (expired_at < now() OR id < (
+          SELECT min(id) FROM (
+              SELECT id FROM sessions WHERE user_id = :user_id
+              ORDER BY id DESC LIMIT :keep
+          ) newest
+      ))
+    RETURNING id
+""")
+
+NEXT_SESSION_ID = text("SELECT nextval(pg_get_serial_sequence('sessions', 'id'))")
+
+SWEEP_EXPIRED = text("""
+    DELETE FROM sessions
+    WHERE id IN (
+        SELECT id FROM sessions
+        WHERE expired_at < now()
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+""")
+
+
+def hash_refresh_token(refresh_token: str) -> bytes:
+    """
+    Lookup key of a refresh token
+
+    Tokens are long random JWTs, so a plain sha256 is enough (no salt or
+    key stretching) and keeps the unique index at 32 bytes per row.
+    """
+    return hashlib.sha256(refresh_token.encode()).digest()
+
+
+class SessionService:
+    """Service layer for refresh-token sessions"""
+
+    @staticmethod
+    async def create(user: User, device_info: str, db: AsyncSession, settings: dict) -> Tuple[int, str]:
+        """
+        Open a session and return its (id, refresh token)
+
+        The user's expired sessions and the oldest ones beyond
+        MAX_SESSIONS_PER_USER are deleted in the same transaction.
+        """
+        # The id goes into the token, whose digest goes into the row
+        session_id = (await db.execute(NEXT_SESSION_ID)).scalar_one()
+        refresh_token = create_refresh_token(data={"sub": user.email, "sid": session_id}, settings=settings)
+        session = Session(
+            id=session_id,
+            token_hash=hash_refresh_token(refresh_token),
+            device_info=device_info[:255],
+            expired_at=datetime.now(timezone.utc) + timedelta(days=settings["REFRESH_TOKEN_EXPIRE_DAYS"]),
+            user_id=user.id,
+        )
+        db.add(session)
+        await flush_to_db(db)
+        evicted = await db.execute(EVICT_SESSIONS, {"user_id": user.id, "keep": MAX_SESSIONS_PER_USER})
+        await SessionService._commit_revocations(evicted.scalars().all(), db)
+        return session.id, refresh_token
+
+    @staticmethod
+    async def get_by_token(refresh_token: str, db: AsyncSession) -> Optional[Session]:
+        result = await db.execute(
+            select(Session).where(Session.token_hash == hash_refresh_token(refresh_token))
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def list_active(
+        user_id: int, db: AsyncSession, limit: int = 20, before_id: Optional[int] = None
+    ) -> List[Session]:
+        """Unexpired sessions of a user, newest first (keyset on ix_sessions_user_id)"""
+        query = select(Session).where(
+            Session.user_id == user_id, Session.expired_at > datetime.now(timezone.utc)
+        )
+        if before_id is not None:
+            query = query.where(Session.id < before_id)
+        result = await db.execute(query.order_by(Session.id.desc()).limit(limit))
+        return result.scalars().all()
+
+    @staticmethod
+    async def revoke(refresh_token: str, user_id: int, db: AsyncSession) -> bool:
+        result = await db.execute(
+            delete(Session)
+            .where(
+                Session.token_hash == hash_refresh_token(refresh_token),
+                Session.user_id == user_id,
+            )
+            .returning(Session.id)
+        )
+        revoked = result.scalars().all()
+        await SessionService._commit_revocations(revoked, db)
+        return bool(revoked)
+
+    @staticmethod
+    async def revoke_by_id(session_id: int, user_id: int, db: AsyncSession) -> bool:
+        result = await db.execute(
+            delete(Session)
+            .where(Session.id == session_id, Session.user_id == user_id)
+            .returning(Session.id)
+        )
+        revoked = result.scalars().all()
+        await SessionService._commit_revocations(revoked, db)
+        return bool(revoked)
+
+    @staticmethod
+    async def revoke_others(user_id: int, current_id: Optional[int], db: AsyncSession) -> List[int]:
+        """Every session of the user except current_id (all of them when None)"""
+        query = delete(Session).where(Session.user_id == user_id)
+        if current_id is not None:
+            query = query.where(Session.id != current_id)
+        result = await db.execute(query.returning(Session.id))
+        revoked = result.scalars().all()
+        await SessionService._commit_revocations(revoked, db)
+        return revoked
+
+    @staticmethod
+    async def revoke_users(user_ids: Iterable[int], db: AsyncSession) -> List[int]:
+        """Force-logout users: every session of each of them"""
+        result = await db.execute(
+            delete(Session).where(Session.user_id.in_(set(user_ids))).returning(Session.id)
+        )
+        revoked = result.scalars().all()
+        await SessionService._commit_revocations(revoked, db)
+        return revoked
+
+    @staticmethod
+    async def _commit_revocations(session_ids: List[int], db: AsyncSession) -> None:
+        """
+        Commit deleted sessions and reject their access tokens right away:
+        on this worker directly, on the others through NOTIFY (delivered
+        at commit). Workers that miss it still reject the tokens in
+        get_current_user, which checks the session row.
+        """
+        for start in range(0, len(session_ids), _NOTIFY_CHUNK):
+            await db.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {
+                    "channel": SESSION_REVOCATION_CHANNEL,
+                    "payload": json.dumps(session_ids[start:start + _NOTIFY_CHUNK]),
+                },
+            )
+        await commit_to_db(db)
+        revoke_session_ids(session_ids)
+
+    @staticmethod
+    def handle_revocation(payload: str) -> None:
+        """PgListener callback for SESSION_REVOCATION_CHANNEL"""
+        revoke_session_ids(json.loads(payload))
+
+    @staticmethod
+    async def sweep_expired(db: AsyncSession, batch_size: int = SESSION_SWEEP_BATCH_SIZE) -> int:
+        """
+        Delete expired sessions, batch_size rows per transaction so the
+        sweep never holds many row locks or bloats one huge transaction.
+        Returns the number of deleted sessions.
+        """
+        deleted = 0
+        while True:
+            result = await db.execute(SWEEP_EXPIRED, {"batch_size": batch_size})
+            await db.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                return deleted
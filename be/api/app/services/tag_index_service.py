@@ -0,0 +1,133 @@
+import asyncio
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Dict, Iterable, Optional
+from app.models.product import Product, ProductTag
+
+_ONE = np.uint64(1)
+
+
+class TagIndex:
+    """
+    Inverted index from tag_id to a bitmap of product ids.
+
+    Bitmaps are packed into uint64 words (bit = product id), so one tag
+    costs 8 KB per 64k products and set algebra runs on whole words.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._reset(0)
+
+    def _reset(self, max_product_id: int):
+        self._words = (max_product_id >> 6) + 1
+        self._products = np.zeros(self._words, dtype=np.uint64)
+        self._tags: Dict[int, np.ndarray] = {}
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """Load every product and product tag"""
+        product_ids = (await db.execute(select(Product.id))).scalars().all()
+        pairs = (await db.execute(select(ProductTag.product_id, ProductTag.tag_id))).all()
+
+        async with self._lock:
+            self._reset(max(product_ids, default=0))
+            self._products = self._bitmap(product_ids)
+            by_tag: Dict[int, list] = {}
+            for product_id, tag_id in pairs:
+                by_tag.setdefault(tag_id, []).append(product_id)
+            self._tags = {tag_id: self._bitmap(ids) for tag_id, ids in by_tag.items()}
+
+    async def refresh_products(self, product_ids: Iterable[int], db: AsyncSession) -> None:
+        """Reload the tags of the given products, forgetting deleted ones"""
+        product_ids = set(product_ids)
+        if not product_ids:
+            return
+
+        existing = set((await db.execute(
+            select(Product.id).where(Product.id.in_(product_ids))
+        )).scalars().all())
+        pairs = (await db.execute(
+            select(ProductTag.product_id, ProductTag.tag_id)
+            .where(ProductTag.product_id.in_(existing))
+        )).all()
+
+        tags: Dict[int, list] = {product_id: [] for product_id in existing}
+        for product_id, tag_id in pairs:
+            tags[product_id].append(tag_id)
+        async with self._lock:
+            for product_id, tag_ids in tags.items():
+                self.set_product_tags(product_id, tag_ids)
+            for product_id in product_ids - existing:
+                self.remove_product(product_id)
+
+    def set_product_tags(self, product_id: int, tag_ids: Iterable[int]) -> None:
+        """Register a product (new or updated) with its current tags"""
+        self._grow(product_id)
+        word, bit = product_id >> 6, _ONE << np.uint64(product_id & 63)
+        self._products[word] |= bit
+        for bitmap in self._tags.values():
+            bitmap[word] &= ~bit
+        for tag_id in tag_ids:
+            bitmap = self._tags.get(tag_id)
+            if bitmap is None:
+                bitmap = self._tags[tag_id] = np.zeros(self._words, dtype=np.uint64)
+            bitmap[word] |= bit
+
+    def remove_product(self, product_id: int) -> None:
+        """Forget a deleted product"""
+        if product_id >> 6 >= self._words:
+            return
+        word, bit = product_id >> 6, _ONE << np.uint64(product_id & 63)
+        self._products[word] &= ~bit
+        for bitmap in self._tags.values():
+            bitmap[word] &= ~bit
+
+    def candidates(
+        self,
+        tags_all: Optional[Iterable[int]] = None,
+        tags_any: Optional[Iterable[int]] = None,
+        tags_none: Optional[Iterable[int]] = None,
+    ) -> Optional[np.ndarray]:
+        """
+        Product ids matching ALL of tags_all, at least one of tags_any and
+        none of tags_none. Returns None when no tag filter is given.
+        """
+        if not (tags_all or tags_any or tags_none):
+            return None
+
+        empty = np.zeros(self._words, dtype=np.uint64)
+        mask = self._products.copy()
+        for tag_id in tags_all or []:
+            mask &= self._tags.get(tag_id, empty)
+        if tags_any:
+            union = empty.copy()
+            for tag_id in tags_any:
+                union |= self._tags.get(tag_id, empty)
+            mask &= union
+        for tag_id in tags_none or []:
+            mask &= ~self._tags.get(tag_id, empty)
+
+        bits = np.unpackbits(mask.view(np.uint8), bitorder="little")
+        return np.flatnonzero(bits)
+
+    def _bitmap(self, product_ids: Iterable[int]) -> np.ndarray:
+        ids = np.fromiter(product_ids, dtype=np.int64)
+        bits = np.zeros(self._words * 64, dtype=np.uint8)
+        bits[ids] = 1
+        return np.packbits(bits, bitorder="little").view(np.uint64).copy()
+
+    def _grow(self, product_id: int) -> None:
+        words = (product_id >> 6) + 1
+        if words <= self._words:
+            return
+        # Grow geometrically so sequential inserts stay amortized O(1)
+        words = max(words, self._words * 2)
+        pad = words - self._words
+        self._products = np.concatenate([self._products, np.zeros(pad, dtype=np.uint64)])
+        for tag_id, bitmap in self._tags.items():
+            self._tags[tag_id] = np.concatenate([bitmap, np.zeros(pad, dtype=np.uint64)])
+        self._words = words
+
+
+tag_index = TagIndex()
@@ -1,3 +1,4 @@
+import logging
 from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
@@ -5,6 +6,8 @@ from app.core.dependencies import get_settings
 from app.models.base import Base
 import app.models  # Register all models
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
 engine = create_async_engine(
@@ -19,23 +22,18 @@ async def create_tables():
     async with engine.begin() as conn:
         try:
             await conn.run_sync(Base.metadata.create_all)
-            print("created all tables")
-            with open("error.log", "a") as f:
-                f.write("DEBUG: created all tables successfully\n" + "-" * 20 + "\n")
+            logger.info("created all tables")
         except Exception as e:
-            import traceback
-
-            traceback.print_exc()
-            print(f"{e}")
+            logger.exception("create_all failed: %s", e)
 
 
 async def drop_tables():
     async with engine.begin() as conn:
         try:
             await conn.run_sync(Base.metadata.drop_all)
-            print("dropped all tables")
+            logger.info("dropped all tables")
         except Exception as e:
-            print(f"{e}")
+            logger.exception("drop_all failed: %s", e)
 
 
 async def commit_to_db(session: AsyncSession):
@@ -47,3 +45,14 @@ async def commit_to_db(session: AsyncSession):
     except SQLAlchemyError as e:
         await session.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+async def flush_to_db(session: AsyncSession):
+    try:
+        await session.flush()
+    except IntegrityError as e:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail=f"Integrity error: {e.orig}")
+    except SQLAlchemyError as e:
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
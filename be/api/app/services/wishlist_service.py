@@ -0,0 +1,71 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, literal
+from sqlalchemy.dialects.postgresql import insert
+from typing import FrozenSet, Iterable, List
+from app.models.engagement import Wishlist
+from app.models.product import Product
+from app.services.cache import TTLCache
+from app.services.utils import commit_to_db
+
+# Wishlisted product ids per user, for listing pages' heart icons
+_product_ids = TTLCache("wishlist_ids", maxsize=20000, ttl=120)
+
+
+class WishlistService:
+    """Service layer for wishlist membership"""
+
+    @staticmethod
+    async def get_product_ids(user_id: int, db: AsyncSession) -> FrozenSet[int]:
+        """Every product id in a user's wishlist (cached)"""
+        ids = _product_ids.get(user_id)
+        if ids is None:
+            # Index-only scan of uq_user_product_wishlist
+            result = await db.execute(select(Wishlist.product_id).where(Wishlist.user_id == user_id))
+            ids = frozenset(result.scalars().all())
+            _product_ids.set(user_id, ids)
+        return ids
+
+    @staticmethod
+    async def contains(user_id: int, product_ids: Iterable[int], db: AsyncSession) -> List[int]:
+        """The given product ids that are in the user's wishlist, in request order"""
+        wishlisted = await WishlistService.get_product_ids(user_id, db)
+        return [product_id for product_id in dict.fromkeys(product_ids) if product_id in wishlisted]
+
+    @staticmethod
+    async def add_many(user_id: int, product_ids: Iterable[int], db: AsyncSession) -> List[int]:
+        """
+        Add products in one statement; returns the newly added ids
+
+        Unknown products and products already in the wishlist are skipped.
+        """
+        stmt = (
+            insert(Wishlist)
+            .from_select(
+                ["user_id", "product_id"],
+                select(literal(user_id), Product.id).where(Product.id.in_(set(product_ids))),
+            )
+            .on_conflict_do_nothing(index_elements=[Wishlist.user_id, Wishlist.product_id])
+            .returning(Wishlist.product_id)
+        )
+        result = await db.execute(stmt)
+        added = sorted(result.scalars().all())
+        await commit_to_db(db)
+        WishlistService.invalidate(user_id)
+        return added
+
+    @staticmethod
+    async def remove_many(user_id: int, product_ids: Iterable[int], db: AsyncSession) -> List[int]:
+        """Remove products in one statement; returns the removed ids"""
+        result = await db.execute(
+            delete(Wishlist)
+            .where(Wishlist.user_id == user_id, Wishlist.product_id.in_(set(product_ids)))
+            .returning(Wishlist.product_id)
+        )
+        removed = sorted(result.scalars().all())
+        await commit_to_db(db)
+        WishlistService.invalidate(user_id)
+        return removed
+
+    @staticmethod
+    def invalidate(user_id: int) -> None:
+        _product_ids.pop(user_id)
@@ -0,0 +1,157 @@
+"""
+Synthetic data generator for load testing
+Run from be/api against a local Postgres (DATABASE_URL):
+    python -m benchmarks.datagen --reset --scale 10 --workers 8
+
+Fills every table of app/models with referentially consistent rows.
+--scale multiplies the default sizes (100k users, 200k orders and 2M
+log rows at scale 1); --users, --orders, ... override a single table.
+
+Tables load level by level, so foreign keys always point at rows that
+already exist. Within a level, chunks of --chunk-size driving ids are
+generated and COPYed by --workers processes in parallel. Every value is
+a hash of (--seed, table, column, id): the same seed gives the same
+rows whatever the chunking or the number of workers.
+
+Timestamps are spread back from --anchor (default today). Users are
+bench-user-<n>@example.com with the e2e benchmark's password, so
+`python -m benchmarks.e2e --skip-seed` runs against a generated dataset.
+"""
+
+import argparse
+import asyncio
+import datetime
+import multiprocessing
+import os
+import sys
+import time
+from typing import List, Tuple
+from urllib.parse import urlparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from sqlalchemy import text
+from app.core.dependencies import AsyncSessionLocal, engine, get_settings
+from app.core.security import pwd_context
+from app.models import Base
+from app.services.partition_service import PartitionService
+from app.services.rating_service import RatingService
+from app.services.analytics_service import AnalyticsService
+from app.services.co_purchase_service import CoPurchaseService
+from benchmarks.datagen import loader
+from benchmarks.datagen.tables import DEFAULT_SIZES, LEVELS, TABLES
+from benchmarks.e2e.dataset import PASSWORD
+
+# Millions of generated notifications would flood the listeners and slow the COPY down
+NOTIFY_TRIGGER = "ALTER TABLE notifications {} TRIGGER notifications_notify_insert"
+
+
+def chunks(sizes: dict, chunk_size: int, level) -> List[Tuple[str, int, int]]:
+    tasks = []
+    for table in level:
+        stop = table.driver(sizes) + 1
+        step = chunk_size if table.chunked else stop
+        tasks.extend((table.name, start, min(start + step, stop)) for start in range(1, stop, step))
+    return tasks
+
+
+async def prepare(args, sizes: dict) -> None:
+    if args.reset:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSessionLocal() as db:
+        if not args.reset and (await db.execute(text("SELECT EXISTS (SELECT 1 FROM users)"))).scalar():
+            sys.exit("users is not empty: pass --reset to drop every table first")
+        oldest = args.anchor - datetime.timedelta(days=sizes["log_days"])
+        today = datetime.date.today()
+        months_back = max(0, (today.year - oldest.year) * 12 + today.month - oldest.month)
+        await PartitionService.ensure_action_log_partitions(db, 1, months_back)
+        await db.execute(text(NOTIFY_TRIGGER.format("DISABLE")))
+        await db.commit()
+    await engine.dispose()
+
+
+async def finish(args) -> None:
+    async with AsyncSessionLocal() as db:
+        # Explicit ids bypassed the sequences
+        for table in TABLES.values():
+            if table.explicit_ids:
+                await db.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"coalesce((SELECT max(id) FROM {table.name}), 0) + 1, false)"
+                ))
+        await db.execute(text(NOTIFY_TRIGGER.format("ENABLE")))
+        await db.commit()
+
+        if not args.skip_derived:
+            for label, job in [
+                ("product_rating_stats", RatingService.rebuild_rating_stats),
+                ("action_rollups_hourly", AnalyticsService.rebuild_action_rollups),
+                ("product_co_purchases", CoPurchaseService.rebuild),
+            ]:
+                started = time.perf_counter()
+                await job(db)
+                print(f"{label}: rebuilt in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+        await db.execute(text("ANALYZE"))
+        await db.commit()
+    await engine.dispose()
+
+
+def load(args, sizes: dict) -> None:
+    # spawn: a forked child would share the parent's pooled connections
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(args.workers, loader.init_worker, (args.seed, args.anchor, sizes)) as pool:
+        for number, level in enumerate(LEVELS):
+            started = time.perf_counter()
+            rows = dict.fromkeys((table.name for table in level), 0)
+            for name, count, _ in pool.imap_unordered(loader.load_chunk, chunks(sizes, args.chunk_size, level)):
+                rows[name] += count
+            elapsed = time.perf_counter() - started
+            total = sum(rows.values())
+            print(
+                f"level {number}: {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s) "
+                + ", ".join(f"{name}={count}" for name, count in rows.items()),
+                file=sys.stderr,
+            )
+
+
+def main(args) -> None:
+    host = urlparse(get_settings()["DATABASE_URL"]).hostname
+    if host not in ("localhost", "127.0.0.1", "::1") and not args.force:
+        sys.exit(f"refusing to bulk load into {host}; pass --force if you mean it")
+
+    sizes = {key: max(1, round(default * args.scale)) for key, default in DEFAULT_SIZES.items()}
+    sizes.update({key: getattr(args, key) for key in DEFAULT_SIZES if getattr(args, key) is not None})
+    sizes["log_days"] = args.log_days
+    sizes["password_hash"] = pwd_context.hash(PASSWORD)
+
+    started = time.perf_counter()
+    asyncio.run(prepare(args, sizes))
+    load(args, sizes)
+    asyncio.run(finish(args))
+    print(f"done in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+def anchor(value: str) -> datetime.datetime:
+    return datetime.datetime.combine(datetime.date.fromisoformat(value), datetime.time(), datetime.timezone.utc)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.datagen", description="Synthetic data generator")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier of every default size")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="COPY worker processes")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Driving ids per COPY")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor", type=anchor, default=anchor(datetime.date.today().isoformat()),
+                        help="Date the timestamps are spread back from (YYYY-MM-DD)")
+    parser.add_argument("--log-days", type=int, default=90, help="Days of clickstream logs")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate every table first")
+    parser.add_argument("--force", action="store_true", help="Allow loading into a non-local database")
+    parser.add_argument("--skip-derived", action="store_true",
+                        help="Do not rebuild rating stats, action rollups and co-purchases")
+    for key, default in DEFAULT_SIZES.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key, type=int,
+                            help=f"Rows (default {default} x scale)")
+    main(parser.parse_args())
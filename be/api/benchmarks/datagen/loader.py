@@ -0,0 +1,42 @@
+"""
+Worker processes: each one holds an asyncpg connection and COPYs the
+chunks it is handed
+
+Workers regenerate their chunk's rows from (table, start, stop) alone,
+so nothing but the row count goes back through the pool.
+"""
+
+import asyncio
+import datetime
+import time
+from typing import Optional, Tuple
+import asyncpg
+from app.core.dependencies import get_settings, ctx
+from benchmarks.datagen.synth import Synth
+from benchmarks.datagen.tables import TABLES
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_conn: Optional[asyncpg.Connection] = None
+_synth: Optional[Synth] = None
+_sizes: Optional[dict] = None
+
+
+def init_worker(seed: int, anchor: datetime.datetime, sizes: dict) -> None:
+    global _loop, _conn, _synth, _sizes
+    _loop = asyncio.new_event_loop()
+    _conn = _loop.run_until_complete(asyncpg.connect(get_settings()["DATABASE_URL"], ssl=ctx))
+    # Bulk load: losing the last commits on a crash is fine, the run is redone anyway
+    _loop.run_until_complete(_conn.execute("SET synchronous_commit = off"))
+    _synth = Synth(seed, anchor)
+    _sizes = sizes
+
+
+def load_chunk(task: Tuple[str, int, int]) -> Tuple[str, int, float]:
+    """COPY rows of the driving ids start..stop-1; returns (table, rows, seconds)"""
+    name, start, stop = task
+    table = TABLES[name]
+    started = time.perf_counter()
+    records = table.generate(_synth, _sizes, start, stop)
+    if records:
+        _loop.run_until_complete(_conn.copy_records_to_table(name, records=records, columns=table.columns))
+    return name, len(records), time.perf_counter() - started
@@ -0,0 +1,83 @@
+"""
+Deterministic, vectorized random values
+
+Every value is a hash (splitmix64) of the seed, a field name and a row
+id, not a draw from a stateful generator. Rows therefore come out the
+same whatever the chunk size or the number of worker processes, and a
+table can recompute its parent's values (a product's price, an order's
+lines) from the parent id alone.
+"""
+
+import datetime
+import zlib
+from typing import List, Sequence
+import numpy as np
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    x = x + _GOLDEN
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def fan_out(parent_ids: np.ndarray, counts: np.ndarray):
+    """(parent id, index within parent) for `counts` children of each parent"""
+    parents = np.repeat(parent_ids, counts)
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    return parents, np.arange(len(parents)) - starts
+
+
+class Synth:
+    def __init__(self, seed: int, anchor: datetime.datetime):
+        self.seed = seed
+        # "now" of the dataset: timestamps are spread backwards from it
+        self.anchor = anchor
+
+    def hash(self, ids: np.ndarray, field: str) -> np.ndarray:
+        salt = np.uint64(zlib.crc32(f"{self.seed}:{field}".encode()) << 32 | (self.seed & 0xFFFFFFFF))
+        with np.errstate(over="ignore"):
+            return _splitmix64(ids.astype(np.uint64) * _GOLDEN ^ salt)
+
+    def uniform(self, ids: np.ndarray, field: str) -> np.ndarray:
+        """Floats in [0, 1)"""
+        return (self.hash(ids, field) >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+    def integers(self, ids: np.ndarray, field: str, low: int, high: int) -> np.ndarray:
+        """Integers in [low, high]"""
+        return (low + self.hash(ids, field) % np.uint64(high - low + 1)).astype(np.int64)
+
+    def chance(self, ids: np.ndarray, field: str, p: float) -> np.ndarray:
+        return self.uniform(ids, field) < p
+
+    def choice(self, ids: np.ndarray, field: str, options: Sequence, weights: Sequence[float] = None) -> List:
+        if weights is None:
+            picks = self.hash(ids, field) % np.uint64(len(options))
+        else:
+            cumulative = np.cumsum(weights) / sum(weights)
+            picks = np.minimum(np.searchsorted(cumulative, self.uniform(ids, field), side="right"), len(options) - 1)
+        lookup = np.empty(len(options), dtype=object)
+        lookup[:] = list(options)
+        return lookup[picks].tolist()
+
+    def distinct(self, parent_ids: np.ndarray, index: np.ndarray, field: str, n: int, per_parent: int) -> np.ndarray:
+        """
+        Ids in [1, n], distinct among the first `per_parent` children of a
+        parent (for unique (parent, child) pairs)
+        """
+        stride = max(1, n // per_parent)
+        base = self.hash(parent_ids, field) % np.uint64(n)
+        return ((base + index.astype(np.uint64) * np.uint64(stride)) % np.uint64(n) + np.uint64(1)).astype(np.int64)
+
+    def timestamps(self, ids: np.ndarray, field: str, max_age: datetime.timedelta) -> List[datetime.datetime]:
+        """Aware datetimes spread over the `max_age` before the anchor"""
+        ages = (self.uniform(ids, field) * max_age.total_seconds()).tolist()
+        anchor = self.anchor
+        return [anchor - datetime.timedelta(seconds=age) for age in ages]
+
+    def after(self, start: List[datetime.datetime], ids: np.ndarray, field: str, max_delay: datetime.timedelta) -> List[datetime.datetime]:
+        """Each of `start` plus a delay of up to max_delay"""
+        delays = (self.uniform(ids, field) * max_delay.total_seconds()).tolist()
+        return [moment + datetime.timedelta(seconds=delay) for moment, delay in zip(start, delays)]
@@ -0,0 +1,519 @@
+"""
+Row generators for every table in app/models
+
+A table is generated in chunks of its driving id range: its own ids, or
+its parent's ids for child rows (an order's items, a product's tags).
+Tables that other tables reference get explicit ids 1..N; the others
+take ids from their sequence.
+
+Derived tables (product_rating_stats, action_rollups_hourly,
+product_co_purchases, job_watermarks) are not generated here: the
+app's own rebuild jobs fill them once the rest is loaded.
+"""
+
+import datetime
+import hashlib
+import json
+from typing import Callable, Dict, List, Sequence
+import numpy as np
+from benchmarks.datagen.synth import Synth, fan_out
+from benchmarks.e2e.dataset import ADMIN_EMAIL, FLAVOURS, ITEMS
+
+DAY = datetime.timedelta(days=1)
+
+# Entity counts at --scale 1; child tables fan out from these
+DEFAULT_SIZES = {
+    "categories": 50,
+    "tags": 100,
+    "ingredients": 60,
+    "discounts": 200,
+    "products": 20000,
+    "users": 100000,
+    "sessions": 50000,
+    "carts": 30000,
+    "orders": 200000,
+    "reviews": 300000,
+    "wishlist": 200000,
+    "recommendations": 500000,
+    "notifications": 300000,
+    "price_history": 20000,
+    "emails": 50000,
+    "logs": 2000000,
+}
+
+FIRST_NAMES = ["An", "Binh", "Chi", "Dung", "Giang", "Hanh", "Khoa", "Linh", "Minh", "Nam", "Phuong", "Quan", "Thao", "Trang", "Vy"]
+LAST_NAMES = ["Nguyen", "Tran", "Le", "Pham", "Hoang", "Huynh", "Phan", "Vu", "Vo", "Dang", "Bui", "Do"]
+CITIES = [("Ho Chi Minh City", "HCM"), ("Ha Noi", "HN"), ("Da Nang", "DN"), ("Can Tho", "CT"), ("Hai Phong", "HP")]
+STREETS = ["Le Loi", "Nguyen Hue", "Tran Hung Dao", "Hai Ba Trung", "Ly Thuong Kiet", "Pasteur", "Vo Van Tan"]
+DEVICES = ["Chrome on Windows", "Safari on iPhone", "Chrome on Android", "Firefox on Linux", "Safari on macOS"]
+COURIERS = ["GHN", "GHTK", "Viettel Post", "J&T Express"]
+REVIEW_COMMENTS = ["Delicious!", "Arrived on time", "A bit too sweet", "Will order again", "Not as pictured", None]
+
+ORDER_STATUSES = ["PENDING", "PAID", "PRINTING", "SHIPPED", "DELIVERED", "CANCELLED"]
+ORDER_STATUS_WEIGHTS = [10, 5, 3, 7, 65, 10]
+PAID_STATUSES = {"PAID", "PRINTING", "SHIPPED", "DELIVERED"}
+SHIPMENT_STATUS = {"SHIPPED": "SHIPPING", "DELIVERED": "DELIVERED"}
+
+ACTION_TYPES = ["view_product", "add_to_cart", "add_to_wishlist", "search", "purchase"]
+ACTION_WEIGHTS = [70, 12, 6, 10, 2]
+
+MAX_ORDER_LINES = 4
+
+
+def ids(start: int, stop: int) -> np.ndarray:
+    return np.arange(start, stop, dtype=np.int64)
+
+
+def product_prices(synth: Synth, product_ids: np.ndarray) -> np.ndarray:
+    return np.round(20 + synth.uniform(product_ids, "product.price") * 480, 2)
+
+
+def order_statuses(synth: Synth, order_ids: np.ndarray) -> List[str]:
+    return synth.choice(order_ids, "order.status", ORDER_STATUSES, ORDER_STATUS_WEIGHTS)
+
+
+def order_created(synth: Synth, order_ids: np.ndarray) -> List[datetime.datetime]:
+    return synth.timestamps(order_ids, "order.created_at", 730 * DAY)
+
+
+def order_lines(synth: Synth, sizes: dict, order_ids: np.ndarray):
+    """(order id, product id, quantity) of every line of these orders"""
+    counts = synth.integers(order_ids, "order.lines", 1, MAX_ORDER_LINES)
+    orders, index = fan_out(order_ids, counts)
+    products = synth.distinct(orders, index, "order_item.product", sizes["products"], MAX_ORDER_LINES)
+    line_ids = orders * MAX_ORDER_LINES + index
+    quantities = synth.integers(line_ids, "order_item.quantity", 1, 3)
+    return orders, products, quantities
+
+
+def pairs(synth: Synth, sizes: dict, start: int, stop: int, field: str, count_key: str):
+    """
+    Rows start..stop of `count_key` unique (user, product) pairs: row i
+    goes to user i % users, as that user's (i // users)th product
+    """
+    users, products = sizes["users"], sizes["products"]
+    rows = ids(start, stop)
+    user_ids = rows % users + 1
+    per_user = -(-sizes[count_key] // users)
+    return rows, user_ids, synth.distinct(user_ids, rows // users, field, products, per_user)
+
+
+# Generators: (synth, sizes, start, stop) -> records, for driving ids start..stop-1
+
+def gen_roles(synth, sizes, start, stop):
+    return [(1, "admin", "Administrator"), (2, "customer", "Customer")]
+
+
+def gen_users(synth, sizes, start, stop):
+    user_ids = ids(start, stop)
+    first = synth.choice(user_ids, "user.first_name", FIRST_NAMES)
+    last = synth.choice(user_ids, "user.last_name", LAST_NAMES)
+    active = synth.chance(user_ids, "user.active", 0.98).tolist()
+    created = synth.timestamps(user_ids, "user.created_at", 1095 * DAY)
+    password = sizes["password_hash"]
+    admin_id = sizes["users"] + 1
+    records = []
+    for i, user_id in enumerate(user_ids.tolist()):
+        if user_id == admin_id:
+            records.append((user_id, ADMIN_EMAIL, password, "Admin", None, True, created[i]))
+        else:
+            records.append((
+                user_id, f"bench-user-{user_id}@example.com", password,
+                f"{last[i]} {first[i]}", f"09{user_id:09d}", active[i], created[i],
+            ))
+    return records
+
+
+def gen_addresses(synth, sizes, start, stop):
+    user_ids = ids(start, stop)
+    cities = synth.choice(user_ids, "address.city", CITIES)
+    streets = synth.choice(user_ids, "address.street", STREETS)
+    numbers = synth.integers(user_ids, "address.number", 1, 500).tolist()
+    postal = synth.integers(user_ids, "address.postal_code", 100000, 999999).tolist()
+    return [
+        (user_id, f"home-{user_id}", f"{numbers[i]} {streets[i]}", cities[i][0], cities[i][1], str(postal[i]), True, user_id)
+        for i, user_id in enumerate(user_ids.tolist())
+    ]
+
+
+def gen_user_roles(synth, sizes, start, stop):
+    records = [(user_id, 2) for user_id in range(start, stop)]
+    if start <= sizes["users"] + 1 < stop:
+        records.append((sizes["users"] + 1, 1))
+    return records
+
+
+def gen_sessions(synth, sizes, start, stop):
+    rows = ids(start, stop)
+    users = synth.integers(rows, "session.user", 1, sizes["users"]).tolist()
+    devices = synth.choice(rows, "session.device", DEVICES)
+    # A sixth already expired, for the sweeper
+    expires = synth.after(
+        synth.timestamps(rows, "session.created_at", 7 * DAY), rows, "session.ttl", 42 * DAY
+    )
+    return [
+        (hashlib.sha256(f"{synth.seed}:session:{row}".encode()).digest(), devices[i], expires[i], users[i])
+        for i, row in enumerate(rows.tolist())
+    ]
+
+
+def gen_categories(synth, sizes, start, stop):
+    category_ids = ids(start, stop)
+    roots = max(1, sizes["categories"] // 5)
+    parents = (synth.hash(category_ids, "category.parent") % np.uint64(roots) + np.uint64(1)).astype(np.int64).tolist()
+    names = synth.choice(category_ids, "category.name", ITEMS)
+    return [
+        (
+            category_id,
+            None if category_id <= roots else parents[i],
+            f"{names[i].title()}s {category_id}",
+            f"Our selection of {names[i]}s",
+        )
+        for i, category_id in enumerate(category_ids.tolist())
+    ]
+
+
+def gen_tags(synth, sizes, start, stop):
+    tag_ids = ids(start, stop)
+    words = synth.choice(tag_ids, "tag.name", FLAVOURS + ["vegan", "gluten-free", "sugar-free", "bestseller", "new"])
+    return [(tag_id, f"{words[i]}-{tag_id}") for i, tag_id in enumerate(tag_ids.tolist())]
+
+
+def gen_ingredients(synth, sizes, start, stop):
+    ingredient_ids = ids(start, stop)
+    names = synth.choice(ingredient_ids, "ingredient.name", FLAVOURS + ["flour", "sugar", "butter", "egg", "milk", "cream"])
+    units = synth.choice(ingredient_ids, "ingredient.unit", ["g", "ml"])
+    prices = np.round(0.005 + synth.uniform(ingredient_ids, "ingredient.price") * 0.1, 3).tolist()
+    calories = np.round(synth.uniform(ingredient_ids, "ingredient.calories") * 9, 2).tolist()
+    return [
+        (ingredient_id, f"{names[i]} {ingredient_id}", units[i], prices[i], calories[i], 1e9)
+        for i, ingredient_id in enumerate(ingredient_ids.tolist())
+    ]
+
+
+def gen_discounts(synth, sizes, start, stop):
+    discount_ids = ids(start, stop)
+    percent = synth.chance(discount_ids, "discount.percent", 0.7).tolist()
+    values = synth.integers(discount_ids, "discount.value", 5, 50).tolist()
+    starts = synth.timestamps(discount_ids, "discount.start", 365 * DAY)
+    ends = synth.after(starts, discount_ids, "discount.length", 60 * DAY)
+    return [
+        (
+            f"SALE{discount_id:06d}",
+            float(values[i]) if percent[i] else values[i] * 1000.0,
+            starts[i], ends[i], ends[i] > synth.anchor,
+            "percent" if percent[i] else "fixed",
+        )
+        for i, discount_id in enumerate(discount_ids.tolist())
+    ]
+
+
+def gen_products(synth, sizes, start, stop):
+    product_ids = ids(start, stop)
+    flavours = synth.choice(product_ids, "product.flavour", FLAVOURS)
+    items = synth.choice(product_ids, "product.item", ITEMS)
+    prices = product_prices(synth, product_ids).tolist()
+    stock = synth.integers(product_ids, "product.stock", 0, 500).tolist()
+    categories = synth.integers(product_ids, "product.category", 1, sizes["categories"]).tolist()
+    calories = np.round(150 + synth.uniform(product_ids, "product.calories") * 350, 1).tolist()
+    return [
+        (
+            product_id,
+            f"{flavours[i].title()} {items[i]} #{product_id}",
+            f"A {flavours[i]} {items[i]}, baked to order",
+            prices[i], stock[i], None,
+            f"https://img.example.com/p/{product_id}.png",
+            product_id % 50 != 0,
+            json.dumps({"calories": calories[i], "protein": 5.0, "carbs": 45.0, "fat": 15.0}),
+            categories[i],
+        )
+        for i, product_id in enumerate(product_ids.tolist())
+    ]
+
+
+def gen_product_tags(synth, sizes, start, stop):
+    tags = sizes["tags"]
+    per_product = min(3, tags)
+    products, index = fan_out(ids(start, stop), synth.integers(ids(start, stop), "product.tag_count", 1, per_product))
+    tag_ids = synth.distinct(products, index, "product_tag.tag", tags, per_product)
+    return list(zip(products.tolist(), tag_ids.tolist()))
+
+
+def gen_product_ingredients(synth, sizes, start, stop):
+    ingredients = sizes["ingredients"]
+    per_product = min(4, ingredients)
+    counts = synth.integers(ids(start, stop), "product.ingredient_count", min(2, per_product), per_product)
+    products, index = fan_out(ids(start, stop), counts)
+    ingredient_ids = synth.distinct(products, index, "product_ingredient.ingredient", ingredients, per_product)
+    return [
+        (product_id, ingredient_id, 10.0, 60.0)
+        for product_id, ingredient_id in zip(products.tolist(), ingredient_ids.tolist())
+    ]
+
+
+def gen_product_variants(synth, sizes, start, stop):
+    product_ids = ids(start, stop)
+    products, index = fan_out(product_ids, synth.integers(product_ids, "product.variant_count", 0, 3))
+    prices = product_prices(synth, products)
+    variant_keys = products * 3 + index
+    stock = synth.integers(variant_keys, "variant.stock", 0, 200).tolist()
+    names = ["Small", "Medium", "Large"]
+    return [
+        (product_id, names[j], f"SKU-{product_id}-{j}", round(price * (0.8 + 0.2 * j), 2), float(stock[i]))
+        for i, (product_id, j, price) in enumerate(zip(products.tolist(), index.tolist(), prices.tolist()))
+    ]
+
+
+def gen_price_history(synth, sizes, start, stop):
+    rows = ids(start, stop)
+    products = synth.integers(rows, "price_history.product", 1, sizes["products"])
+    new_prices = product_prices(synth, products).tolist()
+    changes = (1 + (synth.uniform(rows, "price_history.change") - 0.5) * 0.4).tolist()
+    changed = synth.timestamps(rows, "price_history.changed_at", 365 * DAY)
+    return [
+        (product_id, round(new_prices[i] * changes[i], 2), new_prices[i], changed[i])
+        for i, product_id in enumerate(products.tolist())
+    ]
+
+
+def gen_carts(synth, sizes, start, stop):
+    # Cart n belongs to user n
+    cart_ids = ids(start, stop)
+    created = synth.timestamps(cart_ids, "cart.created_at", 60 * DAY)
+    updated = synth.after(created, cart_ids, "cart.updated_at", 7 * DAY)
+    return [(cart_id, created[i], updated[i], cart_id) for i, cart_id in enumerate(cart_ids.tolist())]
+
+
+def gen_cart_items(synth, sizes, start, stop):
+    carts, index = fan_out(ids(start, stop), synth.integers(ids(start, stop), "cart.item_count", 1, 3))
+    products = synth.distinct(carts, index, "cart_item.product", sizes["products"], 3)
+    quantities = synth.integers(carts * 3 + index, "cart_item.quantity", 1, 3).tolist()
+    return [
+        (quantities[i], None, cart_id, product_id)
+        for i, (cart_id, product_id) in enumerate(zip(carts.tolist(), products.tolist()))
+    ]
+
+
+def gen_orders(synth, sizes, start, stop):
+    order_ids = ids(start, stop)
+    users = synth.integers(order_ids, "order.user", 1, sizes["users"]).tolist()
+    statuses = order_statuses(synth, order_ids)
+    created = order_created(synth, order_ids)
+
+    orders, products, quantities = order_lines(synth, sizes, order_ids)
+    amounts = product_prices(synth, products) * quantities
+    totals = np.round(np.bincount(orders - start, weights=amounts, minlength=len(order_ids)), 2).tolist()
+
+    return [
+        (
+            order_id, totals[i], totals[i], created[i], statuses[i],
+            "PAID" if statuses[i] in PAID_STATUSES else "UNPAID",
+            users[i], users[i],  # address n belongs to user n
+        )
+        for i, order_id in enumerate(order_ids.tolist())
+    ]
+
+
+def gen_order_items(synth, sizes, start, stop):
+    orders, products, quantities = order_lines(synth, sizes, ids(start, stop))
+    return [
+        (quantity, None, order_id, product_id)
+        for order_id, product_id, quantity in zip(orders.tolist(), products.tolist(), quantities.tolist())
+    ]
+
+
+def _orders_with_status(synth, sizes, start, stop, statuses):
+    order_ids = ids(start, stop)
+    status = order_statuses(synth, order_ids)
+    keep = np.array([s in statuses for s in status], dtype=bool)
+    created = order_created(synth, order_ids)
+    kept = order_ids[keep]
+    return kept, [status[i] for i in np.flatnonzero(keep)], [created[i] for i in np.flatnonzero(keep)]
+
+
+def gen_payments(synth, sizes, start, stop):
+    order_ids, _, created = _orders_with_status(synth, sizes, start, stop, PAID_STATUSES)
+    if not len(order_ids):
+        return []
+    orders, products, quantities = order_lines(synth, sizes, order_ids)
+    amounts = product_prices(synth, products) * quantities
+    # order_ids are sorted, so each order's lines are contiguous
+    totals = np.round(np.add.reduceat(amounts, np.flatnonzero(np.r_[True, orders[1:] != orders[:-1]])), 2).tolist()
+    paid = synth.after(created, order_ids, "payment.paid_at", datetime.timedelta(minutes=30))
+    methods = synth.choice(order_ids, "payment.method", ["VNPAY", "COD"], [7, 3])
+    return [
+        (totals[i], paid[i], "COMPLETED", methods[i], order_id)
+        for i, order_id in enumerate(order_ids.tolist())
+    ]
+
+
+def gen_shipments(synth, sizes, start, stop):
+    order_ids, statuses, created = _orders_with_status(synth, sizes, start, stop, set(SHIPMENT_STATUS))
+    shipped = synth.after(created, order_ids, "shipment.shipped_at", 3 * DAY)
+    couriers = synth.choice(order_ids, "shipment.courier", COURIERS)
+    return [
+        (f"TRK{order_id:012d}", couriers[i], shipped[i], SHIPMENT_STATUS[statuses[i]], order_id)
+        for i, order_id in enumerate(order_ids.tolist())
+    ]
+
+
+def gen_feedback(synth, sizes, start, stop):
+    rows, users, products = pairs(synth, sizes, start, stop, "feedback.product", "reviews")
+    ratings = synth.choice(rows, "feedback.rating", [1, 2, 3, 4, 5], [4, 4, 10, 30, 52])
+    comments = synth.choice(rows, "feedback.comment", REVIEW_COMMENTS)
+    created = synth.timestamps(rows, "feedback.created_at", 730 * DAY)
+    return [
+        (user_id, product_id, ratings[i], comments[i], created[i])
+        for i, (user_id, product_id) in enumerate(zip(users.tolist(), products.tolist()))
+    ]
+
+
+def gen_wishlist(synth, sizes, start, stop):
+    rows, users, products = pairs(synth, sizes, start, stop, "wishlist.product", "wishlist")
+    created = synth.timestamps(rows, "wishlist.created_at", 365 * DAY)
+    return [
+        (user_id, product_id, created[i])
+        for i, (user_id, product_id) in enumerate(zip(users.tolist(), products.tolist()))
+    ]
+
+
+def gen_recommendations(synth, sizes, start, stop):
+    rows, users, products = pairs(synth, sizes, start, stop, "recommendation.product", "recommendations")
+    scores = np.round(synth.uniform(rows, "recommendation.score"), 4).tolist()
+    return [
+        (user_id, product_id, scores[i])
+        for i, (user_id, product_id) in enumerate(zip(users.tolist(), products.tolist()))
+    ]
+
+
+def gen_notifications(synth, sizes, start, stop):
+    rows = ids(start, stop)
+    users = synth.integers(rows, "notification.user", 1, sizes["users"]).tolist()
+    types = synth.choice(rows, "notification.type", ["INFO", "PROMOTION", "WARNING"], [6, 3, 1])
+    read = synth.chance(rows, "notification.read", 0.7).tolist()
+    created = synth.timestamps(rows, "notification.created_at", 90 * DAY)
+    titles = {"INFO": "Order update", "PROMOTION": "New deals for you", "WARNING": "Action needed"}
+    return [
+        (users[i], titles[types[i]], f"Notification #{row}", types[i], read[i], created[i])
+        for i, row in enumerate(rows.tolist())
+    ]
+
+
+def gen_logs(synth, sizes, start, stop):
+    rows = ids(start, stop)
+    users = synth.integers(rows, "log.user", 1, sizes["users"]).tolist()
+    actions = synth.choice(rows, "log.action", ACTION_TYPES, ACTION_WEIGHTS)
+    products = synth.integers(rows, "log.product", 1, sizes["products"]).tolist()
+    terms = synth.choice(rows, "log.term", FLAVOURS + ITEMS)
+    created = synth.timestamps(rows, "log.created_at", sizes["log_days"] * DAY)
+    return [
+        (
+            users[i], action,
+            f'{{"query": "{terms[i]}"}}' if action == "search" else f'{{"product_id": {products[i]}}}',
+            created[i],
+        )
+        for i, action in enumerate(actions)
+    ]
+
+
+def gen_emails(synth, sizes, start, stop):
+    rows = ids(start, stop)
+    users = synth.integers(rows, "email.user", 1, sizes["users"]).tolist()
+    products = synth.integers(rows, "email.product", 1, sizes["products"]).tolist()
+    failed = synth.chance(rows, "email.failed", 0.03).tolist()
+    created = synth.timestamps(rows, "email.created_at", 90 * DAY)
+    sent = synth.after(created, rows, "email.sent_at", datetime.timedelta(minutes=5))
+    # Only finished emails: the outbox worker would send PENDING ones
+    return [
+        (
+            f"bench-user-{users[i]}@example.com", "price_drop",
+            json.dumps({"product_id": products[i]}),
+            "FAILED" if failed[i] else "SENT",
+            5 if failed[i] else 1,
+            "SMTP timeout" if failed[i] else None,
+            created[i], created[i], None if failed[i] else sent[i],
+        )
+        for i in range(len(users))
+    ]
+
+
+class Table:
+    def __init__(
+        self,
+        name: str,
+        columns: Sequence[str],
+        generate: Callable,
+        driver: Callable[[dict], int],
+        explicit_ids: bool = False,
+        chunked: bool = True,
+    ):
+        self.name = name
+        self.columns = list(columns)
+        self.generate = generate
+        # Number of driving ids (the table's own rows, or its parents)
+        self.driver = driver
+        self.explicit_ids = explicit_ids
+        # Self-referencing tables load in one COPY
+        self.chunked = chunked
+
+
+def _size(key: str) -> Callable[[dict], int]:
+    return lambda sizes: sizes[key]
+
+
+# Loaded level by level: a level only references tables of earlier levels
+LEVELS: List[List[Table]] = [
+    [
+        Table("roles", ["id", "name", "description"], gen_roles, lambda sizes: 1, explicit_ids=True, chunked=False),
+        Table("users", ["id", "email", "password_hashed", "fullname", "phone", "is_active", "created_at"],
+              gen_users, lambda sizes: sizes["users"] + 1, explicit_ids=True),
+        Table("categories", ["id", "parent_id", "name", "description"], gen_categories, _size("categories"),
+              explicit_ids=True, chunked=False),
+        Table("tags", ["id", "name"], gen_tags, _size("tags"), explicit_ids=True),
+        Table("ingredients", ["id", "name", "unit", "price_per_unit", "calories_per_unit", "stock_quantity"],
+              gen_ingredients, _size("ingredients"), explicit_ids=True),
+        Table("discounts", ["code", "value", "start_date", "end_date", "is_active", "discount_type"],
+              gen_discounts, _size("discounts")),
+        Table("email_outbox", ["to_email", "template", "context", "status", "attempts", "last_error",
+                               "next_attempt_at", "created_at", "sent_at"], gen_emails, _size("emails")),
+    ],
+    [
+        Table("addresses", ["id", "label", "street", "city", "province", "postal_code", "is_default", "user_id"],
+              gen_addresses, lambda sizes: sizes["users"] + 1, explicit_ids=True),
+        Table("user_roles", ["user_id", "role_id"], gen_user_roles, lambda sizes: sizes["users"] + 1),
+        Table("sessions", ["token_hash", "device_info", "expired_at", "user_id"], gen_sessions, _size("sessions")),
+        Table("products", ["id", "name", "description", "price", "stock", "model_file", "image_url", "is_active",
+                           "nutritions", "category_id"], gen_products, _size("products"), explicit_ids=True),
+        Table("carts", ["id", "created_at", "updated_at", "user_id"], gen_carts,
+              lambda sizes: min(sizes["carts"], sizes["users"]), explicit_ids=True),
+        Table("notifications", ["user_id", "title", "content", "type", "is_read", "created_at"],
+              gen_notifications, _size("notifications")),
+        Table("logging_user_actions", ["user_id", "action_type", "metadata_action", "created_at"],
+              gen_logs, _size("logs")),
+    ],
+    [
+        Table("product_tags", ["product_id", "tag_id"], gen_product_tags, _size("products")),
+        Table("product_ingredients", ["product_id", "ingredient_id", "min_percentage", "max_percentage"],
+              gen_product_ingredients, _size("products")),
+        Table("product_variants", ["product_id", "name", "sku", "price", "stock"],
+              gen_product_variants, _size("products")),
+        Table("product_price_history", ["product_id", "old_price", "new_price", "changed_at"],
+              gen_price_history, _size("price_history")),
+        Table("cart_items", ["quantity", "custom_configuration", "cart_id", "product_id"],
+              gen_cart_items, lambda sizes: min(sizes["carts"], sizes["users"])),
+        Table("orders", ["id", "subtotal", "total_amount", "created_at", "status", "payment_status",
+                         "user_id", "address_id"], gen_orders, _size("orders"), explicit_ids=True),
+        Table("feedback", ["user_id", "product_id", "rating", "comment", "created_at"], gen_feedback, _size("reviews")),
+        Table("wishlist", ["user_id", "product_id", "created_at"], gen_wishlist, _size("wishlist")),
+        Table("recommendations", ["user_id", "product_id", "score"], gen_recommendations, _size("recommendations")),
+    ],
+    [
+        Table("order_items", ["quantity", "custom_configuration", "order_id", "product_id"],
+              gen_order_items, _size("orders")),
+        Table("payments", ["amount", "paid_at", "status", "method", "order_id"], gen_payments, _size("orders")),
+        Table("shipments", ["tracking_code", "courier", "shipped_at", "status", "order_id"],
+              gen_shipments, _size("orders")),
+    ],
+]
+
+TABLES: Dict[str, Table] = {table.name: table for level in LEVELS for table in level}
@@ -0,0 +1,190 @@
+"""
+End-to-end load benchmark
+Run from be/api against a local Postgres (DATABASE_URL):
+    python -m benchmarks.e2e --concurrency 32 --duration 20 --output bench.json
+
+Recreates the tables and seeds a dataset of the given sizes (--users,
+--products, --orders, ...), boots the app under uvicorn, then drives
+each scenario in turn at a fixed concurrency: every virtual user sends
+its next request as soon as the previous one returns.
+
+Prints p50/p95/p99 latency and throughput per scenario as JSON. With
+--baseline, the relative change against an earlier result is added.
+
+--skip-seed reuses the current dataset (larger ones come from
+benchmarks.datagen), --base-url targets a server that is already
+running (it must allow concurrency logins from this host, see
+LOGIN_THROTTLE_IP_LIMIT).
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import nullcontext
+from typing import List, Optional
+from urllib.parse import urlparse
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from app.core.dependencies import AsyncSessionLocal, get_settings, get_vnpay_config
+from benchmarks.e2e import dataset
+from benchmarks.e2e.scenarios import SCENARIOS, Context, VirtualUser, scenario_names
+from benchmarks.e2e.server import AppServer
+
+# Scenarios that change a user's cart get their own users
+AUTHENTICATED = ("add_to_cart", "checkout")
+
+
+def percentiles(samples: List[float]) -> dict:
+    if len(samples) < 2:
+        return {}
+    cuts = statistics.quantiles(samples, n=100)
+    return {
+        "p50_ms": round(cuts[49] * 1000, 2),
+        "p95_ms": round(cuts[94] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2),
+    }
+
+
+async def login(client: httpx.AsyncClient, email: str) -> dict:
+    r = await client.post("/user/login", json={"email": email, "password": dataset.PASSWORD})
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+async def run_scenario(client, ctx: Context, name: str, users: List[VirtualUser], duration: float, warmup: float) -> dict:
+    operation = SCENARIOS[name]
+    latencies: List[float] = []
+    errors = 0
+    recording = False
+    loop = asyncio.get_running_loop()
+
+    async def worker(user: VirtualUser, deadline: float):
+        nonlocal errors
+        while loop.time() < deadline:
+            try:
+                elapsed, ok = await operation(client, ctx, user)
+            except httpx.HTTPError:
+                elapsed, ok = 0.0, False
+            if not recording:
+                continue
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    if warmup > 0:
+        await asyncio.gather(*(worker(user, loop.time() + warmup) for user in users))
+    recording = True
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(user, loop.time() + duration) for user in users))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        **percentiles(latencies),
+    }
+
+
+def compare(results: dict, baseline: dict) -> None:
+    """Adds each scenario's relative change (%) against the baseline run"""
+    for name, result in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        result["vs_baseline"] = {
+            key: round((result[key] - before[key]) / before[key] * 100, 1)
+            for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+            if result.get(key) is not None and before.get(key)
+        }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args):
+    names = scenario_names(args.scenarios)
+    sizes = {key: getattr(args, key) for key in dataset.DEFAULT_SIZES}
+
+    if not args.skip_seed:
+        host = urlparse(get_settings()["DATABASE_URL"]).hostname
+        if host not in ("localhost", "127.0.0.1", "::1") and not args.force:
+            sys.exit(f"refusing to drop every table on {host}; pass --force if you mean it")
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            await dataset.seed(db, sizes, args.seed)
+            print(f"seeded in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    async with AsyncSessionLocal() as db:
+        facts = await dataset.describe(db)
+
+    server = nullcontext() if args.base_url else AppServer(port=args.port, workers=args.workers)
+    async with server:
+        base_url = args.base_url or server.base_url
+        limits = httpx.Limits(max_connections=args.concurrency + 10)
+        async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+            admin_headers = await login(client, dataset.ADMIN_EMAIL)
+            ctx = Context(facts, admin_headers, get_vnpay_config()["vnp_HashSecret"])
+
+            results = {}
+            next_user = 1
+            for name in names:
+                headers = [{}] * args.concurrency
+                if name in AUTHENTICATED:
+                    emails = [dataset.user_email(next_user + i) for i in range(args.concurrency)]
+                    next_user += args.concurrency
+                    headers = await asyncio.gather(*(login(client, email) for email in emails))
+                users = [VirtualUser(i, headers[i], args.seed) for i in range(args.concurrency)]
+                results[name] = await run_scenario(client, ctx, name, users, args.duration, args.warmup)
+                print(f"{name}: {json.dumps(results[name])}", file=sys.stderr)
+
+    report = {
+        "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "workers": None if args.base_url else args.workers,
+        "seed": args.seed,
+        "dataset": {key: value for key, value in facts.items() if key != "pending_orders"},
+        "scenarios": results,
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report, json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.e2e", description="End-to-end load benchmark")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma separated, run in this order")
+    parser.add_argument("--concurrency", type=int, default=32, help="Virtual users per scenario")
+    parser.add_argument("--duration", type=float, default=20, help="Measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=3, help="Unmeasured seconds before each scenario")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the dataset already in the database")
+    parser.add_argument("--force", action="store_true", help="Allow seeding a non-local database")
+    parser.add_argument("--base-url", help="Benchmark a running server instead of booting one")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    for key, default in dataset.DEFAULT_SIZES.items():
+        parser.add_argument(f"--{key}", type=int, default=default, help=f"Rows to seed (default {default})")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,232 @@
+"""
+Benchmark dataset, generated in Postgres with generate_series
+
+Every run starts from empty tables, so ids are 1..N in insertion order.
+random() is seeded with setseed, so the same sizes and seed give the
+same rows (and comparable results) on every run.
+"""
+
+from sqlalchemy import Integer, bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.security import pwd_context
+from app.core.dependencies import engine
+from app.models import Base
+from app.services.partition_service import PartitionService
+from app.services.rating_service import RatingService
+from app.services.analytics_service import AnalyticsService
+
+PASSWORD = "benchmark-password"
+ADMIN_EMAIL = "bench-admin@example.com"
+
+# Product names are "<flavour> <item> #<n>", the search scenario looks them up
+FLAVOURS = [
+    "chocolate", "vanilla", "matcha", "strawberry", "caramel", "lemon",
+    "coconut", "mango", "hazelnut", "coffee", "honey", "cinnamon",
+]
+ITEMS = ["cake", "cookie", "tart", "muffin", "brownie", "cupcake", "macaron", "roll"]
+
+DEFAULT_SIZES = {
+    "categories": 20,
+    "tags": 40,
+    "ingredients": 20,
+    "products": 2000,
+    "users": 2000,
+    "carts": 500,
+    "orders": 5000,
+    "reviews": 10000,
+    "logs": 100000,
+}
+
+
+def user_email(n: int) -> str:
+    return f"bench-user-{n}@example.com"
+
+
+SEED_STATEMENTS = [
+    """
+    INSERT INTO categories (name, description)
+    SELECT 'Category ' || g, 'Benchmark category ' || g
+    FROM generate_series(1, :categories) g
+    """,
+    """
+    INSERT INTO tags (name)
+    SELECT 'tag-' || g FROM generate_series(1, :tags) g
+    """,
+    """
+    INSERT INTO ingredients (name, unit, price_per_unit, calories_per_unit, stock_quantity)
+    SELECT 'ingredient-' || g, 'g', round((0.005 + random() * 0.1)::numeric, 3),
+           round((random() * 9)::numeric, 2), 1e9
+    FROM generate_series(1, :ingredients) g
+    """,
+    """
+    INSERT INTO products (name, description, price, stock, image_url, is_active, category_id, nutritions)
+    SELECT initcap(f) || ' ' || i || ' #' || g,
+           'A ' || f || ' ' || i || ', baked to order',
+           round((20 + random() * 480)::numeric, 2),
+           1000000,
+           'https://img.example.com/bench/' || g || '.png',
+           g % 50 <> 0,
+           1 + g % :categories,
+           json_build_object(
+               'calories', round((150 + random() * 350)::numeric, 1),
+               'protein', round((2 + random() * 8)::numeric, 1),
+               'carbs', round((20 + random() * 50)::numeric, 1),
+               'fat', round((5 + random() * 25)::numeric, 1)
+           )
+    FROM (
+        SELECT g,
+               (CAST(:flavours AS text[]))[1 + floor(random() * cardinality(CAST(:flavours AS text[])))::int] AS f,
+               (CAST(:items AS text[]))[1 + floor(random() * cardinality(CAST(:items AS text[])))::int] AS i
+        FROM generate_series(1, :products) g
+    ) p
+    """,
+    """
+    INSERT INTO product_tags (product_id, tag_id)
+    SELECT DISTINCT p, 1 + floor(random() * :tags)::int
+    FROM generate_series(1, :products) p, generate_series(1, 3) k
+    """,
+    """
+    INSERT INTO product_ingredients (product_id, ingredient_id, min_percentage, max_percentage)
+    SELECT p, 1 + (p + k * 7) % :ingredients, 10, 60
+    FROM generate_series(1, :products) p, generate_series(0, 1) k
+    """,
+    """
+    INSERT INTO users (email, password_hashed, fullname, is_active, created_at)
+    SELECT 'bench-user-' || g || '@example.com', :password_hash, 'Bench User ' || g, true,
+           now() - random() * interval '365 days'
+    FROM generate_series(1, :users) g
+    """,
+    # One address per user: address id = user id
+    """
+    INSERT INTO addresses (label, street, city, province, postal_code, is_default, user_id)
+    SELECT 'home-' || g, g || ' Benchmark St', 'Ho Chi Minh City', 'HCM', '700000', true, g
+    FROM generate_series(1, :users) g
+    """,
+    """
+    INSERT INTO carts (user_id) SELECT g FROM generate_series(1, least(:carts, :users)) g
+    """,
+    """
+    INSERT INTO cart_items (cart_id, product_id, quantity)
+    SELECT c.id, 1 + floor(random() * :products)::int, 1 + floor(random() * 3)::int
+    FROM carts c CROSS JOIN LATERAL generate_series(1, 1 + c.id % 3)
+    """,
+    # A third of the orders still wait for payment, for the IPN scenario
+    """
+    INSERT INTO orders (user_id, address_id, subtotal, total_amount, status, payment_status, created_at)
+    SELECT u, u, 0, 0, s::order_status,
+           (CASE WHEN s IN ('PENDING', 'CANCELLED') THEN 'UNPAID' ELSE 'PAID' END)::order_payment_status,
+           now() - random() * interval '365 days'
+    FROM (
+        SELECT 1 + floor(random() * :users)::int AS u,
+               (ARRAY['PENDING', 'PENDING', 'PAID', 'SHIPPED', 'DELIVERED', 'CANCELLED'])
+                   [1 + floor(random() * 6)::int] AS s
+        FROM generate_series(1, :orders)
+    ) o
+    """,
+    """
+    INSERT INTO order_items (order_id, product_id, quantity)
+    SELECT o.id, 1 + floor(random() * :products)::int, 1 + floor(random() * 3)::int
+    FROM orders o CROSS JOIN LATERAL generate_series(1, 1 + o.id % 4)
+    ON CONFLICT ON CONSTRAINT uq_product_order DO NOTHING
+    """,
+    """
+    UPDATE orders o SET subtotal = t.total, total_amount = t.total
+    FROM (
+        SELECT oi.order_id, round(sum(oi.quantity * p.price)::numeric, 2) AS total
+        FROM order_items oi JOIN products p ON p.id = oi.product_id
+        GROUP BY oi.order_id
+    ) t
+    WHERE o.id = t.order_id
+    """,
+    # Mostly positive, like real reviews
+    """
+    INSERT INTO feedback (user_id, product_id, rating, comment, created_at)
+    SELECT 1 + floor(random() * :users)::int, 1 + floor(random() * :products)::int,
+           (ARRAY[1, 2, 3, 4, 4, 5, 5, 5])[1 + floor(random() * 8)::int],
+           'Benchmark review',
+           now() - random() * interval '365 days'
+    FROM generate_series(1, :reviews)
+    ON CONFLICT ON CONSTRAINT uq_user_product_feedback DO NOTHING
+    """,
+    """
+    INSERT INTO logging_user_actions (user_id, action_type, metadata_action, created_at)
+    SELECT 1 + floor(random() * :users)::int,
+           (ARRAY['view_product', 'view_product', 'view_product', 'add_to_cart', 'add_to_wishlist'])
+               [1 + floor(random() * 5)::int],
+           json_build_object('product_id', 1 + floor(random() * :products)::int),
+           now() - random() * interval '30 days'
+    FROM generate_series(1, :logs)
+    """,
+    """
+    INSERT INTO roles (name, description) VALUES ('admin', 'Administrator')
+    ON CONFLICT (name) DO NOTHING
+    """,
+    """
+    INSERT INTO users (email, password_hashed, fullname, is_active)
+    VALUES (:admin_email, :password_hash, 'Bench Admin', true)
+    """,
+    """
+    INSERT INTO user_roles (user_id, role_id)
+    SELECT u.id, r.id FROM users u, roles r WHERE u.email = :admin_email AND r.name = 'admin'
+    """,
+]
+
+
+async def seed(db: AsyncSession, sizes: dict, seed: int = 42) -> None:
+    """Recreate every table and fill it with `sizes` rows (see DEFAULT_SIZES)"""
+    # The app's engine: the one in services.utils echoes every statement
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    # Monthly log partitions first, so the logs land in them
+    await PartitionService.ensure_action_log_partitions(db, 1)
+
+    params = dict(sizes)
+    params.update({
+        "flavours": FLAVOURS,
+        "items": ITEMS,
+        "password_hash": pwd_context.hash(PASSWORD),
+        "admin_email": ADMIN_EMAIL,
+    })
+    # setseed takes a value in [-1, 1]
+    await db.execute(text("SELECT setseed(:s)"), {"s": (seed % 2000) / 1000 - 1})
+    # Typed, so Postgres does not have to guess (least(:a, :b) would be text)
+    sizes_typed = [bindparam(key, type_=Integer) for key in sizes]
+    for statement in SEED_STATEMENTS:
+        query = text(statement).bindparams(*(p for p in sizes_typed if f":{p.key}" in statement))
+        await db.execute(query, params)
+    await db.commit()
+
+    await RatingService.rebuild_rating_stats(db)
+    await AnalyticsService.rebuild_action_rollups(db)
+    await db.execute(text("ANALYZE"))
+    await db.commit()
+
+
+async def describe(db: AsyncSession) -> dict:
+    """What the scenarios need to know about the current dataset"""
+    counts = (await db.execute(text("""
+        SELECT (SELECT count(*) FROM products),
+               (SELECT coalesce(max(id), 0) FROM products),
+               (SELECT coalesce(max(id), 0) FROM categories),
+               (SELECT count(*) FROM users WHERE email LIKE 'bench-user-%'),
+               (SELECT count(*) FROM orders),
+               (SELECT count(*) FROM feedback),
+               (SELECT count(*) FROM logging_user_actions)
+    """))).one()
+    pending = (await db.execute(text("""
+        SELECT id, total_amount FROM orders
+        WHERE status = 'PENDING' AND payment_status = 'UNPAID'
+        ORDER BY id
+    """))).all()
+    return {
+        "products": counts[0],
+        "max_product_id": counts[1],
+        "max_category_id": counts[2],
+        "users": counts[3],
+        "orders": counts[4],
+        "reviews": counts[5],
+        "logs": counts[6],
+        "pending_orders": [(order_id, total) for order_id, total in pending],
+    }
@@ -0,0 +1,133 @@
+"""
+Benchmark scenarios
+
+Each scenario is one operation of a virtual user and returns the
+(latency, ok) of the request under test. Setup requests an operation
+needs first (filling the cart before a checkout) are not timed.
+"""
+
+import itertools
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+import httpx
+from app.models.vnpay import vnpay
+from benchmarks.e2e.dataset import FLAVOURS, ITEMS
+
+
+class VirtualUser:
+    def __init__(self, index: int, headers: dict, seed: int):
+        self.index = index
+        self.headers = headers
+        self.rng = random.Random(seed * 1000003 + index)
+        self.address_id = None
+
+
+class Context:
+    """Dataset facts and shared state of one benchmark run"""
+
+    def __init__(self, dataset: dict, admin_headers: dict, vnpay_secret: str):
+        self.dataset = dataset
+        self.admin_headers = admin_headers
+        self.vnpay_secret = vnpay_secret
+        # Shared by every IPN worker: each pending order is paid once
+        self.pending_orders = itertools.cycle(dataset["pending_orders"] or [(0, 0.0)])
+
+    def product_id(self, user: VirtualUser) -> int:
+        return user.rng.randint(1, self.dataset["max_product_id"])
+
+
+Operation = Callable[[httpx.AsyncClient, Context, VirtualUser], Awaitable[Tuple[float, bool]]]
+
+
+async def timed(request: Awaitable[httpx.Response]) -> Tuple[float, httpx.Response]:
+    started = time.perf_counter()
+    response = await request
+    return time.perf_counter() - started, response
+
+
+async def browse(client: httpx.AsyncClient, ctx: Context, user: VirtualUser) -> Tuple[float, bool]:
+    """A catalog page: a category listing or a product detail, 3 to 1"""
+    if user.rng.random() < 0.75:
+        params = {
+            "category_id": user.rng.randint(1, ctx.dataset["max_category_id"]),
+            "skip": user.rng.choice([0, 0, 0, 20, 40]),
+            "limit": 20,
+        }
+        elapsed, r = await timed(client.get("/catalog/products", params=params))
+    else:
+        elapsed, r = await timed(client.get(f"/catalog/products/{ctx.product_id(user)}"))
+    # A random product may be inactive (404)
+    return elapsed, r.status_code in (200, 404)
+
+
+async def search(client: httpx.AsyncClient, ctx: Context, user: VirtualUser) -> Tuple[float, bool]:
+    term = user.rng.choice([user.rng.choice(FLAVOURS), user.rng.choice(ITEMS)])
+    elapsed, r = await timed(client.get("/catalog/products", params={"search": term, "limit": 20}))
+    return elapsed, r.status_code == 200
+
+
+async def add_to_cart(client: httpx.AsyncClient, ctx: Context, user: VirtualUser) -> Tuple[float, bool]:
+    elapsed, r = await timed(client.post("/cart/items", headers=user.headers, json={
+        "product_id": ctx.product_id(user),
+        "quantity": user.rng.randint(1, 3),
+        "custom_configuration": None,
+    }))
+    return elapsed, r.status_code == 200
+
+
+async def checkout(client: httpx.AsyncClient, ctx: Context, user: VirtualUser) -> Tuple[float, bool]:
+    """Fills the cart with 1-3 products (untimed), then places the order"""
+    if user.address_id is None:
+        r = await client.get("/users/me/addresses", headers=user.headers)
+        r.raise_for_status()
+        user.address_id = r.json()[0]["id"]
+    for _ in range(user.rng.randint(1, 3)):
+        await client.post("/cart/items", headers=user.headers, json={
+            "product_id": ctx.product_id(user), "quantity": 1, "custom_configuration": None,
+        })
+    elapsed, r = await timed(client.post("/order", headers=user.headers, json={"address_id": user.address_id}))
+    return elapsed, r.status_code == 200
+
+
+async def ipn(client: httpx.AsyncClient, ctx: Context, user: VirtualUser) -> Tuple[float, bool]:
+    """
+    A successful VNPay payment callback for the next pending order. Once
+    every pending order is paid, callbacks get "already updated" and count
+    as errors: size --orders for the duration.
+    """
+    order_id, total = next(ctx.pending_orders)
+    signed = vnpay(ctx.vnpay_secret, "").get_payment_url({
+        "vnp_Amount": str(int(total * 100)),
+        "vnp_ResponseCode": "00",
+        "vnp_TxnRef": f"ORDER{order_id}",
+        "vnp_TransactionNo": str(order_id),
+    })["payment_url"]
+    elapsed, r = await timed(client.get("/order/ipn" + signed))
+    return elapsed, r.status_code == 200 and r.json().get("RspCode") == "00"
+
+
+ADMIN_LISTINGS = ["/admin/users", "/admin/orders", "/admin/feedbacks"]
+
+
+async def admin_listing(client: httpx.AsyncClient, ctx: Context, user: VirtualUser) -> Tuple[float, bool]:
+    elapsed, r = await timed(client.get(user.rng.choice(ADMIN_LISTINGS), headers=ctx.admin_headers))
+    return elapsed, r.status_code == 200
+
+
+SCENARIOS: Dict[str, Operation] = {
+    "browse": browse,
+    "search": search,
+    "add_to_cart": add_to_cart,
+    "checkout": checkout,
+    "ipn": ipn,
+    "admin_listing": admin_listing,
+}
+
+
+def scenario_names(value: str) -> List[str]:
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise ValueError(f"unknown scenarios: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+    return names
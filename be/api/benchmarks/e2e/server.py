@@ -0,0 +1,67 @@
+"""Runs the app under uvicorn in a child process for the duration of a benchmark"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import httpx
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Every virtual user logs in from 127.0.0.1 with the same password
+BENCHMARK_ENV = {
+    "LOGIN_THROTTLE_IP_LIMIT": "1000000",
+    "LOGIN_THROTTLE_EMAIL_LIMIT": "1000000",
+    "LOGIN_THROTTLE_ACCOUNT_IP_LIMIT": "1000000",
+    "DEBUG": "false",
+}
+
+
+class AppServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, workers: int = 1):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self._process = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def __aenter__(self) -> "AppServer":
+        self._process = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--host", self.host,
+                "--port", str(self.port),
+                "--workers", str(self.workers),
+                "--no-access-log",
+            ],
+            cwd=API_DIR,
+            env={**os.environ, **BENCHMARK_ENV},
+        )
+        await self._wait_ready()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._process.terminate()
+        try:
+            self._process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+
+    async def _wait_ready(self, timeout: float = 60.0) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        async with httpx.AsyncClient(base_url=self.base_url) as client:
+            while loop.time() < deadline:
+                if self._process.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with code {self._process.returncode}")
+                try:
+                    if (await client.get("/")).status_code == 200:
+                        return
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.2)
+        self._process.kill()
+        raise RuntimeError(f"server not ready after {timeout:.0f}s")
@@ -0,0 +1,125 @@
+"""
+Login storm load test
+Run against a running server started with the login throttle raised,
+since every login comes from one IP and a few emails:
+    LOGIN_THROTTLE_IP_LIMIT=1000000 LOGIN_THROTTLE_EMAIL_LIMIT=1000000 \\
+    LOGIN_THROTTLE_ACCOUNT_IP_LIMIT=1000000 uvicorn app.main:app
+    python benchmarks/login_storm.py --base-url http://localhost:8000 --concurrency 50
+
+Measures /user/login throughput and how much the latency of a cheap
+endpoint (--probe-path) degrades while logins are hashing, compared to
+an idle baseline. Test users are registered on first run. Throttled
+logins (429) are reported apart from errors: if there are any, the
+throughput is the throttle's, not the hashing's.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import List
+import httpx
+
+PASSWORD = "benchmark-password"
+
+
+def percentiles(samples: List[float]) -> dict:
+    if len(samples) < 2:
+        return {"count": len(samples)}
+    cuts = statistics.quantiles(samples, n=100)
+    return {
+        "count": len(samples),
+        "p50_ms": round(cuts[49] * 1000, 1),
+        "p95_ms": round(cuts[94] * 1000, 1),
+        "p99_ms": round(cuts[98] * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+async def register_users(client: httpx.AsyncClient, count: int) -> List[str]:
+    emails = [f"login-storm-{i}@example.com" for i in range(count)]
+    for email in emails:
+        r = await client.post("/user/register-user", json={
+            "fullname": "Login Storm", "email": email, "password": PASSWORD,
+        })
+        if r.status_code not in (200, 400):  # 400: already registered
+            r.raise_for_status()
+    return emails
+
+
+async def probe(client: httpx.AsyncClient, path: str, interval: float, stop: asyncio.Event) -> List[float]:
+    """Latency of one request to path every interval seconds until stop"""
+    samples = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get(path)
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def login_worker(client: httpx.AsyncClient, emails: List[str], offset: int, stop: asyncio.Event, results: dict):
+    i = offset
+    while not stop.is_set():
+        started = time.perf_counter()
+        r = await client.post("/user/login", json={"email": emails[i % len(emails)], "password": PASSWORD})
+        elapsed = time.perf_counter() - started
+        if r.status_code == 200:
+            results["latencies"].append(elapsed)
+        elif r.status_code == 429:
+            results["throttled"] += 1
+        else:
+            results["errors"][r.status_code] = results["errors"].get(r.status_code, 0) + 1
+        i += 1
+
+
+async def run_for(seconds: float, stop: asyncio.Event):
+    await asyncio.sleep(seconds)
+    stop.set()
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.concurrency + 10)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=limits) as client:
+        emails = await register_users(client, args.users)
+
+        stop = asyncio.Event()
+        baseline, _ = await asyncio.gather(
+            probe(client, args.probe_path, args.probe_interval, stop),
+            run_for(args.duration, stop),
+        )
+
+        stop = asyncio.Event()
+        results = {"latencies": [], "throttled": 0, "errors": {}}
+        workers = [login_worker(client, emails, i, stop, results) for i in range(args.concurrency)]
+        started = time.perf_counter()
+        during = (await asyncio.gather(
+            probe(client, args.probe_path, args.probe_interval, stop),
+            run_for(args.duration, stop),
+            *workers,
+        ))[0]
+        elapsed = time.perf_counter() - started
+
+    print(json.dumps({
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 1),
+        "logins_per_s": round(len(results["latencies"]) / elapsed, 1),
+        "login": percentiles(results["latencies"]),
+        "login_throttled": results["throttled"],
+        "login_errors": results["errors"],
+        "probe_path": args.probe_path,
+        "probe_idle": percentiles(baseline),
+        "probe_during_storm": percentiles(during),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Login storm load test")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=15, help="Seconds per phase")
+    parser.add_argument("--probe-path", default="/")
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,142 @@
+"""
+Maintenance commands
+Run: python manage.py <command> [options]
+"""
+
+import argparse
+import asyncio
+import datetime
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from app.core.dependencies import AsyncSessionLocal
+from app.services.rating_service import RatingService
+from app.services.partition_service import PartitionService
+from app.services.analytics_service import AnalyticsService
+from app.services.recommendation_service import RecommendationService
+from app.services.co_purchase_service import CoPurchaseService
+from app.services.session_service import SessionService
+from app.core.config import JWT_KEYS_DIR
+
+
+async def rebuild_ratings(args):
+    async with AsyncSessionLocal() as db:
+        await RatingService.rebuild_rating_stats(db)
+    print("rebuilt product rating stats")
+
+
+async def ensure_log_partitions(args):
+    async with AsyncSessionLocal() as db:
+        created = await PartitionService.ensure_action_log_partitions(db, args.months_ahead, args.months_back)
+    print(f"created partitions: {', '.join(created) or 'none'}")
+
+
+async def drop_log_partitions(args):
+    async with AsyncSessionLocal() as db:
+        dropped = await PartitionService.drop_action_log_partitions(db, args.keep_months)
+    print(f"dropped partitions: {', '.join(dropped) or 'none'}")
+
+
+async def rollup_actions(args):
+    async with AsyncSessionLocal() as db:
+        if args.rebuild or args.rebuild_from:
+            watermark = await AnalyticsService.rebuild_action_rollups(db, args.rebuild_from)
+        else:
+            watermark = await AnalyticsService.rollup_actions(db)
+    if watermark is None:
+        print("rollup already running on another worker")
+    else:
+        print(f"action rollups up to {watermark.isoformat()}")
+
+
+async def build_recommendations(args):
+    async with AsyncSessionLocal() as db:
+        stats = await RecommendationService.build_recommendations(db, full=args.full)
+    if stats is None:
+        print("recommendations already being built on another worker")
+    else:
+        mode = "full" if stats["full"] else "incremental"
+        print(f"{mode} run: {stats['recommendations']} recommendations for {stats['users']} users")
+
+
+async def rebuild_co_purchases(args):
+    async with AsyncSessionLocal() as db:
+        pairs = await CoPurchaseService.rebuild(db)
+    if pairs is None:
+        print("co-purchases already being rebuilt on another worker")
+    else:
+        print(f"rebuilt product co-purchases: {pairs} pairs")
+
+
+async def sweep_sessions(args):
+    async with AsyncSessionLocal() as db:
+        deleted = await SessionService.sweep_expired(db, args.batch_size)
+    print(f"deleted {deleted} expired sessions")
+
+
+async def generate_jwt_key(args):
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+    if args.alg.startswith("ES"):
+        curve = {"ES256": ec.SECP256R1, "ES384": ec.SECP384R1, "ES512": ec.SECP521R1}[args.alg]
+        key = ec.generate_private_key(curve())
+    else:
+        key = rsa.generate_private_key(public_exponent=65537, key_size=args.rsa_bits)
+    kid = args.kid or datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%d%H%M%S")
+    os.makedirs(JWT_KEYS_DIR, exist_ok=True)
+    path = os.path.join(JWT_KEYS_DIR, f"{kid}.pem")
+    with open(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ))
+    print(f"wrote {args.alg} key {kid} to {path}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    cmd = commands.add_parser("rebuild-ratings", help="Recompute product_rating_stats from feedback")
+    cmd.set_defaults(handler=rebuild_ratings)
+
+    cmd = commands.add_parser("ensure-log-partitions", help="Create upcoming monthly partitions of logging_user_actions")
+    cmd.add_argument("--months-ahead", type=int, default=2)
+    cmd.add_argument("--months-back", type=int, default=0, help="Also create past months, before a backfill")
+    cmd.set_defaults(handler=ensure_log_partitions)
+
+    cmd = commands.add_parser("drop-log-partitions", help="Drop logging_user_actions partitions older than --keep-months")
+    cmd.add_argument("--keep-months", type=int, required=True)
+    cmd.set_defaults(handler=drop_log_partitions)
+
+    cmd = commands.add_parser("rollup-actions", help="Fold new action logs into action_rollups_hourly")
+    cmd.add_argument("--rebuild", action="store_true", help="Recompute all rollups")
+    cmd.add_argument("--rebuild-from", type=datetime.datetime.fromisoformat, help="Recompute rollups from this ISO time")
+    cmd.set_defaults(handler=rollup_actions)
+
+    cmd = commands.add_parser("build-recommendations", help="Refresh item-item recommendations of recently active users")
+    cmd.add_argument("--full", action="store_true", help="Recompute item similarities and rescore every user")
+    cmd.set_defaults(handler=build_recommendations)
+
+    cmd = commands.add_parser("rebuild-co-purchases", help="Recompute frequently bought together pairs")
+    cmd.set_defaults(handler=rebuild_co_purchases)
+
+    cmd = commands.add_parser("sweep-sessions", help="Delete expired sessions in batches")
+    cmd.add_argument("--batch-size", type=int, default=1000)
+    cmd.set_defaults(handler=sweep_sessions)
+
+    cmd = commands.add_parser("generate-jwt-key", help="Write a new private signing key to JWT_KEYS_DIR")
+    cmd.add_argument("--alg", choices=["RS256", "RS384", "RS512", "ES256", "ES384", "ES512"], default="ES256")
+    cmd.add_argument("--kid", help="Key id (default: current UTC timestamp)")
+    cmd.add_argument("--rsa-bits", type=int, default=2048)
+    cmd.set_defaults(handler=generate_jwt_key)
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    asyncio.run(args.handler(args))
@@ -0,0 +1,125 @@
+"""
+Shared test fixtures
+Run from be/api: TEST_DATABASE_URL=postgresql://... python -m pytest tests
+
+Tests that need Postgres use the `client`/`db` fixtures, which drop and
+recreate every table of TEST_DATABASE_URL once per session; they are
+skipped when it is not set. Never point it at a database you care about.
+"""
+
+import os
+import sys
+import uuid
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+# Before any app import: the engines are built from the environment at import
+# time, and load_dotenv() does not override what is already set here
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL or "postgresql://localhost/unused"
+os.environ.setdefault("ALGO", "HS256")
+os.environ.setdefault("SEC_KEY", "test-secret-key")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+os.environ.setdefault("VNP_TMNCODE", "TEST")
+os.environ.setdefault("VNP_HASHSECRET", "test-vnpay-secret")
+os.environ.setdefault("VNP_URL", "http://vnpay.test/pay")
+os.environ.setdefault("VNP_RETURNURL", "http://test/order/payment_return")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("LOG_FILE", "")
+# Confirmation emails fail fast instead of reaching a real server
+os.environ["SMTP_SERVER"] = "127.0.0.1"
+os.environ["SMTP_PORT"] = "9"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import pytest
+from app.core.dependencies import AsyncSessionLocal, engine
+from app.core.security import pwd_context
+from app.main import app
+from app.models import Base
+from app.models.user import User, Address
+
+PASSWORD = "test-password"
+
+
+async def login(client, user) -> dict:
+    response = await client.post("/user/login", json={"email": user.email, "password": PASSWORD})
+    assert response.status_code == 200
+    return response.json()
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+class ScriptedSession:
+    """Stands in for an AsyncSession: each execute() returns the next scripted rows"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+
+    async def execute(self, statement, params=None):
+        return ScriptedResult(self.results.pop(0))
+
+
+class ScriptedResult:
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    def all(self):
+        return self.rows
+
+    def scalars(self):
+        return self
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def database():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db(database):
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+async def client(database):
+    # No lifespan: background workers and catalog engines are not started
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+async def user(db) -> User:
+    """A fresh user with PASSWORD and a default address"""
+    suffix = uuid.uuid4().hex[:12]
+    user = User(
+        email=f"user-{suffix}@example.com",
+        password_hashed=pwd_context.hash(PASSWORD),
+        fullname="Test User",
+        is_active=True,
+    )
+    db.add(user)
+    await db.flush()
+    db.add(Address(
+        label=f"home-{suffix}", street="1 Test St", city="Ho Chi Minh City",
+        province="HCM", postal_code="700000", user_id=user.id,
+    ))
+    await db.commit()
+    return user
+
@@ -0,0 +1,37 @@
+import asyncio
+import datetime
+import pytest
+from sqlalchemy import select
+from app.models.engagement import LoggingUserAction
+from app.services.action_log_buffer import ActionLogBuffer
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_rows_are_stamped_when_written(db, user):
+    buffer = ActionLogBuffer()
+    buffer.add(user.id, "view_product", {"product_id": 1})
+    # Queued for a while, as during a database outage
+    await asyncio.sleep(0.2)
+    queued_until = datetime.datetime.now(datetime.timezone.utc)
+    assert await buffer.flush() == 1
+
+    created_at = (await db.execute(
+        select(LoggingUserAction.created_at).where(LoggingUserAction.user_id == user.id)
+    )).scalar_one()
+    assert created_at >= queued_until
+
+
+async def test_rejected_rows_are_dropped_and_the_rest_written(db, user):
+    buffer = ActionLogBuffer()
+    for i in range(7):
+        buffer.add(user.id, "view_product", {"product_id": i})
+    buffer.add(-1, "view_product")  # no such user
+    buffer.add(user.id, "x" * 300)  # longer than the column
+
+    assert await buffer.flush() == 7
+    assert buffer.dropped == 2 and len(buffer) == 0
+    count = len((await db.execute(
+        select(LoggingUserAction.id).where(LoggingUserAction.user_id == user.id)
+    )).all())
+    assert count == 7
@@ -0,0 +1,39 @@
+import datetime
+import pytest
+from jose import jwt
+from app.core.dependencies import get_settings
+from app.core.security import encode_token
+from conftest import bearer, login
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_refresh_token_is_not_an_access_token(client, user):
+    tokens = await login(client, user)
+
+    assert (await client.get("/user/me", headers=bearer(tokens["access_token"]))).status_code == 200
+    response = await client.get("/user/me", headers=bearer(tokens["refresh_token"]))
+    assert response.status_code == 401
+
+
+async def test_untyped_refresh_token_is_not_an_access_token(client, user):
+    # Refresh tokens issued before tokens were typed: no typ, no sid
+    expire = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=7)
+    legacy = encode_token({"sub": user.email, "exp": expire}, get_settings())
+
+    response = await client.get("/user/me", headers=bearer(legacy))
+    assert response.status_code == 401
+
+
+async def test_access_token_of_revoked_session_is_rejected(client, user):
+    phone, laptop = await login(client, user), await login(client, user)
+    laptop_sid = jwt.get_unverified_claims(laptop["access_token"])["sid"]
+    assert jwt.get_unverified_claims(laptop["refresh_token"])["sid"] == laptop_sid
+
+    # Verified once, so its claims are cached when the session goes away
+    assert (await client.get("/user/me", headers=bearer(laptop["access_token"]))).status_code == 200
+    response = await client.delete(f"/user/sessions/{laptop_sid}", headers=bearer(phone["access_token"]))
+    assert response.status_code == 200
+
+    assert (await client.get("/user/me", headers=bearer(laptop["access_token"]))).status_code == 401
+    assert (await client.get("/user/me", headers=bearer(phone["access_token"]))).status_code == 200
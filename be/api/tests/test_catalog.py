@@ -0,0 +1,84 @@
+import uuid
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import select
+from app.core.query_counter import assert_max_queries
+from app.models.category import Category
+from app.models.engagement import ProductRatingStats
+from app.models.ingredient import Ingredient
+from app.models.product import Product, ProductIngredient
+from app.models.product_variant import ProductVariant
+from app.schemas.catalog import IngredientUpdate
+
+pytestmark = pytest.mark.anyio
+
+
+async def category_with_products(db, count: int) -> int:
+    """A category of `count` products, each with a variant and an ingredient"""
+    suffix = uuid.uuid4().hex[:12]
+    category = Category(name=f"Pastries {suffix}", description="Pastries")
+    ingredient = Ingredient(
+        name=f"butter-{suffix}", unit="g", price_per_unit=0.02,
+        calories_per_unit=7.2, stock_quantity=1000,
+    )
+    db.add_all([category, ingredient])
+    await db.flush()
+    for i in range(count):
+        product = Product(
+            name=f"Pastry {suffix}-{i}", description="A pastry", price=3.0, stock=100,
+            image_url=f"https://img.test/{suffix}-{i}.png", category_id=category.id,
+            nutritions={"calories": 400, "protein": 5, "carbs": 45, "fat": 22},
+        )
+        db.add(product)
+        await db.flush()
+        db.add_all([
+            ProductVariant(product_id=product.id, name="Large", sku=f"{suffix}-{i}", price=4.0, stock=10),
+            ProductIngredient(
+                product_id=product.id, ingredient_id=ingredient.id, min_percentage=20, max_percentage=30,
+            ),
+        ])
+    await db.commit()
+    return category.id
+
+
+async def test_product_list_queries_do_not_grow_with_products(client, db):
+    category_id = await category_with_products(db, 20)
+
+    # Relationships load per statement (selectin), not per product
+    with assert_max_queries(9):
+        response = await client.get("/catalog/products", params={"category_id": category_id})
+    assert response.status_code == 200
+    assert len(response.json()) == 20
+
+
+async def test_rating_sort_pages_through_reviewed_then_unreviewed(client, db):
+    category_id = await category_with_products(db, 5)
+    ids = (await db.execute(
+        select(Product.id).where(Product.category_id == category_id).order_by(Product.id)
+    )).scalars().all()
+    # (average, count) per product; the last two have no reviews
+    for product_id, (average, count) in zip(ids, [(3.0, 4), (4.5, 2), (4.5, 10)]):
+        db.add(ProductRatingStats(
+            product_id=product_id, rating_count=count, rating_sum=int(average * count), rating_avg=average,
+        ))
+    await db.commit()
+    expected = [ids[2], ids[1], ids[0], ids[3], ids[4]]
+
+    async def page(skip: int, limit: int):
+        response = await client.get("/catalog/products", params={
+            "category_id": category_id, "sort_by": "rating", "skip": skip, "limit": limit,
+        })
+        assert response.status_code == 200
+        return [product["id"] for product in response.json()]
+
+    assert await page(0, 10) == expected
+    assert await page(0, 2) + await page(2, 2) + await page(4, 2) == expected
+    assert await page(3, 2) == expected[3:]
+    assert await page(5, 2) == []
+
+
+def test_ingredient_update_rejects_null_columns():
+    assert IngredientUpdate(price_per_unit=0.5).model_dump(exclude_unset=True) == {"price_per_unit": 0.5}
+    for field in ("price_per_unit", "calories_per_unit", "stock_quantity"):
+        with pytest.raises(ValidationError):
+            IngredientUpdate(**{field: None})
@@ -0,0 +1,40 @@
+import asyncio
+import json
+import asyncpg
+import pytest
+from app.services import catalog_sync
+from app.services.catalog_sync import CatalogSync, CATALOG_CHANNEL
+from app.services.co_purchase_service import CoPurchaseService, _bought_together
+from conftest import TEST_DATABASE_URL
+
+pytestmark = pytest.mark.anyio
+
+
+def message(origin: str, **values) -> str:
+    return json.dumps({"origin": origin, "ingredients": [], "products": [], **values})
+
+
+def test_other_workers_clear_the_named_caches():
+    _bought_together.set(1, [{"product_id": 2}])
+
+    CatalogSync.handle_change(message(catalog_sync._ORIGIN, caches=["bought_together"]))
+    assert _bought_together.get(1) is not None
+
+    CatalogSync.handle_change(message("another-worker", caches=["bought_together", "unknown"]))
+    assert _bought_together.get(1) is None
+
+
+async def test_rebuild_tells_every_worker(db):
+    payloads = []
+    listener = await asyncpg.connect(TEST_DATABASE_URL)
+    try:
+        await listener.add_listener(CATALOG_CHANNEL, lambda *args: payloads.append(args[-1]))
+        assert await CoPurchaseService.rebuild(db) is not None
+        for _ in range(50):
+            if payloads:
+                break
+            await asyncio.sleep(0.05)
+    finally:
+        await listener.close()
+
+    assert [json.loads(payload)["caches"] for payload in payloads] == [["bought_together"]]
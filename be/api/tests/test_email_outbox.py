@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import uuid
+import pytest
+from sqlalchemy import select, text
+from app.models.engagement import EmailOutbox, EmailStatus
+from app.services.email_outbox_service import EmailOutboxWorker
+from app.services.email_service import EmailService
+
+pytestmark = pytest.mark.anyio
+
+
+async def enqueue(db, **values) -> int:
+    row = EmailOutbox(
+        to_email=f"outbox-{uuid.uuid4().hex[:12]}@example.com", template="price_drop",
+        context={"product_id": 1, "product_name": "Cake", "old_price": 20.0, "new_price": 15.0},
+        **values,
+    )
+    db.add(row)
+    await db.commit()
+    return row.id
+
+
+async def outbox_row(db, row_id: int):
+    db.expire_all()
+    return (await db.execute(
+        select(EmailOutbox.status, EmailOutbox.attempts).where(EmailOutbox.id == row_id)
+    )).one()
+
+
+async def test_rows_are_leased_not_locked_while_sending(db, monkeypatch):
+    row_id = await enqueue(db)
+    sending, release = threading.Event(), threading.Event()
+
+    def slow_send(self, to_email, **context):
+        sending.set()
+        release.wait(5)
+        return True
+
+    monkeypatch.setattr(EmailService, "send_price_drop_email", slow_send)
+    drain = asyncio.create_task(EmailOutboxWorker().drain_once())
+    while not sending.is_set():
+        await asyncio.sleep(0.01)
+
+    # Claimed and committed: no row lock is held during the SMTP call
+    assert await outbox_row(db, row_id) == (EmailStatus.SENDING, 1)
+    await db.execute(text("SELECT 1 FROM email_outbox WHERE id = :id FOR UPDATE NOWAIT"), {"id": row_id})
+    await db.rollback()
+    # and another worker does not claim it again
+    assert await EmailOutboxWorker().drain_once() == 0
+
+    release.set()
+    assert await drain == 1
+    assert await outbox_row(db, row_id) == (EmailStatus.SENT, 1)
+
+
+async def test_failed_send_is_rescheduled(db, monkeypatch):
+    row_id = await enqueue(db)
+    monkeypatch.setattr(EmailService, "send_price_drop_email", lambda self, to_email, **context: False)
+
+    assert await EmailOutboxWorker().drain_once() == 1
+    assert await outbox_row(db, row_id) == (EmailStatus.PENDING, 1)
+
+
+async def test_expired_lease_is_claimed_again(db, monkeypatch):
+    # Leased by a worker that died before recording the result
+    row_id = await enqueue(db, status=EmailStatus.SENDING, attempts=1)
+    monkeypatch.setattr(EmailService, "send_price_drop_email", lambda self, to_email, **context: True)
+
+    assert await EmailOutboxWorker().drain_once() == 1
+    assert await outbox_row(db, row_id) == (EmailStatus.SENT, 2)
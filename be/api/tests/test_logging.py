@@ -0,0 +1,22 @@
+import logging
+import os
+from app.core.logging_config import SizedTimedRotatingFileHandler, process_log_file
+
+
+def test_each_process_gets_its_own_log_file():
+    assert process_log_file("logs/api.log") == f"logs/api.{os.getpid()}.log"
+    assert process_log_file("api") == f"api.{os.getpid()}"
+
+
+def test_size_rollover_keeps_every_record(tmp_path):
+    path = str(tmp_path / "api.log")
+    handler = SizedTimedRotatingFileHandler(path, max_bytes=100, backup_count=10)
+    for i in range(20):
+        handler.emit(logging.LogRecord("test", logging.INFO, __file__, 0, f"record {i:02d} " + "x" * 20, None, None))
+    handler.close()
+
+    lines = []
+    for name in os.listdir(tmp_path):
+        with open(tmp_path / name) as f:
+            lines += f.read().splitlines()
+    assert sorted(line.split()[1] for line in lines) == [f"{i:02d}" for i in range(20)]
@@ -0,0 +1,57 @@
+import pytest
+from starlette.requests import Request
+from app.services.login_throttle import LoginThrottle, client_ip, parse_proxies
+
+pytestmark = pytest.mark.anyio
+
+PROXIES = parse_proxies("10.0.0.1, 10.1.0.0/16")
+
+
+def request(peer: str, *forwarded_for: str) -> Request:
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded_for]
+    return Request({"type": "http", "client": (peer, 40000), "headers": headers})
+
+
+def test_forwarded_for_is_only_read_from_trusted_proxies():
+    # Direct clients cannot pick their own key
+    assert client_ip(request("203.0.113.9", "1.2.3.4"), PROXIES) == "203.0.113.9"
+    assert client_ip(request("10.0.0.1", "1.2.3.4"), []) == "10.0.0.1"
+
+    assert client_ip(request("10.0.0.1", "198.51.100.7"), PROXIES) == "198.51.100.7"
+    assert client_ip(request("10.0.0.1"), PROXIES) == "10.0.0.1"
+    # Read from the right: the entries the client wrote itself are skipped
+    assert client_ip(request("10.0.0.1", "1.2.3.4, 198.51.100.7, 10.1.2.3"), PROXIES) == "198.51.100.7"
+    assert client_ip(request("10.0.0.1", "1.2.3.4", "198.51.100.7"), PROXIES) == "198.51.100.7"
+    assert client_ip(request("10.0.0.1", "10.1.0.5, 10.1.0.6"), PROXIES) == "10.1.0.5"
+
+
+def throttle(**limits) -> LoginThrottle:
+    values = {"ip_limit": 100, "account_ip_limit": 100, "email_limit": 100, **limits}
+    return LoginThrottle(window=60, max_pending_hashes=1000, **values)
+
+
+async def test_account_is_limited_per_ip_before_its_own_budget():
+    limiter = throttle(account_ip_limit=2, email_limit=3)
+
+    assert await limiter.check("1.1.1.1", "Victim@example.com") is None
+    assert await limiter.check("1.1.1.1", "victim@example.com") is None
+    assert await limiter.check("1.1.1.1", "victim@example.com") is not None
+    # Another account from that IP, and that account from another IP, go on
+    assert await limiter.check("1.1.1.1", "other@example.com") is None
+    assert await limiter.check("2.2.2.2", "victim@example.com") is None
+    assert await limiter.check("3.3.3.3", "victim@example.com") is not None
+    assert limiter.counters["shed_account_ip"] == 1
+    assert limiter.counters["shed_email"] == 1
+
+
+async def test_success_clears_the_account_not_the_ip():
+    limiter = throttle(ip_limit=3, account_ip_limit=1)
+
+    assert await limiter.check("1.1.1.1", "user@example.com") is None
+    assert await limiter.check("1.1.1.1", "user@example.com") is not None
+    await limiter.record_success("1.1.1.1", "USER@example.com")
+    assert await limiter.check("1.1.1.1", "user@example.com") is None
+    # Every attempt counted against the IP, shed or not
+    assert await limiter.check("1.1.1.1", "other@example.com") is not None
+    assert limiter.counters["shed_account_ip"] == 1
+    assert limiter.counters["shed_ip"] == 1
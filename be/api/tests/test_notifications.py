@@ -0,0 +1,126 @@
+import asyncio
+import json
+import time
+import asyncpg
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import delete, text
+from app.models.user import Session
+from app.schemas.engagement import NotificationIds
+from app.services.notification_hub import NotificationHub, NOTIFICATION_CHANNEL
+from conftest import TEST_DATABASE_URL, bearer, login
+
+pytestmark = pytest.mark.anyio
+
+BULK_INSERT = text("""
+    INSERT INTO notifications (user_id, title, content, type, is_read, created_at)
+    SELECT :user_id, 'Price drop', 'Now cheaper', 'PROMOTION', false, now()
+    FROM generate_series(1, :count)
+""")
+
+
+def test_dispatch_reaches_only_connected_recipients():
+    hub = NotificationHub()
+    queue = hub.connect(7)
+    hub.dispatch(json.dumps({
+        "title": "Price drop", "content": "Now cheaper", "type": "promotion",
+        "is_read": False, "created_at": "2026-10-19T12:00:00+00:00",
+        "recipients": [[101, 5], [102, 7], [103, 9]],
+    }))
+
+    assert queue.qsize() == 1
+    event_id, data = queue.get_nowait()
+    assert event_id == 102
+    assert json.loads(data) == {
+        "id": 102, "user_id": 7, "title": "Price drop", "content": "Now cheaper",
+        "type": "promotion", "is_read": False, "created_at": "2026-10-19T12:00:00+00:00",
+    }
+
+
+async def test_bulk_insert_sends_one_notify_per_chunk(db, user):
+    payloads = []
+    listener = await asyncpg.connect(TEST_DATABASE_URL)
+    try:
+        await listener.add_listener(NOTIFICATION_CHANNEL, lambda *args: payloads.append(args[-1]))
+        await db.execute(BULK_INSERT, {"user_id": user.id, "count": 400})
+        await db.commit()
+        for _ in range(50):
+            if len(payloads) == 3:
+                break
+            await asyncio.sleep(0.05)
+    finally:
+        await listener.close()
+
+    assert len(payloads) == 3
+    recipients = [pair for payload in payloads for pair in json.loads(payload)["recipients"]]
+    assert len(recipients) == 400
+    assert {user_id for _, user_id in recipients} == {user.id}
+
+
+def test_mark_read_ids_are_bounded():
+    assert NotificationIds(ids=list(range(500))).ids[-1] == 499
+    for ids in ([], list(range(501))):
+        with pytest.raises(ValidationError):
+            NotificationIds(ids=ids)
+
+
+async def test_unread_count_keyset_paging_and_bulk_mark_read(client, db, user):
+    await db.execute(BULK_INSERT, {"user_id": user.id, "count": 5})
+    await db.commit()
+    headers = bearer((await login(client, user))["access_token"])
+
+    async def unread() -> int:
+        return (await client.get("/notifications/unread-count", headers=headers)).json()["unread"]
+
+    assert await unread() == 5
+    first = (await client.get("/notifications", params={"limit": 3}, headers=headers)).json()
+    rest = (await client.get(
+        "/notifications", params={"limit": 3, "before_id": first[-1]["id"]}, headers=headers
+    )).json()
+    ids = [n["id"] for n in first + rest]
+    assert len(ids) == 5 and ids == sorted(ids, reverse=True)
+
+    # Unknown and already read ids are skipped
+    response = await client.post("/notifications/mark-read", json={"ids": [ids[0], ids[1], 2**31 - 1]}, headers=headers)
+    assert response.json()["updated"] == 2
+    response = await client.post("/notifications/mark-read", json={"ids": [ids[0]]}, headers=headers)
+    assert response.json()["updated"] == 0
+    assert await unread() == 3
+
+    response = await client.post("/notifications/mark-all-read", headers=headers)
+    assert response.json()["updated"] == 3
+    assert await unread() == 0
+
+
+async def collect(stream) -> list:
+    return [event async for event in stream]
+
+
+async def test_stream_closes_when_the_token_expires():
+    hub = NotificationHub(heartbeat=10)
+    events = await asyncio.wait_for(collect(hub.stream(7, expires_at=time.time() + 0.05)), 1)
+
+    assert events == ["retry: 5000\n\n", 'event: close\ndata: {"reason": "expired"}\n\n']
+    assert hub.connections == 0
+
+
+async def test_stream_closes_when_the_session_is_gone():
+    hub = NotificationHub(heartbeat=0.01)
+    checks = []
+
+    async def is_active():
+        checks.append(True)
+        return len(checks) < 3
+
+    events = await asyncio.wait_for(collect(hub.stream(7, is_active=is_active)), 1)
+    assert events[1:] == [": ping\n\n", ": ping\n\n", 'event: close\ndata: {"reason": "revoked"}\n\n']
+
+
+async def test_stream_requires_a_live_session(client, db, user):
+    token = (await login(client, user))["access_token"]
+    # Gone from the database without this worker hearing about it
+    await db.execute(delete(Session).where(Session.user_id == user.id))
+    await db.commit()
+
+    response = await client.get("/notifications/stream", params={"token": token})
+    assert response.status_code == 401
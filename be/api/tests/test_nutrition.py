@@ -0,0 +1,57 @@
+from collections import namedtuple
+import pytest
+from app.services.nutrition_service import NutritionEngine
+from conftest import ScriptedSession
+
+pytestmark = pytest.mark.anyio
+
+Calories = namedtuple("Calories", "id calories_per_unit")
+Recipe = namedtuple("Recipe", "product_id ingredient_id min_percentage max_percentage")
+
+
+async def built_engine() -> NutritionEngine:
+    engine = NutritionEngine()
+    await engine.rebuild(ScriptedSession(
+        [Calories(1, 7.0), Calories(2, 3.5)],
+        [Recipe(10, 1, 20, 30), Recipe(10, 2, 50, 60), Recipe(11, 2, None, 40)],
+    ))
+    return engine
+
+
+def calories(low, high, typical):
+    return {"calories_min": low, "calories_max": high, "calories_typical": typical}
+
+
+async def test_rebuild_computes_every_product():
+    engine = await built_engine()
+
+    assert engine.get(10) == calories(315.0, 420.0, 367.5)
+    # A missing bound falls back to the other one
+    assert engine.get(11) == calories(140.0, 140.0, 140.0)
+    assert engine.get(12) is None
+
+
+async def test_ingredient_changes_recompute_the_products_using_them():
+    engine = await built_engine()
+
+    await engine.refresh_ingredients([1], ScriptedSession([Calories(1, 9.0)]))
+    assert engine.get(10) == calories(355.0, 480.0, 417.5)
+    assert engine.get(11) == calories(140.0, 140.0, 140.0)
+
+    # Deleted: its recipe rows go with it
+    await engine.refresh_ingredients([2], ScriptedSession([]))
+    assert engine.get(10) == calories(180.0, 270.0, 225.0)
+    assert engine.get(11) is None
+
+
+async def test_product_refresh_replaces_its_recipe():
+    engine = await built_engine()
+
+    # Ingredient 3 was created after the rebuild
+    await engine.refresh_products([11, 12], ScriptedSession(
+        [Recipe(11, 3, 10, 20), Recipe(12, 1, 10, 10)],
+        [Calories(3, 2.0)],
+    ))
+    assert engine.get(10) == calories(315.0, 420.0, 367.5)
+    assert engine.get(11) == calories(20.0, 40.0, 30.0)
+    assert engine.get(12) == calories(70.0, 70.0, 70.0)
@@ -0,0 +1,91 @@
+import asyncio
+import os
+import uuid
+import pytest
+from sqlalchemy import select
+from app.models.category import Category
+from app.models.ingredient import Ingredient
+from app.models.order import Order, OrderItem, Order_Status, Order_Payment_Status
+from app.models.product import Product, ProductIngredient
+from app.models.user import Address
+from app.models.vnpay import vnpay
+
+pytestmark = pytest.mark.anyio
+
+
+async def pending_order(db, user):
+    """A PENDING order of 2 products using 10 units of a 1000-unit ingredient each"""
+    suffix = uuid.uuid4().hex[:12]
+    category = Category(name=f"Cakes {suffix}", description="Cakes")
+    ingredient = Ingredient(
+        name=f"flour-{suffix}", unit="g", price_per_unit=0.01,
+        calories_per_unit=3.6, stock_quantity=1000,
+    )
+    db.add_all([category, ingredient])
+    await db.flush()
+    product = Product(
+        name=f"Cake {suffix}", description="A cake", price=25.0, stock=100,
+        image_url=f"https://img.test/{suffix}.png", category_id=category.id,
+    )
+    db.add(product)
+    await db.flush()
+    db.add(ProductIngredient(
+        product_id=product.id, ingredient_id=ingredient.id, min_percentage=10, max_percentage=10,
+    ))
+    order = Order(
+        user_id=user.id,
+        address_id=(await db.execute(select(Address.id).where(Address.user_id == user.id))).scalar_one(),
+        subtotal=50.0, total_amount=50.0,
+        status=Order_Status.PENDING, payment_status=Order_Payment_Status.UNPAID,
+    )
+    db.add(order)
+    await db.flush()
+    db.add(OrderItem(order_id=order.id, product_id=product.id, quantity=2))
+    await db.commit()
+    return order, ingredient.id
+
+
+def signed_callback(order: Order) -> str:
+    """Query string of a successful VNPay payment for the order"""
+    return vnpay(os.environ["VNP_HASHSECRET"], "").get_payment_url({
+        "vnp_Amount": str(int(order.total_amount * 100)),
+        "vnp_ResponseCode": "00",
+        "vnp_TxnRef": f"ORDER{order.id}",
+        "vnp_TransactionNo": str(order.id),
+    })["payment_url"]
+
+
+async def test_concurrent_payment_callbacks_deduct_stock_once(client, db, user):
+    order, ingredient_id = await pending_order(db, user)
+    query = signed_callback(order)
+
+    # The browser return and the IPN of the same payment arrive together
+    ipn, browser = await asyncio.gather(
+        client.get("/order/ipn" + query),
+        client.get("/order/payment_return" + query),
+    )
+    assert ipn.status_code == 200 and browser.status_code == 200
+
+    stock = (await db.execute(
+        select(Ingredient.stock_quantity).where(Ingredient.id == ingredient_id)
+    )).scalar_one()
+    assert stock == 1000 - 2 * 10
+    payment_status = (await db.execute(
+        select(Order.payment_status).where(Order.id == order.id)
+    )).scalar_one()
+    assert payment_status == Order_Payment_Status.PAID
+
+
+async def test_repeated_ipn_is_acknowledged_without_deducting_again(client, db, user):
+    order, ingredient_id = await pending_order(db, user)
+    query = signed_callback(order)
+
+    first = await client.get("/order/ipn" + query)
+    second = await client.get("/order/ipn" + query)
+    assert first.json()["RspCode"] == "00"
+    assert second.json()["RspCode"] == "02"
+
+    stock = (await db.execute(
+        select(Ingredient.stock_quantity).where(Ingredient.id == ingredient_id)
+    )).scalar_one()
+    assert stock == 1000 - 2 * 10
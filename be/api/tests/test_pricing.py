@@ -0,0 +1,57 @@
+from collections import namedtuple
+import pytest
+from app.services.pricing_service import PricingEngine, parse_configuration
+from conftest import ScriptedSession
+
+pytestmark = pytest.mark.anyio
+
+Price = namedtuple("Price", "id price_per_unit")
+BasePrice = namedtuple("BasePrice", "id price")
+
+
+async def built_engine() -> PricingEngine:
+    engine = PricingEngine()
+    await engine.rebuild(ScriptedSession([Price(1, 0.5), Price(2, 0.25)]))
+    return engine
+
+
+def config(*pairs):
+    return {"ingredients": [{"ingredient_id": i, "quantity": q} for i, q in pairs]}
+
+
+def test_parse_configuration():
+    assert parse_configuration(None) == []
+    assert parse_configuration({"size": "L"}) == []
+    assert parse_configuration({"ingredients": [{"ingredient_id": "3"}]}) == [(3, 1.0)]
+    for bad in ({"ingredients": {"ingredient_id": 1}}, config((1, -1)), {"ingredients": [{"quantity": 2}]}):
+        with pytest.raises(ValueError):
+            parse_configuration(bad)
+
+
+async def test_unit_prices_add_configured_ingredients():
+    engine = await built_engine()
+
+    assert engine.unit_prices(
+        [10.0, 10.0, 4.0], [None, config((1, 4), (2, 2)), config((2, 3))]
+    ) == [10.0, 12.5, 4.75]
+    with pytest.raises(ValueError):
+        engine.unit_prices([10.0], [config((9, 1))])
+
+
+async def test_refresh_updates_adds_and_drops_ingredients():
+    engine = await built_engine()
+
+    await engine.refresh_ingredients([1, 2, 3], ScriptedSession([Price(1, 1.0), Price(3, 2.0)]))
+    assert engine.unit_prices([0.0, 0.0], [config((1, 1)), config((3, 2))]) == [1.0, 4.0]
+    # Deleted ingredients are no longer orderable
+    with pytest.raises(ValueError):
+        engine.unit_prices([0.0], [config((2, 1))])
+
+
+async def test_quote_rejects_unknown_products():
+    engine = await built_engine()
+
+    db = ScriptedSession([BasePrice(7, 5.0)])
+    assert await engine.quote([(7, 2, config((1, 2))), (7, 1, None)], db) == [6.0, 5.0]
+    with pytest.raises(LookupError):
+        await engine.quote([(7, 1, None), (8, 1, None)], ScriptedSession([BasePrice(7, 5.0)]))
@@ -0,0 +1,118 @@
+import uuid
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from sqlalchemy import select
+from app.models.analytics import ProductSimilarity
+from app.models.category import Category
+from app.models.engagement import Recommendation, Wishlist
+from app.models.product import Product
+from app.models.user import User
+from app.services import recommendation_service
+from app.services.recommendation_service import RecommendationService, _top_k_per_row, score_users
+
+
+def brute_force_top_k(matrix: sp.csr_matrix, k: int) -> np.ndarray:
+    dense = matrix.toarray()
+    expected = np.zeros_like(dense)
+    for row in range(dense.shape[0]):
+        cols = np.flatnonzero(dense[row])
+        top = cols[np.argsort(-dense[row, cols], kind="stable")[:k]]
+        expected[row, top] = dense[row, top]
+    return expected
+
+
+def test_top_k_per_row_matches_brute_force(monkeypatch):
+    # Small blocks so several blocks and length classes are exercised
+    monkeypatch.setattr(recommendation_service, "TOP_K_BLOCK_ELEMENTS", 64)
+    rng = np.random.default_rng(7)
+    # Rows from empty to full, so lengths span several classes
+    dense = rng.random((60, 40)) * (rng.random((60, 40)) < np.linspace(0, 1, 60)[:, None])
+    matrix = sp.csr_matrix(dense)
+
+    for k in (1, 3, 10, 40):
+        result = _top_k_per_row(matrix.copy(), k)
+        assert np.array_equal(result.toarray(), brute_force_top_k(matrix, k))
+        assert np.diff(result.indptr).max() <= k
+
+
+def test_top_k_per_row_keeps_exactly_k_on_ties():
+    matrix = sp.csr_matrix(np.array([[1.0, 1.0, 1.0, 1.0, 0.5], [0.0, 2.0, 0.0, 3.0, 0.0]]))
+
+    result = _top_k_per_row(matrix, 2)
+    assert np.diff(result.indptr).tolist() == [2, 2]
+    assert result[0].data.tolist() == [1.0, 1.0]
+    assert result[1].toarray().tolist() == [[0.0, 2.0, 0.0, 3.0, 0.0]]
+    assert _top_k_per_row(sp.csr_matrix(np.ones((2, 3))), 0).nnz == 0
+
+
+def test_score_users_skips_seen_and_unrecommendable_items():
+    # Items 0 and 1 are similar, and so are 1 and 2
+    similarity = sp.csr_matrix(np.array([
+        [0.0, 0.9, 0.0, 0.1],
+        [0.9, 0.0, 0.5, 0.0],
+        [0.0, 0.5, 0.0, 0.0],
+        [0.1, 0.0, 0.0, 0.0],
+    ]))
+    interactions = sp.csr_matrix(np.array([[2.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0]]))
+    seen = (interactions > 0).astype(float)
+    recommendable = np.array([True, True, True, False])
+
+    users, items, scores = score_users(interactions, seen, similarity, np.array([0, 1]), recommendable, 1)
+    assert users.tolist() == [0, 1]
+    assert items.tolist() == [1, 0]
+    assert np.allclose(scores, [1.8, 0.9])
+
+
+async def new_user(db) -> int:
+    user = User(email=f"rec-{uuid.uuid4().hex[:12]}@example.com", password_hashed="x", fullname="Rec", is_active=True)
+    db.add(user)
+    await db.flush()
+    return user.id
+
+
+async def recommended(db, user_id: int) -> list:
+    result = await db.execute(
+        select(Recommendation.product_id).where(Recommendation.user_id == user_id).order_by(Recommendation.product_id)
+    )
+    return result.scalars().all()
+
+
+@pytest.mark.anyio
+async def test_incremental_run_scores_new_users_with_stored_similarities(db):
+    suffix = uuid.uuid4().hex[:12]
+    category = Category(name=f"Cakes {suffix}", description="Cakes")
+    db.add(category)
+    await db.flush()
+    cakes = [
+        Product(
+            name=f"Cake {suffix}-{i}", description="A cake", price=10.0, stock=10,
+            image_url=f"https://img.test/{suffix}-{i}.png", category_id=category.id,
+            nutritions={"calories": 400, "protein": 5, "carbs": 45, "fat": 22},
+        )
+        for i in range(3)
+    ]
+    db.add_all(cakes)
+    await db.flush()
+    a, b, c = (cake.id for cake in cakes)
+    first, second = await new_user(db), await new_user(db)
+    db.add_all([
+        Wishlist(user_id=first, product_id=a), Wishlist(user_id=first, product_id=b),
+        Wishlist(user_id=second, product_id=b), Wishlist(user_id=second, product_id=c),
+    ])
+    await db.commit()
+
+    assert (await RecommendationService.build_recommendations(db, full=True))["full"]
+    assert await recommended(db, first) == [c]
+    assert await recommended(db, second) == [a]
+    neighbours = (await db.execute(
+        select(ProductSimilarity.similar_product_id).where(ProductSimilarity.product_id == b)
+    )).scalars().all()
+    assert sorted(neighbours) == [a, c]
+
+    third = await new_user(db)
+    db.add(Wishlist(user_id=third, product_id=a))
+    await db.commit()
+    stats = await RecommendationService.build_recommendations(db)
+    assert stats == {"users": 1, "recommendations": 1, "full": False}
+    assert await recommended(db, third) == [b]
@@ -0,0 +1,52 @@
+import base64
+import json
+from datetime import datetime, timezone
+import pytest
+from app.services.review_service import decode_cursor, encode_cursor
+
+CREATED_AT = datetime(2026, 10, 19, 12, 30, tzinfo=timezone.utc)
+
+
+def forged(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def test_cursor_round_trip():
+    newest = encode_cursor([CREATED_AT.isoformat(), 42])
+    rating = encode_cursor([5, CREATED_AT.isoformat(), 42])
+
+    assert decode_cursor(newest, "newest") == [CREATED_AT, 42]
+    assert decode_cursor(rating, "rating") == [5, CREATED_AT, 42]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    forged({}),
+    forged({"a": 1, "b": 2}),
+    forged("ab"),
+    forged(7),
+    forged([CREATED_AT.isoformat()]),
+    forged([5, CREATED_AT.isoformat(), 42]),
+    forged([CREATED_AT.isoformat(), "42"]),
+    forged([CREATED_AT.isoformat(), 4.2]),
+    forged([CREATED_AT.isoformat(), True]),
+    forged([CREATED_AT.isoformat(), 2**40]),
+    forged([20261019, 42]),
+    forged(["yesterday", 42]),
+    forged(["2026-10-19T12:30:00", 42]),
+])
+def test_malformed_cursor_is_a_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "newest")
+
+
+def test_rating_cursor_checks_the_rating():
+    with pytest.raises(ValueError):
+        decode_cursor(forged(["5", CREATED_AT.isoformat(), 42]), "rating")
+
+
+@pytest.mark.anyio
+async def test_forged_cursor_is_a_bad_request(client):
+    response = await client.get("/products/1/feedback", params={"cursor": forged({"a": 1, "b": 2})})
+    assert response.status_code == 400
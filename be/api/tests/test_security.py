@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import pytest
+from passlib.hash import bcrypt
+from app.core import security
+from app.core.config import BCRYPT_ROUNDS
+from app.core.security import hash_password, verify_and_update_password, verify_password
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_hashing_runs_on_the_hash_pool(monkeypatch):
+    threads = []
+    original = security.pwd_context.hash
+
+    def recording_hash(secret):
+        threads.append(threading.current_thread().name)
+        return original(secret)
+
+    monkeypatch.setattr(security.pwd_context, "hash", recording_hash)
+
+    hashed = await hash_password("secret")
+    assert threads[0].startswith("bcrypt")
+    assert await verify_password("secret", hashed)
+    assert not await verify_password("wrong", hashed)
+    assert security.hash_jobs_pending == 0
+
+
+async def test_pending_jobs_are_counted_while_queued():
+    jobs = [asyncio.ensure_future(hash_password(f"secret-{i}")) for i in range(8)]
+    await asyncio.sleep(0)
+    assert security.hash_jobs_pending == 8
+    await asyncio.gather(*jobs)
+    assert security.hash_jobs_pending == 0
+
+
+async def test_verify_and_update_rehashes_other_costs():
+    current = await hash_password("secret")
+    assert await verify_and_update_password("secret", current) == (True, None)
+    assert await verify_and_update_password("wrong", current) == (False, None)
+
+    older = bcrypt.using(rounds=BCRYPT_ROUNDS + 1).hash("secret")
+    verified, new_hash = await verify_and_update_password("secret", older)
+    assert verified
+    assert bcrypt.from_string(new_hash).rounds == BCRYPT_ROUNDS
+    assert await verify_password("secret", new_hash)
+
+
+async def test_missing_hash_is_checked_against_a_dummy(monkeypatch):
+    monkeypatch.setattr(security, "_dummy_hash", None)
+    verified = []
+    original = security.pwd_context.verify
+
+    def recording_verify(secret, hashed):
+        verified.append(hashed)
+        return original(secret, hashed)
+
+    monkeypatch.setattr(security.pwd_context, "verify", recording_verify)
+
+    assert await verify_and_update_password("secret", None) == (False, None)
+    assert await verify_and_update_password("secret", None) == (False, None)
+    # Paid the same bcrypt cost as a real account, with one dummy hash
+    assert len(verified) == 2 and verified[0] == verified[1] == security._dummy_hash
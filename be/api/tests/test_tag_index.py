@@ -0,0 +1,55 @@
+import pytest
+from app.services.tag_index_service import TagIndex
+from conftest import ScriptedSession
+
+pytestmark = pytest.mark.anyio
+
+
+async def built_index() -> TagIndex:
+    index = TagIndex()
+    await index.rebuild(ScriptedSession(
+        [1, 2, 3, 64, 130],
+        [(1, 10), (2, 10), (2, 20), (3, 20), (64, 10), (130, 30)],
+    ))
+    return index
+
+
+def ids(array):
+    return array.tolist()
+
+
+async def test_set_algebra():
+    index = await built_index()
+
+    assert index.candidates() is None
+    assert ids(index.candidates(tags_all=[10])) == [1, 2, 64]
+    assert ids(index.candidates(tags_all=[10, 20])) == [2]
+    assert ids(index.candidates(tags_any=[20, 30])) == [2, 3, 130]
+    assert ids(index.candidates(tags_none=[10])) == [3, 130]
+    assert ids(index.candidates(tags_any=[10], tags_none=[20])) == [1, 64]
+    assert ids(index.candidates(tags_all=[99])) == []
+
+
+async def test_products_are_added_retagged_and_removed():
+    index = await built_index()
+
+    # Past the last word: the bitmaps grow
+    index.set_product_tags(500, [10, 40])
+    index.set_product_tags(2, [30])
+    index.remove_product(64)
+    index.remove_product(10_000)
+
+    assert ids(index.candidates(tags_all=[10])) == [1, 500]
+    assert ids(index.candidates(tags_any=[30, 40])) == [2, 130, 500]
+    assert ids(index.candidates(tags_none=[10, 20, 30, 40])) == []
+
+
+async def test_refresh_reloads_and_forgets_deleted_products():
+    index = await built_index()
+
+    # Product 3 still exists with new tags, product 1 was deleted
+    await index.refresh_products([1, 3], ScriptedSession([3], [(3, 10)]))
+
+    assert ids(index.candidates(tags_all=[10])) == [2, 3, 64]
+    assert ids(index.candidates(tags_any=[20])) == [2]
+    assert ids(index.candidates(tags_none=[99])) == [2, 3, 64, 130]